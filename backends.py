@@ -0,0 +1,265 @@
+"""
+Çıkarım arka uçları.
+PyTorch (.pt, ultralytics) ve ONNX Runtime (.onnx) modellerini aynı arayüzle yükler.
+ONNX yolu torch veya ultralytics içe aktarmaz; ön işleme numpy/PIL ile yapılır.
+"""
+
+import ast
+import time
+from pathlib import Path
+import cv2
+import numpy as np
+from PIL import Image
+
+BACKENDS = ['auto', 'torch', 'onnx']
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv']
+
+def resolve_backend(model_path, backend='auto'):
+    """'auto' arka ucu dosya uzantısına göre çözümler."""
+    if backend == 'auto':
+        return 'onnx' if Path(model_path).suffix.lower() == '.onnx' else 'torch'
+    return backend
+
+def model_file(model_path, backend='auto'):
+    """Arka ucun gerçekte yükleyeceği model dosyasının yolunu döndürür."""
+    if resolve_backend(model_path, backend) == 'onnx' and Path(model_path).suffix.lower() != '.onnx':
+        # best.pt verildiyse yanındaki best.onnx kullanılır
+        return str(Path(model_path).with_suffix('.onnx'))
+    return str(model_path)
+
+def load_model(model_path, backend='auto', threads=None):
+    """
+    Modeli istenen arka uçla yükler.
+
+    Args:
+        model_path: Model yolu (.pt veya .onnx)
+        backend: 'auto', 'torch' veya 'onnx'
+        threads: ONNX Runtime intra-op thread sayısı (None: varsayılan)
+
+    Returns:
+        YOLO modeli veya aynı çağrı arayüzüne sahip OnnxClassifier
+    """
+    backend = resolve_backend(model_path, backend)
+    if backend == 'onnx':
+        onnx_path = Path(model_file(model_path, backend))
+        if not onnx_path.exists():
+            raise FileNotFoundError(
+                f"ONNX modeli bulunamadı: {onnx_path}\n"
+                f"Önce dışa aktarın: python export_onnx.py --model {Path(model_path).with_suffix('.pt')}"
+            )
+        return OnnxClassifier(str(onnx_path), threads=threads)
+
+    from ultralytics import YOLO
+    return YOLO(model_path)
+
+def model_imgsz(model):
+    """Modelin eğitildiği / dışa aktarıldığı giriş boyutu (bilinmiyorsa None)."""
+    overrides = getattr(model, 'overrides', None)
+    if overrides and overrides.get('imgsz'):
+        return overrides['imgsz']
+    return getattr(model, 'imgsz', None)
+
+def to_numpy(data):
+    """Tensor veya dizi olarak gelen skorları numpy dizisine çevirir."""
+    if hasattr(data, 'cpu'):
+        data = data.cpu().numpy()
+    return np.asarray(data)
+
+def classify_preprocess(images_bgr, imgsz):
+    """
+    Ultralytics sınıflandırma ön işlemesinin numpy karşılığı.
+
+    Kısa kenar imgsz olacak şekilde bilinear yeniden boyutlandırma,
+    merkezden imgsz x imgsz kırpma ve [0, 1] aralığına ölçekleme.
+
+    Args:
+        images_bgr: BGR görüntü listesi
+        imgsz: Model giriş boyutu
+
+    Returns:
+        (N, 3, imgsz, imgsz) float32 dizi
+    """
+    batch = np.empty((len(images_bgr), 3, imgsz, imgsz), dtype=np.float32)
+    for i, img in enumerate(images_bgr):
+        pil_image = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        w, h = pil_image.size
+        # torchvision Resize(int) ile aynı boyut hesabı
+        if w <= h:
+            new_w, new_h = imgsz, int(imgsz * h / w)
+        else:
+            new_w, new_h = int(imgsz * w / h), imgsz
+        resized = np.asarray(pil_image.resize((new_w, new_h), Image.Resampling.BILINEAR))
+        # torchvision CenterCrop ile aynı ofset hesabı
+        top = int(round((new_h - imgsz) / 2.0))
+        left = int(round((new_w - imgsz) / 2.0))
+        crop = resized[top:top + imgsz, left:left + imgsz]
+        batch[i] = crop.transpose(2, 0, 1)
+    batch *= 1.0 / 255.0
+    return batch
+
+class ArrayProbs:
+    """Ultralytics Probs nesnesinin numpy karşılığı."""
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def top1(self):
+        return int(self.data.argmax())
+
+    @property
+    def top1conf(self):
+        return self.data[self.top1]
+
+    @property
+    def top5(self):
+        return [int(i) for i in np.argsort(-self.data)[:5]]
+
+    @property
+    def top5conf(self):
+        return self.data[self.top5]
+
+class ArrayResult:
+    """Numpy skorlarından oluşan, Ultralytics Results nesnesinin sınıflandırma için gereken kısmı."""
+
+    boxes = None
+
+    def __init__(self, orig_img, path, names, probs):
+        self.orig_img = orig_img
+        self.path = path
+        self.names = names
+        self.probs = ArrayProbs(probs)
+        self.speed = {}
+
+    def plot(self):
+        """Ultralytics'e benzer şekilde ilk 5 sınıfı sol üste yazar."""
+        annotated = self.orig_img.copy()
+        for row, idx in enumerate(self.probs.top5):
+            text = f"{self.names.get(idx, idx)} {self.probs.data[idx]:.2f}"
+            cv2.putText(annotated, text, (10, 30 + row * 30), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.8, (255, 255, 255), 2, cv2.LINE_AA)
+        return annotated
+
+class OnnxClassifier:
+    """
+    ONNX Runtime ile sınıflandırma yapan, YOLO çağrı arayüzünü taklit eden model.
+
+    model(kaynak) çağrısı, .probs (top1, top1conf, data) ve .plot() sunan
+    sonuç listesi döndürür; böylece mevcut kod değişmeden çalışır.
+    """
+
+    task = 'classify'
+
+    def __init__(self, model_path, threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("onnxruntime bulunamadı. Kurulum: pip install onnxruntime") from e
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+        # Sınıf isimleri ve giriş boyutu modelin metadata'sında saklanır
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        input_shape = self.session.get_inputs()[0].shape
+        num_classes = self.session.get_outputs()[0].shape[-1]
+        if 'names' in metadata:
+            self.names = {int(k): str(v) for k, v in ast.literal_eval(metadata['names']).items()}
+        else:
+            self.names = {i: str(i) for i in range(num_classes if isinstance(num_classes, int) else 0)}
+        if 'imgsz' in metadata:
+            self.imgsz = int(ast.literal_eval(metadata['imgsz'])[0])
+        else:
+            self.imgsz = int(input_shape[2])
+        self.fixed_batch = input_shape[0] if isinstance(input_shape[0], int) else None
+        self.dynamic_size = not isinstance(input_shape[2], int)
+        self._save_warned = False
+
+    def preprocess(self, images_bgr, imgsz=None):
+        """BGR görüntü listesini model girişine çevirir."""
+        size = imgsz if imgsz and self.dynamic_size else self.imgsz
+        return classify_preprocess(images_bgr, size)
+
+    def forward(self, batch):
+        """Ön işlenmiş girişin olasılık matrisini döndürür."""
+        if self.fixed_batch:
+            # Sabit batch ile dışa aktarılmış modeller parça parça çalıştırılır
+            outputs = [
+                self.session.run(None, {self.input_name: batch[i:i + self.fixed_batch]})[0]
+                for i in range(0, len(batch), self.fixed_batch)
+            ]
+            return np.concatenate(outputs) if outputs else np.empty((0, len(self.names)), np.float32)
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def predict(self, images_bgr, imgsz=None):
+        """
+        BGR görüntü listesinin olasılık matrisini döndürür.
+
+        Returns:
+            (N, sınıf sayısı) float32 dizi
+        """
+        return self.forward(self.preprocess(images_bgr, imgsz))
+
+    def _results(self, images, paths, imgsz):
+        # Ultralytics ile aynı şekilde aşama sürelerini resim başına ms olarak kaydet
+        t0 = time.perf_counter()
+        batch = self.preprocess(images, imgsz)
+        t1 = time.perf_counter()
+        probs = self.forward(batch)
+        t2 = time.perf_counter()
+        results = [ArrayResult(img, path, self.names, p) for img, path, p in zip(images, paths, probs)]
+        t3 = time.perf_counter()
+        n = max(1, len(images))
+        speed = {
+            'preprocess': (t1 - t0) * 1000 / n,
+            'inference': (t2 - t1) * 1000 / n,
+            'postprocess': (t3 - t2) * 1000 / n
+        }
+        for result in results:
+            result.speed = speed
+        return results
+
+    def _iter_video(self, video_path, imgsz, vid_stride):
+        cap = cv2.VideoCapture(video_path)
+        frame_idx = 0
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if frame_idx % vid_stride == 0:
+                    yield from self._results([frame], [video_path], imgsz)
+                frame_idx += 1
+        finally:
+            cap.release()
+
+    def __call__(self, source, conf=None, verbose=False, imgsz=None, stream=False,
+                 vid_stride=1, save=False, **kwargs):
+        """YOLO modeli gibi çağrılır (resim yolu, dizi, liste veya video yolu)."""
+        if save and not self._save_warned:
+            print("UYARI: ONNX arka ucu işaretlenmiş çıktıyı otomatik kaydetmez.")
+            self._save_warned = True
+
+        if isinstance(source, (str, Path)) and Path(source).suffix.lower() in VIDEO_EXTENSIONS:
+            results = self._iter_video(str(source), imgsz, max(1, vid_stride))
+            return results if stream else list(results)
+
+        sources = source if isinstance(source, (list, tuple)) else [source]
+        images, paths = [], []
+        for i, item in enumerate(sources):
+            if isinstance(item, (str, Path)):
+                img = cv2.imread(str(item))
+                if img is None:
+                    raise FileNotFoundError(f"Resim okunamadı: {item}")
+                images.append(img)
+                paths.append(str(item))
+            else:
+                images.append(np.asarray(item))
+                paths.append(f"image{i}.jpg")
+
+        results = self._results(images, paths, imgsz) if images else []
+        return iter(results) if stream else results
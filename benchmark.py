@@ -0,0 +1,278 @@
+"""
+Aşama bazlı gecikme ölçüm (benchmark) scripti.
+validation.txt içindeki resimler üzerinde çözme, ön işleme, ileri geçiş,
+son işleme ve işaretleme (çizim) aşamalarını ayrı ayrı ölçer.
+imgsz, batch ve thread sayısı taraması yapar, JSON yazar ve kayıtlı
+bir temel (baseline) ölçümle karşılaştırarak performans gerilemelerini bulur.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+import cv2
+import numpy as np
+
+from backends import BACKENDS, load_model, resolve_backend
+from quantize import read_split
+
+STAGES = ['decode', 'preprocess', 'inference', 'postprocess', 'annotate']
+
+def summarize(values):
+    """Gecikme listesinin p50/p95/p99 ve ortalamasını (ms) döndürür."""
+    if not values:
+        return {'mean': None, 'p50': None, 'p95': None, 'p99': None}
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'p99': float(np.percentile(values, 99))
+    }
+
+def annotate(result, class_name, conf):
+    """detect.py ve gui.py'deki çizim işinin aynısı: result.plot() ve etiket yazısı."""
+    annotated = result.plot()
+    if not annotated.flags.writeable:
+        annotated = annotated.copy()
+    h, w = annotated.shape[:2]
+    cv2.rectangle(annotated, (10, 10), (w - 10, h - 10), (0, 255, 0), 3)
+    cv2.putText(annotated, f"{class_name}: {conf:.2%}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    return annotated
+
+def set_threads(model_path, backend, threads):
+    """Thread sayısını ayarlar ve modeli (gerekirse yeniden) yükler."""
+    if resolve_backend(model_path, backend) == 'torch':
+        import torch
+        torch.set_num_threads(threads)
+        return load_model(model_path, backend)
+    # ONNX Runtime thread sayısı oturum açılırken belirlenir
+    return load_model(model_path, backend, threads=threads)
+
+def run_config(model, image_paths, imgsz, batch, warmup=1, min_batches=20):
+    """
+    Tek bir (imgsz, batch) yapılandırmasını ölçer.
+
+    Yüzdelikler resim başına örneklerden hesaplanır: çözme ve işaretleme her
+    resim için ayrı ölçülür; ön işleme, ileri geçiş ve son işleme batch
+    düzeyinde ölçülüp batch'teki her resme paylaştırılır. Bu aşamaların
+    kuyruk değerleri batch sayısı kadar örneğe dayandığından resim listesi
+    en az `min_batches` batch oluşacak şekilde tekrarlanır.
+
+    Args:
+        model: Yüklenmiş model
+        image_paths: Ölçümde kullanılacak resimler
+        imgsz: Çıkarım boyutu
+        batch: Batch boyutu
+        warmup: Ölçüme dahil edilmeyen ısınma batch sayısı
+        min_batches: Ölçülecek en az batch sayısı
+
+    Returns:
+        Aşama bazlı resim başına gecikmeler (ms), uçtan uca gecikme, verim ve batch sayısı
+    """
+    timings = {stage: [] for stage in STAGES}
+    total = []
+    names = model.names
+    batches = [image_paths[i:i + batch] for i in range(0, len(image_paths), batch)]
+    if batches and len(batches) < min_batches:
+        repeats = -(-min_batches // len(batches))
+        batches = (batches * repeats)[:min_batches]
+
+    # Isınma
+    for paths in batches[:warmup]:
+        images = [img for img in (cv2.imread(p) for p in paths) if img is not None]
+        if images:
+            model(images, imgsz=imgsz, verbose=False)
+
+    processed = 0
+    measured_batches = 0
+    start_time = time.perf_counter()
+    for paths in batches:
+        images, decode_ms = [], []
+        for path in paths:
+            t0 = time.perf_counter()
+            img = cv2.imread(path)
+            if img is not None:
+                decode_ms.append((time.perf_counter() - t0) * 1000)
+                images.append(img)
+        if not images:
+            continue
+
+        results = model(images, imgsz=imgsz, verbose=False)
+
+        # Batch düzeyindeki aşamalar (ultralytics resim başına ortalama verir)
+        speed = results[0].speed
+        shared = {stage: speed.get(stage, 0.0) for stage in ('preprocess', 'inference', 'postprocess')}
+        for result, decode_time in zip(results, decode_ms):
+            t1 = time.perf_counter()
+            probs = result.probs
+            annotate(result, names.get(probs.top1, str(probs.top1)), probs.top1conf.item())
+            per_image = {'decode': decode_time, **shared,
+                         'annotate': (time.perf_counter() - t1) * 1000}
+            for stage, value in per_image.items():
+                timings[stage].append(value)
+            total.append(sum(per_image.values()))
+        processed += len(images)
+        measured_batches += 1
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        'images': processed,
+        'batches': measured_batches,
+        'stages_ms': {stage: summarize(values) for stage, values in timings.items()},
+        'total_ms': summarize(total),
+        'throughput': processed / elapsed if elapsed > 0 else 0.0
+    }
+
+def config_key(entry):
+    return f"imgsz={entry['imgsz']},batch={entry['batch']},threads={entry['threads']}"
+
+def compare_with_baseline(report, baseline, tolerance=0.10):
+    """
+    Ölçümleri temel ölçümle karşılaştırır.
+
+    p50 uçtan uca gecikme veya verim `tolerance` oranından fazla
+    kötüleştiyse gerileme olarak raporlanır.
+
+    Returns:
+        Gerileme açıklamaları listesi
+    """
+    baseline_runs = {config_key(entry): entry for entry in baseline.get('runs', [])}
+    regressions = []
+    print(f"\nTemel ölçümle karşılaştırma (tolerans: {tolerance:.0%}):")
+    for entry in report['runs']:
+        key = config_key(entry)
+        base = baseline_runs.get(key)
+        if base is None:
+            print(f"  {key}: temel ölçümde yok")
+            continue
+        p50, base_p50 = entry['total_ms']['p50'], base['total_ms']['p50']
+        thr, base_thr = entry['throughput'], base['throughput']
+        latency_change = (p50 - base_p50) / base_p50 if base_p50 else 0.0
+        throughput_change = (thr - base_thr) / base_thr if base_thr else 0.0
+        status = "OK"
+        if latency_change > tolerance or throughput_change < -tolerance:
+            status = "GERİLEME"
+            regressions.append(
+                f"{key}: p50 {base_p50:.2f} -> {p50:.2f} ms ({latency_change:+.1%}), "
+                f"verim {base_thr:.1f} -> {thr:.1f} resim/sn ({throughput_change:+.1%})"
+            )
+        print(f"  {key}: p50 {latency_change:+.1%}, verim {throughput_change:+.1%} [{status}]")
+    return regressions
+
+def print_table(report):
+    print(f"\n{'imgsz':>6} {'batch':>6} {'thread':>6} | " +
+          " | ".join(f"{stage:>11}" for stage in STAGES) +
+          f" | {'p50':>8} {'p95':>8} {'p99':>8} | {'resim/sn':>9}")
+    for entry in report['runs']:
+        stages = " | ".join(f"{entry['stages_ms'][stage]['p50']:>11.2f}" for stage in STAGES)
+        total = entry['total_ms']
+        print(f"{entry['imgsz']:>6} {entry['batch']:>6} {entry['threads']:>6} | {stages} | "
+              f"{total['p50']:>8.2f} {total['p95']:>8.2f} {total['p99']:>8.2f} | {entry['throughput']:>9.1f}")
+
+def parse_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLOv8 Banknot aşama bazlı gecikme ölçümü')
+    parser.add_argument('--model', type=str, default='runs/classify/banknot_classifier/weights/best.pt',
+                        help='Model yolu')
+    parser.add_argument('--backend', type=str, default='auto', choices=BACKENDS,
+                        help='Çıkarım arka ucu')
+    parser.add_argument('--val', type=str, default='validation.txt',
+                        help='Ölçümde kullanılacak resim listesi')
+    parser.add_argument('--source-dir', type=str, default='.',
+                        help='Resimlerin bulunduğu kök klasör')
+    parser.add_argument('--limit', type=int, default=200,
+                        help='Kullanılacak en fazla resim sayısı (0: tümü)')
+    parser.add_argument('--imgsz', type=str, default='224,320,640',
+                        help='Taranacak görüntü boyutları (virgülle ayrılmış)')
+    parser.add_argument('--batch', type=str, default='1,8,32',
+                        help='Taranacak batch boyutları')
+    parser.add_argument('--threads', type=str, default=str(os.cpu_count() or 1),
+                        help='Taranacak thread sayıları')
+    parser.add_argument('--min-batches', type=int, default=20,
+                        help='Yapılandırma başına en az batch sayısı (gerekirse resimler tekrarlanır)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='JSON çıktı yolu (varsayılan: runs/benchmark/benchmark_<zaman>.json)')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Karşılaştırılacak temel ölçüm JSON dosyası')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Bu ölçümü --baseline yoluna temel olarak kaydet')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Gerileme sayılmayacak en fazla kötüleşme oranı')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"HATA: Model dosyası bulunamadı: {args.model}")
+        print("Önce modeli eğitin: python train.py")
+        return 1
+
+    image_paths = [path for path, _, _ in read_split(args.val, args.source_dir)]
+    if not image_paths:
+        print(f"HATA: {args.val} içindeki resimler bulunamadı (kaynak: {args.source_dir})")
+        return 1
+    if args.limit > 0:
+        image_paths = image_paths[:args.limit]
+
+    report = {
+        'model': args.model,
+        'backend': resolve_backend(args.model, args.backend),
+        'images': len(image_paths),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': {'platform': platform.platform(), 'python': sys.version.split()[0],
+                 'cpu_count': os.cpu_count()},
+        'runs': []
+    }
+
+    for threads in parse_list(args.threads):
+        model = set_threads(args.model, args.backend, threads)
+        sizes = parse_list(args.imgsz)
+        # Sabit giriş boyutuyla dışa aktarılmış ONNX modeli imgsz'yi yok sayar
+        if getattr(model, 'dynamic_size', True) is False:
+            if sizes != [model.imgsz]:
+                print(f"UYARI: Model sabit giriş boyutuyla ({model.imgsz}) dışa aktarılmış; "
+                      f"imgsz taraması atlanıyor (farklı boyutlar için --static olmadan dışa aktarın)")
+            sizes = [model.imgsz]
+        for imgsz in sizes:
+            for batch in parse_list(args.batch):
+                print(f"Ölçülüyor: imgsz={imgsz}, batch={batch}, threads={threads}")
+                result = run_config(model, image_paths, imgsz, batch, min_batches=args.min_batches)
+                report['runs'].append({'imgsz': imgsz, 'batch': batch, 'threads': threads, **result})
+
+    print_table(report)
+
+    output = args.output or f"runs/benchmark/benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nSonuçlar kaydedildi: {output}")
+
+    if args.baseline:
+        if args.save_baseline:
+            Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"Temel ölçüm kaydedildi: {args.baseline}")
+        elif os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_with_baseline(report, baseline, args.tolerance)
+            if regressions:
+                print("\nHATA: Performans gerilemesi bulundu:")
+                for line in regressions:
+                    print(f"  {line}")
+                return 1
+            print("\nGerileme bulunmadı.")
+        else:
+            print(f"UYARI: Temel ölçüm bulunamadı: {args.baseline} (kaydetmek için --save-baseline)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Güven tabanlı iki aşamalı model kaskadı.
+Ucuz ilk aşama (düşük imgsz veya küçük model) her girişi sınıflandırır;
+yalnızca top1conf değeri eşiğin altında kalan girişler doğru (pahalı) modele gider.
+"""
+
+import threading
+import time
+
+from backends import load_model, model_imgsz
+from classifier import BanknoteClassifier
+
+# Sonuçlarda karar veren aşamanın gösterim adı
+STAGE_NAMES = {'fast': 'hızlı', 'accurate': 'doğru'}
+
+def parse_cascade(spec, threshold=0.9):
+    """
+    'hizli.pt[@imgsz],dogru.pt[@imgsz]' biçimindeki kaskad tanımını çözümler.
+
+    Returns:
+        CascadeClassifier / load_classifier için parametre sözlüğü
+    """
+    stages = []
+    for part in spec.split(','):
+        path, _, imgsz = part.strip().partition('@')
+        stages.append((path, int(imgsz) if imgsz else None))
+    if len(stages) != 2 or not all(path for path, _ in stages):
+        raise ValueError(f"Kaskad iki model içermeli (hizli.pt,dogru.pt): {spec}")
+    (fast_path, fast_imgsz), (accurate_path, accurate_imgsz) = stages
+    return {'fast_path': fast_path, 'accurate_path': accurate_path, 'threshold': threshold,
+            'fast_imgsz': fast_imgsz, 'accurate_imgsz': accurate_imgsz}
+
+def load_classifier(model_path, backend='auto', threads=None, cascade=None):
+    """
+    Tek modeli (BanknoteClassifier olarak) veya kaskadı yükler.
+
+    Args:
+        model_path: Model yolu (kaskad verilirse kullanılmaz)
+        backend: 'auto', 'torch' veya 'onnx'
+        threads: ONNX Runtime intra-op thread sayısı
+        cascade: parse_cascade() çıktısı (None: tek model)
+    """
+    if cascade:
+        return CascadeClassifier(backend=backend, threads=threads, **cascade)
+    model = load_model(model_path, backend, threads=threads)
+    # Sınıflandırma dışındaki (örn. tespit) modeller Results arayüzüyle kullanılır
+    if getattr(model, 'task', 'classify') != 'classify':
+        return model
+    return BanknoteClassifier(model)
+
+class CascadeClassifier:
+    """
+    YOLO çağrı arayüzünü taklit eden iki aşamalı sınıflandırıcı.
+
+    Her sonuca `stage` ('fast' veya 'accurate') ve `fast_conf` (ilk aşama güveni)
+    eklenir. Aşamalar kendi imgsz değerleriyle çalışır; çağırandan gelen imgsz
+    kullanılmaz.
+    """
+
+    task = 'classify'
+
+    def __init__(self, fast_path, accurate_path, threshold=0.9, fast_imgsz=None, accurate_imgsz=None,
+                 backend='auto', threads=None):
+        """
+        Args:
+            fast_path: İlk (hızlı) aşama modeli
+            accurate_path: İkinci (doğru) aşama modeli
+            threshold: Bu güvenin altındaki girişler ikinci aşamaya gider
+            fast_imgsz: İlk aşama giriş boyutu (None: modelin kendi boyutu)
+            accurate_imgsz: İkinci aşama giriş boyutu (None: modelin kendi boyutu)
+            backend: Çıkarım arka ucu
+            threads: ONNX Runtime intra-op thread sayısı
+        """
+        self.fast = load_model(fast_path, backend, threads=threads)
+        self.accurate = load_model(accurate_path, backend, threads=threads)
+        if dict(self.fast.names) != dict(self.accurate.names):
+            raise ValueError("Kaskad modellerinin sınıf isimleri aynı olmalı")
+        self.names = self.fast.names
+        self.model_path = accurate_path
+        self.threshold = threshold
+        self.fast_imgsz = fast_imgsz or model_imgsz(self.fast)
+        self.accurate_imgsz = accurate_imgsz or model_imgsz(self.accurate)
+        self.stats = {'inputs': 0, 'escalated': 0, 'seconds': 0.0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size_args(imgsz):
+        # imgsz=None ultralytics'te modelin varsayılanını ezer; yalnızca biliniyorsa gönder
+        return {'imgsz': imgsz} if imgsz else {}
+
+    def _decide(self, results):
+        """Düşük güvenli sonuçları ikinci aşamada yeniden sınıflandırır."""
+        low = []
+        for i, result in enumerate(results):
+            result.stage = 'fast'
+            result.fast_conf = float(result.probs.top1conf)
+            if result.fast_conf < self.threshold:
+                low.append(i)
+        if low:
+            accurate = self.accurate([results[i].orig_img for i in low], verbose=False,
+                                     **self._size_args(self.accurate_imgsz))
+            for i, result in zip(low, accurate):
+                result.path = results[i].path
+                result.stage = 'accurate'
+                result.fast_conf = results[i].fast_conf
+                results[i] = result
+        return results, len(low)
+
+    def _record(self, count, escalated, seconds):
+        with self._lock:
+            self.stats['inputs'] += count
+            self.stats['escalated'] += escalated
+            self.stats['seconds'] += seconds
+
+    def _stream(self, results):
+        iterator = iter(results)
+        while True:
+            start = time.perf_counter()
+            result = next(iterator, None)
+            if result is None:
+                return
+            decided, escalated = self._decide([result])
+            self._record(1, escalated, time.perf_counter() - start)
+            yield decided[0]
+
+    def __call__(self, source, conf=None, verbose=False, imgsz=None, stream=False,
+                 vid_stride=1, save=False, **kwargs):
+        """YOLO modeli gibi çağrılır (resim yolu, dizi, liste veya video yolu)."""
+        start = time.perf_counter()
+        results = self.fast(source, conf=conf, verbose=False, stream=stream, vid_stride=vid_stride,
+                            save=save, **self._size_args(self.fast_imgsz), **kwargs)
+        if stream:
+            return self._stream(results)
+        results, escalated = self._decide(list(results))
+        self._record(len(results), escalated, time.perf_counter() - start)
+        return results
+
+    @property
+    def escalated_ratio(self):
+        return self.stats['escalated'] / self.stats['inputs'] if self.stats['inputs'] else 0.0
+
+    @property
+    def mean_latency_ms(self):
+        return self.stats['seconds'] * 1000 / self.stats['inputs'] if self.stats['inputs'] else 0.0
+
+    def summary(self):
+        """Yükseltme oranı ve ortalama gecikmenin tek satırlık özeti."""
+        return (
+            f"Kaskad: {self.stats['inputs']} giriş, ikinci aşamaya giden "
+            f"{self.stats['escalated']} ({self.escalated_ratio:.1%}), "
+            f"ortalama gecikme {self.mean_latency_ms:.2f} ms (eşik {self.threshold:.2f})"
+        )
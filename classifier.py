@@ -0,0 +1,200 @@
+"""
+Results nesnesi üretmeyen, numpy tabanlı banknot sınıflandırıcı.
+predict() ve predict_batch() ön işleme + ileri geçiş yapar ve yalnızca
+top-1 indeksi, güven ve olasılık matrisini döndürür; Ultralytics Results
+nesnelerinin orijinal görüntü kopyası ve tensor -> Python dönüşümleri oluşmaz.
+Sınıf isimleri her zaman modelin kendi `names` sözlüğünden alınır.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from backends import BACKENDS, OnnxClassifier, classify_preprocess, load_model, model_imgsz, to_numpy
+from prepare_data import CLASSES
+
+# Model yüklenmeden (örn. önbellek isabetinde) kullanılan sınıf isimleri.
+# Ultralytics sınıf klasörlerini alfabetik (metin) sırayla indeksler:
+# {0: '10', 1: '100', 2: '20', 3: '200', 4: '5', 5: '50'}
+DEFAULT_NAMES = {idx: name for idx, name in enumerate(sorted(CLASSES))}
+
+def display_name(names, idx):
+    """Sınıf indeksinin gösterim adı (örn: '200' -> '200 TL')."""
+    name = str(names.get(int(idx), f'Class {idx}'))
+    return f"{name} TL" if name.isdigit() else name
+
+class BanknoteClassifier:
+    """
+    Yüklenmiş bir sınıflandırma modelinin numpy arayüzü.
+
+    predict()/predict_batch() modeli doğrudan çalıştırır. Video akışı ve
+    kaydetme gibi Results gerektiren yollar için model(...) çağrısı alttaki
+    YOLO / OnnxClassifier modeline aynen iletilir.
+    """
+
+    task = 'classify'
+
+    def __init__(self, model, imgsz=None):
+        """
+        Args:
+            model: load_model() ile yüklenmiş YOLO veya OnnxClassifier
+            imgsz: Çıkarım boyutu (None: modelin eğitildiği boyut)
+        """
+        self.model = model
+        self.names = {int(idx): str(name) for idx, name in model.names.items()}
+        self.labels = [display_name(self.names, idx) for idx in range(len(self.names))]
+        self.model_path = getattr(model, 'model_path', None) or getattr(model, 'ckpt_path', None)
+        self.imgsz = imgsz or model_imgsz(model) or 224
+        self._onnx = isinstance(model, OnnxClassifier)
+        if not self._onnx:
+            import torch
+            from ultralytics.utils.torch_utils import select_device
+            self._torch = torch
+            # Ultralytics ile aynı cihaz seçimi (CUDA varsa cuda:0, yoksa CPU)
+            self._net = model.model.float().eval().to(select_device('', verbose=False))
+
+    @classmethod
+    def load(cls, model_path, backend='auto', threads=None, imgsz=None):
+        """Modeli diskten yükleyip sarar."""
+        return cls(load_model(model_path, backend, threads=threads), imgsz)
+
+    def probabilities(self, images_bgr, imgsz=None):
+        """
+        BGR görüntü listesinin olasılık matrisini döndürür.
+
+        Returns:
+            (N, sınıf sayısı) float32 dizi
+        """
+        if self._onnx:
+            return self.model.predict(images_bgr, imgsz)
+        batch = classify_preprocess(images_bgr, imgsz or self.imgsz)
+        # Cihaz her çağrıda okunur; Results yolu (model(...)) ağı yerinde taşıyabilir
+        device = next(self._net.parameters()).device
+        with self._torch.inference_mode():
+            output = self._net(self._torch.from_numpy(batch).to(device))
+        # Yeni Ultralytics sürümleri değerlendirme modunda (olasılık, logit) döndürür
+        if isinstance(output, (list, tuple)):
+            output = output[0]
+        return output.float().cpu().numpy()
+
+    def predict_batch(self, images_bgr, imgsz=None):
+        """
+        Görüntü listesini tek ileri geçişte sınıflandırır.
+
+        Returns:
+            (top-1 indeksleri (N,), güvenler (N,), olasılık matrisi (N, sınıf sayısı))
+        """
+        probs = self.probabilities(images_bgr, imgsz)
+        top1 = probs.argmax(axis=1)
+        return top1, probs[np.arange(len(probs)), top1], probs
+
+    def predict(self, image_bgr, imgsz=None):
+        """
+        Tek görüntüyü sınıflandırır.
+
+        Returns:
+            (top-1 indeksi, güven, olasılık vektörü)
+        """
+        top1, conf, probs = self.predict_batch([image_bgr], imgsz)
+        return int(top1[0]), float(conf[0]), probs[0]
+
+    def label(self, idx):
+        """Sınıf indeksinin gösterim adı."""
+        return self.labels[idx] if 0 <= idx < len(self.labels) else f'Class {idx}'
+
+    def __call__(self, source, **kwargs):
+        """Results döndüren YOLO çağrı arayüzü (video akışı ve kaydetme için)."""
+        return self.model(source, **kwargs)
+
+def predict_arrays(model, images_bgr, imgsz=None):
+    """
+    BanknoteClassifier için doğrudan, diğer modeller (kaskad, YOLO) için
+    Results üzerinden (top-1, güven, olasılık matrisi) döndürür.
+    """
+    if isinstance(model, BanknoteClassifier):
+        return model.predict_batch(images_bgr, imgsz)
+    size_args = {'imgsz': imgsz} if imgsz else {}
+    results = model(images_bgr, verbose=False, **size_args)
+    probs = np.stack([to_numpy(result.probs.data) for result in results]).astype(np.float32, copy=False)
+    top1 = probs.argmax(axis=1)
+    return top1, probs[np.arange(len(probs)), top1], probs
+
+def _measure(call, images, runs):
+    """Çağrı başına süre, tepe ve tutulan bellek (tracemalloc) ölçümü."""
+    call(images[0])
+    gc.collect()
+    tracemalloc.start()
+    outputs = []
+    start = time.perf_counter()
+    for i in range(runs):
+        outputs.append(call(images[i % len(images)]))
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'ms_per_call': elapsed * 1000 / runs,
+        'retained_kb_per_call': retained / 1024 / runs,
+        'peak_kb': peak / 1024
+    }
+
+def compare_allocations(model_path, images, runs=50, backend='auto'):
+    """
+    Results yolu ile numpy API'sini aynı resimler üzerinde karşılaştırır.
+
+    Çağıranlar sonucu sakladığı için (örn. son kareyi çizmek) çağrı başına
+    tutulan bellek de ölçülür; Results orijinal görüntünün kopyasını taşır.
+    """
+    classifier = BanknoteClassifier.load(model_path, backend)
+
+    def via_results(img):
+        result = classifier(img, verbose=False)[0]
+        probs = result.probs
+        return result, probs.top1, probs.top1conf.item(), to_numpy(probs.data)
+
+    return {
+        'results': _measure(via_results, images, runs),
+        'numpy': _measure(classifier.predict, images, runs)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Results ve numpy sınıflandırma API bellek karşılaştırması')
+    parser.add_argument('--model', type=str, default='runs/classify/banknot_classifier/weights/best.pt',
+                        help='Eğitilmiş model yolu')
+    parser.add_argument('--backend', type=str, default='auto', choices=BACKENDS,
+                        help='Çıkarım arka ucu')
+    parser.add_argument('--val', type=str, default='validation.txt',
+                        help='Ölçümde kullanılacak resim listesi')
+    parser.add_argument('--source-dir', type=str, default='.',
+                        help='Resimlerin bulunduğu kök klasör')
+    parser.add_argument('--images', type=int, default=16,
+                        help='Belleğe okunacak farklı resim sayısı')
+    parser.add_argument('--runs', type=int, default=50,
+                        help='API başına çağrı sayısı')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"HATA: Model dosyası bulunamadı: {args.model}")
+        return 1
+
+    import cv2
+    from quantize import read_split
+    images = [cv2.imread(path) for path, _, _ in read_split(args.val, args.source_dir)[:args.images]]
+    images = [img for img in images if img is not None]
+    if not images:
+        print(f"HATA: {args.val} içindeki resimler bulunamadı (kaynak: {args.source_dir})")
+        return 1
+
+    report = compare_allocations(args.model, images, args.runs, args.backend)
+    print(f"{'API':<10} {'ms/çağrı':>10} {'tutulan KB/çağrı':>18} {'tepe KB':>10}")
+    for api, stats in report.items():
+        print(f"{api:<10} {stats['ms_per_call']:>10.2f} {stats['retained_kb_per_call']:>18.1f} "
+              f"{stats['peak_kb']:>10.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Hedef çıkarım boyutuna göre küçültülmüş çözme (decode) katmanı.
+Model girişi kısa kenarı imgsz olacak şekilde küçültüldüğü için büyük tarayıcı
+görüntülerini (örn. 4000x3000) tam çözünürlükte çözmek gereksizdir. JPEG'ler
+DCT ölçeklemesiyle doğrudan 1/2, 1/4 veya 1/8 boyutta çözülür (OpenCV
+IMREAD_REDUCED_* bayrakları veya PIL draft modu); kısa kenar hiçbir zaman
+hedefin altına inmez. Diğer biçimler (PNG, BMP) her zaman tam çözülür: OpenCV
+onları da önce tam çözüp seyreltir, kazanç olmadan örtüşme (aliasing) ekler.
+
+Küçültülmüş çözme tahminleri tam çözmeye göre az da olsa değiştirebileceği
+için çağıranlarda isteğe bağlıdır (detect.py/server.py --fast-decode, GUI
+"Hızlı çözme" seçeneği).
+
+Ölçüm (küçük ve büyük sentetik JPEG veya verilen resimler):
+    python decode.py --imgsz 224
+"""
+
+import argparse
+import io
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+from backends import model_imgsz
+from video_stream import peak_rss_mb
+
+REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+DECODE_METHODS = ['cv2', 'pil']
+
+# DCT ölçeklemesiyle gerçekten küçük çözülen biçimler (PIL biçim adları)
+REDUCIBLE_FORMATS = ('JPEG', 'MPO')
+
+def image_header(image_bytes):
+    """Resmi çözmeden başlığından (genişlik, yükseklik, biçim) okur (okunamazsa None)."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return img.size[0], img.size[1], img.format
+    except (OSError, ValueError):
+        return None
+
+def reduction_factor(width, height, min_side):
+    """Kısa kenarı min_side'ın altına düşürmeyen en büyük küçültme oranı (1, 2, 4 veya 8)."""
+    if not min_side:
+        return 1
+    for factor in (8, 4, 2):
+        if min(width, height) // factor >= min_side:
+            return factor
+    return 1
+
+def decode_min_side(model, imgsz=None, scale=1):
+    """
+    Model için gereken en küçük kısa kenar (None: boyut bilinmiyor, tam çözünürlük).
+
+    Kaskadda iki aşamanın büyük olan boyutu kullanılır.
+
+    Args:
+        model: Yüklenmiş model
+        imgsz: Çıkarım boyutu (None: modelden okunur)
+        scale: Boyut çarpanı (örn. döşemeli modda ızgaranın büyük kenarı)
+    """
+    if not imgsz:
+        sizes = [getattr(model, name, None) for name in ('imgsz', 'fast_imgsz', 'accurate_imgsz')]
+        sizes = [size for size in sizes if isinstance(size, int)]
+        imgsz = max(sizes) if sizes else model_imgsz(model)
+    if isinstance(imgsz, (list, tuple)):
+        imgsz = max(imgsz)
+    return imgsz * scale if imgsz else None
+
+def decode_image(image_bytes, min_side=None, method='cv2'):
+    """
+    Resim baytlarını BGR görüntüye çözer.
+
+    Args:
+        image_bytes: Ham resim baytları
+        min_side: Çözülen görüntünün kısa kenarı için alt sınır (None: tam çözünürlük)
+        method: 'cv2' (IMREAD_REDUCED_*) veya 'pil' (JPEG draft modu)
+
+    Returns:
+        BGR görüntü (çözülemezse None)
+    """
+    buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+    header = image_header(image_bytes) if min_side else None
+    factor = 1
+    if header and header[2] in REDUCIBLE_FORMATS:
+        factor = reduction_factor(header[0], header[1], min_side)
+    if factor == 1:
+        return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+    if method == 'pil':
+        # draft() libjpeg'e yalnızca istenen ölçekte çözmesini söyler
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img.draft('RGB', (header[0] // factor, header[1] // factor))
+            # cv2.imdecode gibi EXIF yönlendirmesini uygula
+            rgb = np.asarray(ImageOps.exif_transpose(img).convert('RGB'))
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+    return cv2.imdecode(buffer, REDUCED_FLAGS[factor])
+
+def read_image(image_path, min_side=None, method='cv2'):
+    """
+    Resmi diskten bir kez okur ve çözer.
+
+    Returns:
+        (ham bayt, BGR görüntü) - okunamazsa (None, None)
+    """
+    try:
+        image_bytes = Path(image_path).read_bytes()
+    except OSError:
+        return None, None
+    return image_bytes, decode_image(image_bytes, min_side, method)
+
+def synthetic_jpeg(width, height, quality=90):
+    """Ölçüm için doku içeren sentetik JPEG baytları üretir."""
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 255, (height // 16 + 1, width // 16 + 1, 3), dtype=np.uint8)
+    img = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    ok, encoded = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("Sentetik JPEG üretilemedi")
+    return encoded.tobytes()
+
+def _measure_worker(image_bytes, runs, kwargs, output):
+    # Tepe RSS süreç boyunca yalnızca artar; her ölçüm kendi sürecinde yapılır
+    baseline = peak_rss_mb()
+    img = decode_image(image_bytes, **kwargs)
+    shape = None if img is None else img.shape
+    del img
+    start = time.perf_counter()
+    for _ in range(runs):
+        decode_image(image_bytes, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    output.put({
+        'ms': elapsed * 1000 / runs,
+        'peak_mb': peak - baseline if peak is not None and baseline is not None else None,
+        'shape': shape
+    })
+
+def measure_decode(image_bytes, runs=20, **kwargs):
+    """
+    decode_image() için çağrı başına süre ve tepe bellek artışı.
+
+    Tepe bellek, OpenCV/libjpeg'in yerel tamponlarını da içeren süreç tepe
+    RSS'inin (peak_rss_mb) çözmeden önceki değere göre artışıdır; ölçüm ayrı
+    bir süreçte yapılır (Windows'ta None).
+
+    Returns:
+        {'ms': ..., 'peak_mb': ..., 'shape': ...}
+    """
+    ctx = multiprocessing.get_context('spawn')
+    output = ctx.Queue()
+    worker = ctx.Process(target=_measure_worker, args=(image_bytes, runs, kwargs, output))
+    worker.start()
+    try:
+        return output.get(timeout=600)
+    finally:
+        worker.join()
+
+def main():
+    parser = argparse.ArgumentParser(description='Tam ve küçültülmüş çözme karşılaştırması')
+    parser.add_argument('--images', type=str, nargs='*', default=None,
+                        help='Ölçülecek resimler (varsayılan: 640x480 ve 4000x3000 sentetik JPEG)')
+    parser.add_argument('--imgsz', type=int, default=224,
+                        help='Hedef çıkarım boyutu (kısa kenar alt sınırı)')
+    parser.add_argument('--runs', type=int, default=20,
+                        help='Yöntem başına çözme sayısı')
+
+    args = parser.parse_args()
+
+    if args.images:
+        inputs = []
+        for path in args.images:
+            try:
+                inputs.append((Path(path).name, Path(path).read_bytes()))
+            except OSError:
+                print(f"HATA: {path} okunamadı")
+                return 1
+    else:
+        inputs = [('küçük 640x480', synthetic_jpeg(640, 480)), ('büyük 4000x3000', synthetic_jpeg(4000, 3000))]
+
+    methods = [
+        ('tam çözünürlük', {}),
+        ('cv2 küçültülmüş', {'min_side': args.imgsz, 'method': 'cv2'}),
+        ('PIL draft', {'min_side': args.imgsz, 'method': 'pil'})
+    ]
+    print(f"{'Resim':<18} {'Yöntem':<16} {'boyut':>12} {'ms/çözme':>10} {'RSS +MB':>9}")
+    for name, image_bytes in inputs:
+        for label, kwargs in methods:
+            stats = measure_decode(image_bytes, args.runs, **kwargs)
+            shape = 'hata' if stats['shape'] is None else f"{stats['shape'][1]}x{stats['shape'][0]}"
+            peak = '-' if stats['peak_mb'] is None else f"{stats['peak_mb']:.1f}"
+            print(f"{name:<18} {label:<16} {shape:>12} {stats['ms']:>10.2f} {peak:>9}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,23 +3,85 @@ YOLOv8 Classification kullanarak banknot tespit scripti.
 Resim, video veya webcam üzerinde banknot tespiti yapar.
 """
 
-from ultralytics import YOLO
 import cv2
 import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from collections import deque
+import multiprocessing
+import time
 import os
 
-# Banknot sınıfları
-CLASS_NAMES = {
-    0: '5 TL',
-    1: '10 TL',
-    2: '20 TL',
-    3: '50 TL',
-    4: '100 TL',
-    5: '200 TL'
-}
+from backends import BACKENDS, VIDEO_EXTENSIONS, ArrayResult, model_file, model_imgsz, resolve_backend, to_numpy
+from cascade import STAGE_NAMES, load_classifier, parse_cascade
+from classifier import DEFAULT_NAMES, BanknoteClassifier, display_name
+from decode import decode_image, decode_min_side, read_image
+from metrics import METRICS, MetricsExporter, SamplingProfiler, install_dump_signal
+from multi_camera import parse_sources, run_cameras
+from prediction_cache import DEFAULT_CACHE_PATH, PredictionCache
+from tiles import detect_notes, draw_notes, parse_grid
+from video_stream import (AnnotatedVideoWriter, ChangeGate, PredictionLog, PredictionTimeline, peak_rss_mb,
+                          stream_video_predictions, video_fps)
 
-def detect_image(model_path, image_path, conf_threshold=0.25, save=True):
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
+
+def print_prediction(image_path, top1_idx, top1_conf, scores, names, stage=None, fast_conf=None):
+    """
+    Tek bir resmin sınıflandırma skorlarını ekrana yazar.
+    
+    Args:
+        image_path: Sonucun ait olduğu resim yolu
+        top1_idx: En yüksek skorlu sınıf indeksi
+        top1_conf: En yüksek skor
+        scores: Tüm sınıfların skorları
+        names: Modelin sınıf isimleri (model.names)
+        stage: Kaskad modunda karar veren aşama ('fast' veya 'accurate')
+        fast_conf: Kaskad modunda ilk aşamanın güveni
+    """
+    class_name = display_name(names, top1_idx)
+    
+    print(f"\nResim: {image_path}")
+    print(f"Tespit Edilen: {class_name}")
+    print(f"Güven Skoru: {top1_conf:.2%}")
+    if stage is not None:
+        print(f"Karar Veren Aşama: {STAGE_NAMES.get(stage, stage)} (ilk aşama güveni: {fast_conf:.2%})")
+    
+    # Tüm sınıfların skorlarını göster
+    print("\nTüm Sınıf Skorları:")
+    for idx, conf in enumerate(scores):
+        print(f"  {display_name(names, idx)}: {conf:.2%}")
+
+def save_result(result, image_path):
+    """Görselleştirilmiş sonucu kaydeder ve kayıt yolunu döndürür."""
+    output_path = f"detected_{Path(image_path).name}"
+    annotated_img = result.plot()
+    cv2.imwrite(output_path, annotated_img)
+    return output_path
+
+def report_result(result, image_path, save=True):
+    """
+    Tek bir sınıflandırma sonucunu ekrana yazar ve istenirse kaydeder.
+    
+    Args:
+        result: Ultralytics Results nesnesi
+        image_path: Sonucun ait olduğu resim yolu
+        save: Görselleştirilmiş sonucu kaydet
+    """
+    # En yüksek güven skoruna sahip sınıfı al
+    probs = result.probs
+    with METRICS.time('postprocess'):
+        print_prediction(image_path, probs.top1, probs.top1conf.item(), probs.data, result.names,
+                         getattr(result, 'stage', None), getattr(result, 'fast_conf', None))
+    METRICS.inc('images')
+    
+    # Görselleştirme
+    if save:
+        with METRICS.time('render'):
+            output_path = save_result(result, image_path)
+        print(f"\nSonuç kaydedildi: {output_path}")
+
+def detect_image(model_path, image_path, conf_threshold=0.25, save=True, backend='auto', cache=None,
+                 cascade=None, fast_decode=False):
     """
     Tek bir resim üzerinde banknot tespiti yapar.
     
@@ -28,71 +90,550 @@ def detect_image(model_path, image_path, conf_threshold=0.25, save=True):
         image_path: Tespit edilecek resim yolu
         conf_threshold: Güven eşiği
         save: Sonuçları kaydet
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        cache: PredictionCache (None: önbellek kullanma)
+        cascade: parse_cascade() çıktısı (None: tek model)
+        fast_decode: Büyük JPEG'leri modelin boyutuna küçültülmüş çöz (kaydedilmiyorsa)
     """
+    # Önbellekte varsa modeli hiç yüklemeden sonucu göster
+    image_bytes = None
+    if cache is not None:
+        try:
+            image_bytes = Path(image_path).read_bytes()
+        except OSError:
+            image_bytes = None
+        probs = cache.get(image_bytes) if image_bytes is not None else None
+        # Sınıf isimleri sonucu üreten modelden (bind() ile) önbelleğe kaydedilmiştir
+        if probs is not None and cache.names is not None:
+            with METRICS.time('decode'):
+                img = decode_image(image_bytes)
+            results = [ArrayResult(img, image_path, cache.names, probs)]
+            for result in results:
+                report_result(result, image_path, save)
+            return results
+    
     # Modeli yükle
-    model = YOLO(model_path)
+    model = load_classifier(model_path, backend, cascade=cascade)
     
-    # Tespit yap
-    results = model(image_path, conf=conf_threshold)
+    if cache is not None:
+        cache.bind(model.names, model_imgsz(model))
+    
+    # Resim bir kez çözülür; istenirse (ve kaydedilmeyecekse) modelin boyutuna küçültülmüş
+    min_side = decode_min_side(model) if fast_decode and not save else None
+    with METRICS.time('decode'):
+        if image_bytes is None:
+            image_bytes, img = read_image(image_path, min_side)
+        else:
+            img = decode_image(image_bytes, min_side)
+    if img is None:
+        print(f"HATA: Resim okunamadı: {image_path}")
+        return []
+    
+    # Tespit yap - tek model Results nesnesi üretmez
+    if isinstance(model, BanknoteClassifier):
+        with METRICS.time('inference'):
+            _, _, probs = model.predict(img)
+        results = [ArrayResult(img, image_path, model.names, probs)]
+    else:
+        with METRICS.time('inference'):
+            results = model(img, conf=conf_threshold)
     
     # Sonuçları göster
     for result in results:
-        # En yüksek güven skoruna sahip sınıfı al
-        probs = result.probs
-        top1_idx = probs.top1
-        top1_conf = probs.top1conf.item()
-        class_name = CLASS_NAMES.get(top1_idx, f'Class {top1_idx}')
-        
-        print(f"\nResim: {image_path}")
-        print(f"Tespit Edilen: {class_name}")
-        print(f"Güven Skoru: {top1_conf:.2%}")
+        report_result(result, image_path, save)
+        if cache is not None:
+            cache.put(image_bytes, to_numpy(result.probs.data), 'fast' if min_side else 'full')
+    if cascade:
+        print(f"\n{model.summary()}")
+    
+    return results
+
+def print_notes(image_path, notes, total):
+    """Döşemeli modda bulunan banknotları ve toplam tutarı ekrana yazar."""
+    print(f"\nResim: {image_path}")
+    print(f"Bulunan Banknot: {len(notes)}")
+    for note in notes:
+        x1, y1, x2, y2 = note['bbox']
+        print(f"  {note['name']} TL: {note['conf']:.2%} kutu=({x1}, {y1}, {x2}, {y2}) parça={note['tiles']}")
+    print(f"Toplam Tutar: {total} TL")
+
+def detect_tiled(model_path, image_files, tiling, save=True, prefetch=4, backend='auto', cascade=None,
+                 fast_decode=False):
+    """
+    Birden fazla banknot içeren resimlerde döşemeli sınıflandırma yapar.
+    
+    Her resmin tüm parçaları tek ileri geçişte sınıflandırılır.
+    
+    Args:
+        model_path: Eğitilmiş model yolu
+        image_files: İşlenecek resim yolları
+        tiling: tiles.detect_notes() parametreleri (grid, overlap, proposals, conf)
+        save: Banknot kutularıyla çizilmiş sonucu kaydet
+        prefetch: Resim çözme thread sayısı
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        cascade: parse_cascade() çıktısı (None: tek model)
+        fast_decode: Büyük JPEG'leri küçültülmüş çöz (kaydedilmiyorsa)
+    
+    Returns:
+        {resim yolu: (banknot listesi, toplam TL)}
+    """
+    model = load_classifier(model_path, backend, cascade=cascade)
+    
+    # Her parça modelin boyutuna küçültüleceği için resim ızgara oranında küçültülmüş çözülebilir
+    min_side = None
+    if fast_decode and not save:
+        min_side = decode_min_side(model, scale=max(tiling.get('grid') or (1, 1)))
+    loader = lambda path: read_image(path, min_side)[1]
+    
+    outputs = {}
+    start = time.perf_counter()
+    for path, img in prefetch_images(image_files, workers=prefetch, loader=loader):
+        if img is None:
+            print(f"\nUYARI: Resim okunamadı, atlanıyor: {path}")
+            continue
+        with METRICS.time('inference'):
+            notes, total = detect_notes(model, img, **tiling)
+        print_notes(path, notes, total)
+        METRICS.inc('images')
+        if save:
+            output_path = f"detected_{Path(path).name}"
+            with METRICS.time('render'):
+                cv2.imwrite(output_path, draw_notes(img, notes, total))
+            print(f"Sonuç kaydedildi: {output_path}")
+        outputs[str(path)] = (notes, total)
+    
+    elapsed = time.perf_counter() - start
+    if outputs:
+        print(f"\n{len(outputs)} resim {elapsed:.2f} saniyede işlendi "
+              f"(resim başına {elapsed * 1000 / len(outputs):.1f} ms, "
+              f"toplam {sum(total for _, total in outputs.values())} TL)")
+    if cascade:
+        print(model.summary())
+    return outputs
+
+def list_images(folder):
+    """Klasördeki desteklenen resim dosyalarını listeler."""
+    image_files = []
+    for ext in IMAGE_EXTENSIONS:
+        image_files.extend(Path(folder).glob(f'*{ext}'))
+        image_files.extend(Path(folder).glob(f'*{ext.upper()}'))
+    return image_files
+
+def prefetch_images(image_paths, workers=4, depth=64, loader=None):
+    """
+    Resimleri arka plandaki thread havuzunda çözer ve sırayla döndürür.
+    
+    Aynı anda en fazla `depth` resim bellekte bekler; böylece on binlerce
+    dosyalık klasörlerde bellek kullanımı sınırlı kalır.
+    
+    Args:
+        image_paths: Resim yolları
+        workers: Çözme (decode) thread sayısı
+        depth: Önceden okunacak en fazla resim sayısı
+        loader: Resim okuma fonksiyonu (varsayılan: cv2.imread)
+    
+    Yields:
+        (resim yolu, BGR görüntü veya okunamadıysa None)
+    """
+    if loader is None:
+        loader = lambda path: cv2.imread(str(path))
+    loader = METRICS.wrap('decode', loader)
+    paths = iter(image_paths)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path in paths:
+            pending.append((path, executor.submit(loader, path)))
+            if len(pending) >= depth:
+                break
+        while pending:
+            path, future = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, executor.submit(loader, next_path)))
+            yield path, future.result()
+
+def _run_pending(model, pending, conf_threshold, cache, decode='full'):
+    """Önbellekte bulunmayan resimleri tek batch'te işler ve hepsini sırayla döndürür."""
+    todo = [entry for entry in pending if entry[3] is None]
+    if todo:
+        images = [entry[1] for entry in todo]
+        with METRICS.time('inference'):
+            if isinstance(model, BanknoteClassifier):
+                _, _, probs = model.predict_batch(images)
+                results = [ArrayResult(img, str(entry[0]), model.names, p)
+                           for img, entry, p in zip(images, todo, probs)]
+            else:
+                results = model(images, conf=conf_threshold, verbose=False)
+        for entry, result in zip(todo, results):
+            entry[3] = result
+            if cache is not None:
+                cache.put(entry[2], to_numpy(result.probs.data), decode)
+    for entry in pending:
+        yield entry[0], entry[3]
+
+def iter_folder_results(model, image_files, conf_threshold=0.25, batch=32, prefetch=4, cache=None,
+                        reduced_decode=False):
+    """
+    Resimleri `batch` boyutunda gruplar halinde modelden geçirir.
+    
+    Args:
+        model: Yüklenmiş model (BanknoteClassifier veya CascadeClassifier)
+        image_files: İşlenecek resim yolları
+        conf_threshold: Güven eşiği
+        batch: Tek ileri geçişte işlenecek resim sayısı
+        prefetch: Resim çözme thread sayısı
+        cache: PredictionCache (None: önbellek kullanma)
+        reduced_decode: Resimleri modelin boyutuna küçültülmüş çöz (sonuç kaydedilmiyorsa)
+    
+    Yields:
+        (resim yolu, Results nesnesi) - giriş sırasıyla
+    """
+    batch = max(1, batch)
+    # Her eleman: [yol, görüntü, ham bayt, sonuç]
+    pending = []
+    min_side = decode_min_side(model) if reduced_decode else None
+    loader = lambda path: read_image(path, min_side)
+    # Küçültülmüş çözmenin sonuçları tam çözmeninkilerden ayrı saklanır
+    decode = 'fast' if min_side else 'full'
+    if cache is not None:
+        cache.bind(model.names, model_imgsz(model))
+    
+    for path, (image_bytes, img) in prefetch_images(image_files, workers=prefetch, depth=batch * 2,
+                                                    loader=loader):
+        if img is None:
+            print(f"\nUYARI: Resim okunamadı, atlanıyor: {path}")
+            continue
         
-        # Tüm sınıfların skorlarını göster
-        print("\nTüm Sınıf Skorları:")
-        for idx, conf in enumerate(probs.data):
-            print(f"  {CLASS_NAMES.get(idx, f'Class {idx}')}: {conf:.2%}")
+        result = None
+        if cache is not None:
+            probs = cache.get(image_bytes, decode)
+            if probs is not None:
+                result = ArrayResult(img, str(path), model.names, probs)
+        pending.append([path, img, image_bytes, result])
         
-        # Görselleştirme
-        if save:
-            output_path = f"detected_{Path(image_path).name}"
-            annotated_img = result.plot()
-            cv2.imwrite(output_path, annotated_img)
+        if len(pending) == batch:
+            yield from _run_pending(model, pending, conf_threshold, cache, decode)
+            pending = []
+    if pending:
+        yield from _run_pending(model, pending, conf_threshold, cache, decode)
+
+def detect_folder(model_path, image_files, conf_threshold=0.25, save=True, batch=32, prefetch=4,
+                  backend='auto', cache=None, cascade=None, fast_decode=False):
+    """
+    Klasördeki resimler üzerinde toplu (batch) banknot tespiti yapar.
+    
+    Model bir kez yüklenir, resimler arka planda çözülür ve modele
+    `batch` boyutunda gruplar halinde verilir. Her resim için çıktı
+    detect_image() ile aynıdır.
+    
+    Args:
+        model_path: Eğitilmiş model yolu
+        image_files: İşlenecek resim yolları
+        conf_threshold: Güven eşiği
+        save: Sonuçları kaydet
+        batch: Tek ileri geçişte işlenecek resim sayısı
+        prefetch: Resim çözme thread sayısı
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        cache: PredictionCache (None: önbellek kullanma)
+        cascade: parse_cascade() çıktısı (None: tek model)
+        fast_decode: Büyük JPEG'leri küçültülmüş çöz (kaydedilmiyorsa)
+    
+    Returns:
+        İşlenen resim sayısı
+    """
+    # Modeli yalnızca bir kez yükle
+    model = load_classifier(model_path, backend, cascade=cascade)
+    
+    start_time = time.time()
+    processed = 0
+    for path, result in iter_folder_results(model, image_files, conf_threshold, batch, prefetch, cache,
+                                            reduced_decode=fast_decode and not save):
+        report_result(result, str(path), save)
+        processed += 1
+    
+    elapsed = time.time() - start_time
+    throughput = processed / elapsed if elapsed > 0 else 0.0
+    print(f"\nToplam {processed} resim {elapsed:.2f} saniyede işlendi "
+          f"({throughput:.1f} resim/sn, batch={max(1, batch)})")
+    if cascade:
+        print(model.summary())
+    
+    return processed
+
+def split_cores(num_workers):
+    """
+    Kullanılabilir CPU çekirdeklerini işçiler arasında eşit dilimlere böler.
+    
+    Returns:
+        Her işçi için çekirdek listesi
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    
+    per_worker = max(1, len(cores) // num_workers)
+    slices = []
+    for i in range(num_workers):
+        start = (i * per_worker) % len(cores)
+        slices.append(cores[start:start + per_worker])
+    return slices
+
+def _folder_worker(worker_id, model_path, shard, conf_threshold, save, batch, cores, backend='auto',
+                   cascade=None, cache_path=None, cache_size=100000, fast_decode=False):
+    """
+    Çok süreçli klasör modunda tek bir işçinin görevi.
+    
+    Kendi çekirdek dilimine sabitlenir, kendi modelini yükler ve shard'daki
+    resimleri işler. Ekrana yazmaz; sonuçları ana sürece döndürür.
+    
+    Args:
+        worker_id: İşçi numarası
+        model_path: Eğitilmiş model yolu
+        shard: (giriş sırası, resim yolu) listesi
+        conf_threshold: Güven eşiği
+        save: Görselleştirilmiş sonuçları kaydet
+        batch: Tek ileri geçişte işlenecek resim sayısı
+        cores: Bu işçinin kullanacağı çekirdekler
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        cascade: parse_cascade() çıktısı (None: tek model)
+        cache_path: Ortak tahmin önbelleği SQLite dosyası (None: önbellek kullanma)
+        cache_size: Disk katmanındaki en fazla kayıt
+        fast_decode: Büyük JPEG'leri küçültülmüş çöz (kaydedilmiyorsa)
+    
+    Returns:
+        (worker_id, sonuç listesi, işlenen resim sayısı, geçen süre, kaskad istatistikleri, sınıf isimleri,
+        aşama histogramları, önbellek istatistikleri)
+    """
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    # Süreç havuzu bu süreci başka bir shard için yeniden kullanmış olabilir
+    METRICS.reset()
+    
+    threads = max(1, len(cores))
+    if resolve_backend(model_path, backend) == 'torch':
+        import torch
+        torch.set_num_threads(threads)
+    
+    model = load_classifier(model_path, backend, threads=threads, cascade=cascade)
+    order = {str(path): index for index, path in shard}
+    # Her işçi aynı SQLite dosyasına kendi bağlantısıyla erişir
+    cache = (PredictionCache(model_file(model_path, backend), db_path=cache_path, disk_entries=cache_size)
+             if cache_path else None)
+    
+    start_time = time.time()
+    predictions = []
+    for path, result in iter_folder_results(model, [path for _, path in shard],
+                                            conf_threshold, batch, prefetch=1, cache=cache,
+                                            reduced_decode=fast_decode and not save):
+        probs = result.probs
+        output_path = save_result(result, path) if save else None
+        predictions.append((
+            order[str(path)],
+            str(path),
+            probs.top1,
+            probs.top1conf.item(),
+            to_numpy(probs.data).tolist(),
+            output_path,
+            getattr(result, 'stage', None),
+            getattr(result, 'fast_conf', None)
+        ))
+    
+    elapsed = time.time() - start_time
+    cache_stats = None
+    if cache is not None:
+        cache_stats = dict(cache.stats)
+        cache.close()
+    return (worker_id, predictions, len(predictions), elapsed, getattr(model, 'stats', None),
+            model.names, dict(METRICS.histograms), cache_stats)
+
+def detect_folder_parallel(model_path, image_files, conf_threshold=0.25, save=True, batch=32, workers=2,
+                           backend='auto', cascade=None, cache=None, fast_decode=False):
+    """
+    Klasördeki resimleri birden fazla süreçte paralel işler.
+    
+    Dosya listesi `workers` parçaya bölünür; her süreç kendi modelini
+    yükler ve ayrı bir çekirdek dilimine sabitlenir. Sonuçlar giriş
+    sırasına göre birleştirilip detect_image() ile aynı biçimde yazılır.
+    
+    Args:
+        model_path: Eğitilmiş model yolu
+        image_files: İşlenecek resim yolları
+        conf_threshold: Güven eşiği
+        save: Sonuçları kaydet
+        batch: Her işçide tek ileri geçişte işlenecek resim sayısı
+        workers: Süreç sayısı
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        cascade: parse_cascade() çıktısı (None: tek model)
+        cache: PredictionCache (None: önbellek kullanma) - işçiler aynı veritabanını
+            kendi bağlantılarıyla açar, isabet istatistikleri bu nesnede toplanır
+        fast_decode: Büyük JPEG'leri küçültülmüş çöz (kaydedilmiyorsa)
+    
+    Returns:
+        İşlenen resim sayısı
+    """
+    indexed = list(enumerate(image_files))
+    workers = max(1, min(workers, len(indexed)))
+    shard_size = (len(indexed) + workers - 1) // workers
+    shards = [indexed[i * shard_size:(i + 1) * shard_size] for i in range(workers)]
+    core_slices = split_cores(workers)
+    
+    print(f"{len(indexed)} resim {workers} işçiye dağıtılıyor "
+          f"(işçi başına {len(core_slices[0])} çekirdek)")
+    
+    start_time = time.time()
+    predictions = []
+    worker_stats = []
+    cascade_stats = {'inputs': 0, 'escalated': 0, 'seconds': 0.0}
+    names = DEFAULT_NAMES
+    # Her işçi PyTorch'u temiz başlatsın diye 'spawn' kullanılır
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [
+            executor.submit(_folder_worker, worker_id, model_path, shard,
+                            conf_threshold, save, batch, core_slices[worker_id], backend, cascade,
+                            cache.db_path if cache is not None else None,
+                            cache.disk_entries if cache is not None else 100000, fast_decode)
+            for worker_id, shard in enumerate(shards)
+        ]
+        for future in as_completed(futures):
+            worker_id, worker_predictions, count, elapsed, stats, names, histograms, cache_stats = future.result()
+            # İşçilerin çözme/çıkarım süreleri ana sürecin metriklerine eklenir
+            METRICS.merge(histograms, {'images': count})
+            predictions.extend(worker_predictions)
+            worker_stats.append((worker_id, count, elapsed))
+            for key, value in (stats or {}).items():
+                cascade_stats[key] += value
+            for key, value in (cache_stats or {}).items():
+                cache.stats[key] += value
+    
+    # Sonuçları giriş sırasına göre birleştir
+    predictions.sort(key=lambda item: item[0])
+    for _, path, top1_idx, top1_conf, scores, output_path, stage, fast_conf in predictions:
+        print_prediction(path, top1_idx, top1_conf, scores, names, stage, fast_conf)
+        if output_path:
             print(f"\nSonuç kaydedildi: {output_path}")
     
-    return results
+    elapsed = time.time() - start_time
+    print("\nİşçi Başına Verim:")
+    for worker_id, count, worker_elapsed in sorted(worker_stats):
+        worker_throughput = count / worker_elapsed if worker_elapsed > 0 else 0.0
+        print(f"  İşçi {worker_id} (çekirdek {core_slices[worker_id]}): "
+              f"{count} resim, {worker_elapsed:.2f} sn, {worker_throughput:.1f} resim/sn")
+    
+    throughput = len(predictions) / elapsed if elapsed > 0 else 0.0
+    print(f"\nToplam {len(predictions)} resim {elapsed:.2f} saniyede işlendi "
+          f"({throughput:.1f} resim/sn, {workers} işçi, batch={max(1, batch)})")
+    if cascade and cascade_stats['inputs']:
+        ratio = cascade_stats['escalated'] / cascade_stats['inputs']
+        mean_ms = cascade_stats['seconds'] * 1000 / cascade_stats['inputs']
+        print(f"Kaskad: ikinci aşamaya giden {cascade_stats['escalated']} ({ratio:.1%}), "
+              f"işçi başına ortalama gecikme {mean_ms:.2f} ms")
+    
+    return len(predictions)
 
-def detect_video(model_path, video_path, conf_threshold=0.25, save=True):
+def detect_video(model_path, video_path, conf_threshold=0.25, save=True, vid_stride=1, log_path=None,
+                 backend='auto', cascade=None, timeline_path=None, preview_width=None):
     """
     Video üzerinde banknot tespiti yapar.
     
+    Kareler akış (stream) halinde işlenir ve sonuçlar bellekte
+    biriktirilmez; bellek kullanımı video uzunluğundan bağımsızdır.
+    Her karenin tahmini CSV dosyasına artımlı olarak yazılır; aynı sınıfın
+    art arda gelen kareleri ayrıca zaman çizelgesi dosyasında bölümlere
+    indirgenir. İşaretlenmiş video ayrı bir yazıcı thread'inde kodlanır.
+    
     Args:
         model_path: Eğitilmiş model yolu
         video_path: Tespit edilecek video yolu
         conf_threshold: Güven eşiği
-        save: Sonuçları kaydet
+        save: İşaretlenmiş videoyu kaydet (detected_<video>.mp4)
+        vid_stride: Yalnızca her k. kareyi sınıflandır
+        log_path: Kare başına tahmin kaydı (varsayılan: predictions_<video>.csv)
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        cascade: parse_cascade() çıktısı (None: tek model)
+        timeline_path: Bölüm zaman çizelgesi (varsayılan: timeline_<video>.csv)
+        preview_width: Videoyu yalnızca bu genişlikte önizleme olarak kaydet (None: tam boyut)
+    
+    Returns:
+        İşlenen kare sayısı
     """
     # Modeli yükle
-    model = YOLO(model_path)
+    model = load_classifier(model_path, backend, cascade=cascade)
     
-    # Video tespiti
-    results = model(video_path, conf=conf_threshold, save=save)
+    stem = Path(video_path).stem
+    if log_path is None:
+        log_path = f"predictions_{stem}.csv"
+    if timeline_path is None:
+        timeline_path = f"timeline_{stem}.csv"
     
-    print(f"\nVideo işlendi: {video_path}")
+    fps = video_fps(video_path)
+    vid_stride = max(1, vid_stride)
+    writer = None
     if save:
-        print("Sonuçlar kaydedildi.")
+        # Yalnızca sınıflandırılan kareler yazılır
+        writer = AnnotatedVideoWriter(f"detected_{stem}.mp4", fps / vid_stride if fps else 0.0,
+                                      preview_width=preview_width)
     
-    return results
+    # Video tespiti - kareler tek tek işlenir
+    start_time = time.time()
+    write_error = None
+    try:
+        with PredictionLog(log_path, fps=fps) as log, PredictionTimeline(timeline_path, fps=fps) as timeline:
+            # Kare okuma Ultralytics akışının içinde olduğu için çıkarım süresine çözme de dahildir
+            predictions = stream_video_predictions(model, video_path, conf_threshold, vid_stride)
+            for frame_idx, result in METRICS.timed_iter('inference', predictions):
+                probs = result.probs
+                top1_idx = probs.top1
+                top1_conf = probs.top1conf.item()
+                name = display_name(model.names, top1_idx)
+                stage = getattr(result, 'stage', None)
+                METRICS.inc('frames')
+                log.write(frame_idx, top1_idx, name, top1_conf, stage)
+                timeline.write(frame_idx, top1_idx, name, top1_conf)
+                if writer is not None:
+                    label = f"{name}: {top1_conf:.1%}"
+                    if stage is not None:
+                        label += f" [{STAGE_NAMES.get(stage, stage)}]"
+                    # Çizim ve kodlama yazıcı thread'inde yapılır
+                    writer.write(result.orig_img, label)
+    finally:
+        if writer is not None:
+            write_error = writer.close()
+    
+    elapsed = time.time() - start_time
+    print(f"\nVideo işlendi: {video_path}")
+    print(f"{log.rows} kare {elapsed:.1f} saniyede sınıflandırıldı (her {vid_stride}. kare)")
+    print(f"Kare tahminleri: {log_path}")
+    print(f"Zaman çizelgesi: {timeline_path} ({timeline.segments} bölüm)")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"Tepe bellek kullanımı: {peak:.0f} MB")
+    if cascade:
+        print(model.summary())
+    if writer is not None:
+        print(writer.summary())
+        if write_error is not None:
+            print(f"HATA: İşaretlenmiş video kaydedilemedi ({writer.path}): {write_error}")
+        else:
+            print(f"Sonuçlar kaydedildi: {writer.path}")
+    
+    return log.rows
 
-def detect_webcam(model_path, conf_threshold=0.25):
+def detect_webcam(model_path, conf_threshold=0.25, backend='auto', gate=None, cascade=None, tiling=None):
     """
     Webcam üzerinden canlı banknot tespiti yapar.
     
     Args:
         model_path: Eğitilmiş model yolu
         conf_threshold: Güven eşiği
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        gate: Sahne değişmediğinde çıkarımı atlayan ChangeGate (None: her karede çıkarım)
+        cascade: parse_cascade() çıktısı (None: tek model)
+        tiling: tiles.detect_notes() parametreleri (None: kare başına tek sınıflandırma)
     """
     # Modeli yükle
-    model = YOLO(model_path)
+    model = load_classifier(model_path, backend, cascade=cascade)
     
     # Webcam'i aç
     cap = cv2.VideoCapture(0)
@@ -103,25 +644,56 @@ def detect_webcam(model_path, conf_threshold=0.25):
     
     print("Webcam açıldı. Çıkmak için 'q' tuşuna basın.")
     
+    results = None
     while True:
-        ret, frame = cap.read()
+        with METRICS.time('decode'):
+            ret, frame = cap.read()
         if not ret:
             break
+        METRICS.inc('frames')
+        
+        if tiling is not None:
+            # Döşemeli mod - sahne değişmediyse önceki banknot kutuları kullanılır
+            # (ilk kare de kapıdan geçer; böylece kapının referans karesi olur)
+            if gate is None or gate.should_infer(frame) or results is None:
+                with METRICS.time('inference'):
+                    results = detect_notes(model, frame, **tiling)
+            with METRICS.time('render'):
+                cv2.imshow('Banknot Tespit', draw_notes(frame, *results))
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+            continue
         
-        # Tespit yap
-        results = model(frame, conf=conf_threshold, verbose=False)
+        # Tespit yap - sahne değişmediyse önceki tahmini kullan
+        if gate is None or gate.should_infer(frame) or results is None:
+            with METRICS.time('inference'):
+                if isinstance(model, BanknoteClassifier):
+                    _, _, probs = model.predict(frame)
+                    results = [ArrayResult(frame, None, model.names, probs)]
+                else:
+                    results = model(frame, conf=conf_threshold, verbose=False)
+        else:
+            # Yeniden kullanılan tahmin güncel kare üzerine çizilir
+            METRICS.inc('frames_skipped')
+            for result in results:
+                result.orig_img = frame
         
         # Sonuçları göster
+        render_start = time.perf_counter()
         for result in results:
             probs = result.probs
             top1_idx = probs.top1
             top1_conf = probs.top1conf.item()
-            class_name = CLASS_NAMES.get(top1_idx, f'Class {top1_idx}')
+            class_name = display_name(result.names, top1_idx)
+            label = f"{class_name}: {top1_conf:.2%}"
+            stage = getattr(result, 'stage', None)
+            if stage is not None:
+                label += f" [{STAGE_NAMES.get(stage, stage)}]"
             
             # Görüntü üzerine yazı ekle
             annotated_frame = result.plot()
             cv2.putText(annotated_frame, 
-                       f"{class_name}: {top1_conf:.2%}", 
+                       label, 
                        (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 
                        1, 
@@ -129,6 +701,7 @@ def detect_webcam(model_path, conf_threshold=0.25):
                        2)
             
             cv2.imshow('Banknot Tespit', annotated_frame)
+        METRICS.observe('render', time.perf_counter() - render_start)
         
         # 'q' tuşuna basıldığında çık
         if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -136,6 +709,38 @@ def detect_webcam(model_path, conf_threshold=0.25):
     
     cap.release()
     cv2.destroyAllWindows()
+    
+    if gate is not None:
+        print(f"Atlanan kare oranı: {gate.skip_ratio:.1%} ({gate.skipped}/{gate.frames})")
+    if cascade:
+        print(model.summary())
+
+def detect_cameras(model_path, sources, conf_threshold=0.25, backend='auto', cascade=None):
+    """
+    Birden fazla kamera veya video dosyası üzerinde canlı banknot tespiti yapar.
+    
+    Tüm kaynaklar tek modeli paylaşır; her kaynağın en yeni karesi tek
+    batch'lik ileri geçişte sınıflandırılır ve kendi penceresinde gösterilir.
+    
+    Args:
+        model_path: Eğitilmiş model yolu
+        sources: Kamera indeksleri ve/veya video dosyası yolları
+        conf_threshold: Güven eşiği
+        backend: Çıkarım arka ucu ('auto', 'torch', 'onnx')
+        cascade: parse_cascade() çıktısı (None: tek model)
+    """
+    # Modeli yükle
+    model = load_classifier(model_path, backend, cascade=cascade)
+    
+    print(f"{len(sources)} kaynak açılıyor. Çıkmak için 'q' tuşuna basın.")
+    try:
+        run_cameras(model, sources, conf_threshold)
+    except IOError as e:
+        print(f"HATA: {e}")
+        return
+    
+    if cascade:
+        print(model.summary())
 
 def main():
     parser = argparse.ArgumentParser(description='YOLOv8 Banknot Tespit Uygulaması')
@@ -147,45 +752,170 @@ def main():
                         help='Güven eşiği (0-1 arası)')
     parser.add_argument('--save', action='store_true',
                         help='Sonuçları kaydet')
+    parser.add_argument('--batch', type=int, default=32,
+                        help='Klasör modunda tek seferde işlenecek resim sayısı')
+    parser.add_argument('--prefetch', type=int, default=4,
+                        help='Klasör modunda resim çözme thread sayısı')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Klasör modunda paralel süreç sayısı (CPU sunucuları için)')
+    parser.add_argument('--vid-stride', type=int, default=1,
+                        help='Videoda yalnızca her k. kareyi sınıflandır')
+    parser.add_argument('--log', type=str, default=None,
+                        help='Video için kare başına tahmin kaydı (CSV)')
+    parser.add_argument('--timeline', type=str, default=None,
+                        help='Video için sınıf bölümleri zaman çizelgesi (varsayılan: timeline_<video>.csv)')
+    parser.add_argument('--fast-decode', action='store_true',
+                        help="Büyük JPEG'leri modelin boyutuna küçültülmüş çöz (tahminler az farklı olabilir, "
+                             "--save ile tam çözülür)")
+    parser.add_argument('--preview-width', type=int, default=None,
+                        help='--save ile videoyu yalnızca bu genişlikte küçültülmüş önizleme olarak yaz')
+    parser.add_argument('--cameras', type=str, default=None,
+                        help='Birden fazla kamera/video için ortak modelle canlı tespit (örn: 0,1 veya a.mp4,b.mp4)')
+    parser.add_argument('--no-gate', action='store_true',
+                        help='Webcam modunda her karede çıkarım yap (değişim kapısını kapat)')
+    parser.add_argument('--gate-threshold', type=float, default=6.0,
+                        help='Çıkarımı tetikleyen ortalama gri ton farkı (0-255)')
+    parser.add_argument('--gate-max-reuse', type=int, default=30,
+                        help='Bir tahminin en fazla kaç karede yeniden kullanılacağı')
+    parser.add_argument('--cache', type=str, nargs='?', const=DEFAULT_CACHE_PATH, default=None,
+                        help=f'Tahmin önbelleğini kullan (varsayılan dosya: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-size', type=int, default=100000,
+                        help='Disk önbelleğindeki en fazla kayıt sayısı')
+    parser.add_argument('--backend', type=str, default='auto', choices=BACKENDS,
+                        help='Çıkarım arka ucu (auto: .onnx uzantısı ONNX Runtime ile çalışır)')
+    parser.add_argument('--cascade', type=str, default=None,
+                        help='İki aşamalı kaskad: hizli.pt[@imgsz],dogru.pt[@imgsz] (--model yerine kullanılır)')
+    parser.add_argument('--cascade-threshold', type=float, default=0.9,
+                        help='Bu güvenin altındaki girişler ikinci aşamaya gider')
+    parser.add_argument('--tiles', type=str, default=None,
+                        help='Birden fazla banknot için döşemeli sınıflandırma ızgarası (örn: 2x3)')
+    parser.add_argument('--tile-overlap', type=float, default=0.25,
+                        help='Komşu parçalar arasındaki örtüşme oranı (0-1 arası)')
+    parser.add_argument('--tile-conf', type=float, default=0.8,
+                        help='Bu güvenin altındaki parçalar arka plan sayılır')
+    parser.add_argument('--proposals', action='store_true',
+                        help='Izgaraya ek olarak kontur tabanlı banknot önerilerini de sınıflandır')
+    parser.add_argument('--metrics', type=str, default=None,
+                        help='Aşama metriklerini Prometheus metin dosyasına yaz (örn: metrics.prom)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Metrikleri http://127.0.0.1:PORT/metrics adresinde yayınla')
+    parser.add_argument('--profile', type=str, default=None,
+                        help='Örnekleyen profilleyiciyi aç, katlanmış yığınları bu dosyaya yaz '
+                             '(çalışırken kill -USR1 ile de yazılır)')
     
     args = parser.parse_args()
     
-    # Model dosyasının varlığını kontrol et
-    if not os.path.exists(args.model):
-        print(f"HATA: Model dosyası bulunamadı: {args.model}")
-        print("Önce modeli eğitin: python train.py")
-        return
+    cascade = None
+    if args.cascade:
+        try:
+            cascade = parse_cascade(args.cascade, args.cascade_threshold)
+        except ValueError as e:
+            print(f"HATA: {e}")
+            return
+    
+    tiling = None
+    if args.tiles:
+        try:
+            tiling = {'grid': parse_grid(args.tiles), 'overlap': args.tile_overlap,
+                      'proposals': args.proposals, 'conf': args.tile_conf}
+        except ValueError as e:
+            print(f"HATA: {e}")
+            return
+    
+    # Model dosyalarının varlığını kontrol et
+    model_paths = [cascade['fast_path'], cascade['accurate_path']] if cascade else [args.model]
+    for model_path in model_paths:
+        if not os.path.exists(model_path):
+            print(f"HATA: Model dosyası bulunamadı: {model_path}")
+            print("Önce modeli eğitin: python train.py")
+            return
+    
+    cameras = None
+    if args.cameras:
+        try:
+            cameras = parse_sources(args.cameras)
+        except ValueError as e:
+            print(f"HATA: {e}")
+            return
+        args.source = 'cameras'
     
     # Kaynak belirtilmemişse, varsayılan olarak test resmi iste
     if args.source is None:
         print("Kaynak belirtilmedi. Lütfen bir resim yolu girin veya 'webcam' yazın.")
         args.source = input("Resim yolu veya 'webcam': ").strip()
     
+    # Tahmin önbelleği - model dosyası değişirse eski kayıtlar geçersiz olur
+    cache = None
+    if args.cache and cascade:
+        print("UYARI: Tahmin önbelleği kaskad modunda kullanılmaz.")
+    elif args.cache and tiling:
+        print("UYARI: Tahmin önbelleği döşemeli modda kullanılmaz.")
+    elif args.cache:
+        cache = PredictionCache(model_file(args.model, args.backend), db_path=args.cache,
+                                disk_entries=args.cache_size,
+                                decode='fast' if args.fast_decode and not args.save else 'full')
+    
+    # İsteğe bağlı metrik yayını ve profilleyici
+    exporter = None
+    if args.metrics or args.metrics_port is not None:
+        exporter = MetricsExporter(METRICS, path=args.metrics, port=args.metrics_port)
+    profiler = None
+    if args.profile:
+        profiler = SamplingProfiler().start()
+        install_dump_signal(profiler, args.profile)
+    
     # Kaynak tipine göre işlem yap
-    if args.source.lower() == 'webcam':
-        detect_webcam(args.model, args.conf)
-    elif os.path.isfile(args.source):
-        # Dosya uzantısına göre resim veya video
-        ext = Path(args.source).suffix.lower()
-        if ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-            detect_image(args.model, args.source, args.conf, args.save)
-        elif ext in ['.mp4', '.avi', '.mov', '.mkv']:
-            detect_video(args.model, args.source, args.conf, args.save)
+    try:
+        if cameras is not None:
+            detect_cameras(args.model, cameras, args.conf, backend=args.backend, cascade=cascade)
+        elif args.source.lower() == 'webcam':
+            gate = None if args.no_gate else ChangeGate(args.gate_threshold, args.gate_max_reuse)
+            detect_webcam(args.model, args.conf, backend=args.backend, gate=gate, cascade=cascade,
+                          tiling=tiling)
+        elif tiling and os.path.isfile(args.source) and Path(args.source).suffix.lower() in IMAGE_EXTENSIONS:
+            detect_tiled(args.model, [args.source], tiling, args.save, backend=args.backend, cascade=cascade,
+                         fast_decode=args.fast_decode)
+        elif tiling and os.path.isdir(args.source):
+            print(f"Klasör işleniyor (döşemeli): {args.source}")
+            detect_tiled(args.model, list_images(args.source), tiling, args.save, prefetch=args.prefetch,
+                         backend=args.backend, cascade=cascade, fast_decode=args.fast_decode)
+        elif os.path.isfile(args.source):
+            # Dosya uzantısına göre resim veya video
+            ext = Path(args.source).suffix.lower()
+            if ext in IMAGE_EXTENSIONS:
+                detect_image(args.model, args.source, args.conf, args.save, backend=args.backend, cache=cache,
+                             cascade=cascade, fast_decode=args.fast_decode)
+            elif ext in VIDEO_EXTENSIONS:
+                detect_video(args.model, args.source, args.conf, args.save,
+                             vid_stride=args.vid_stride, log_path=args.log, backend=args.backend,
+                             cascade=cascade, timeline_path=args.timeline, preview_width=args.preview_width)
+            else:
+                print(f"Desteklenmeyen dosya formatı: {ext}")
+        elif os.path.isdir(args.source):
+            # Klasör içindeki tüm resimleri işle
+            print(f"Klasör işleniyor: {args.source}")
+            image_files = list_images(args.source)
+            if args.workers > 1:
+                detect_folder_parallel(args.model, image_files, args.conf, args.save,
+                                       batch=args.batch, workers=args.workers, backend=args.backend,
+                                       cascade=cascade, cache=cache, fast_decode=args.fast_decode)
+            else:
+                detect_folder(args.model, image_files, args.conf, args.save,
+                              batch=args.batch, prefetch=args.prefetch, backend=args.backend, cache=cache,
+                              cascade=cascade, fast_decode=args.fast_decode)
         else:
-            print(f"Desteklenmeyen dosya formatı: {ext}")
-    elif os.path.isdir(args.source):
-        # Klasör içindeki tüm resimleri işle
-        print(f"Klasör işleniyor: {args.source}")
-        image_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-        image_files = []
-        for ext in image_extensions:
-            image_files.extend(Path(args.source).glob(f'*{ext}'))
-            image_files.extend(Path(args.source).glob(f'*{ext.upper()}'))
-        
-        for img_path in image_files:
-            detect_image(args.model, str(img_path), args.conf, args.save)
-    else:
-        print(f"HATA: Geçersiz kaynak: {args.source}")
+            print(f"HATA: Geçersiz kaynak: {args.source}")
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.dump(args.profile)
+        if exporter is not None:
+            print(f"\n{METRICS.summary()}")
+            exporter.close()
+    
+    if cache is not None:
+        print(f"\n{cache.summary()}")
+        cache.close()
 
 if __name__ == '__main__':
     main()
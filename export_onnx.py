@@ -0,0 +1,82 @@
+"""
+Eğitilmiş YOLOv8 Classification modelini ONNX formatına dönüştürme scripti.
+Sınıf isimleri ve giriş boyutu ONNX metadata'sına gömülür; böylece
+detect.py ve gui.py modeli torch olmadan çalıştırabilir.
+"""
+
+import argparse
+import os
+import shutil
+from pathlib import Path
+
+def export_onnx(model_path='runs/classify/banknot_classifier/weights/best.pt', imgsz=None,
+                dynamic=True, opset=None, output=None):
+    """
+    .pt modelini ONNX'e dönüştürür.
+
+    Args:
+        model_path: Eğitilmiş model yolu
+        imgsz: Giriş boyutu (None: eğitimde kullanılan boyut)
+        dynamic: Değişken batch boyutu (klasör modunda toplu çıkarım için)
+        opset: ONNX opset sürümü (None: ultralytics varsayılanı)
+        output: Çıktı yolu (varsayılan: model ile aynı klasörde .onnx)
+
+    Returns:
+        ONNX model yolu
+    """
+    from ultralytics import YOLO
+    import onnx
+
+    model = YOLO(model_path)
+    if imgsz is None:
+        imgsz = model.ckpt.get('train_args', {}).get('imgsz', 640) if model.ckpt else 640
+
+    exported = model.export(format='onnx', imgsz=imgsz, dynamic=dynamic, opset=opset, simplify=True)
+
+    # Sınıf isimlerinin ve giriş boyutunun metadata'da olduğundan emin ol
+    onnx_model = onnx.load(exported)
+    metadata = {prop.key: prop.value for prop in onnx_model.metadata_props}
+    required = {
+        'names': str({int(k): str(v) for k, v in model.names.items()}),
+        'imgsz': str([imgsz, imgsz]),
+        'task': 'classify',
+    }
+    for key, value in required.items():
+        if key not in metadata:
+            prop = onnx_model.metadata_props.add()
+            prop.key, prop.value = key, value
+    onnx.save(onnx_model, exported)
+
+    if output and Path(output) != Path(exported):
+        shutil.move(exported, output)
+        exported = output
+
+    print(f"\nONNX modeli kaydedildi: {exported}")
+    print(f"Sınıflar: {model.names}")
+    print(f"Giriş boyutu: {imgsz}")
+    return str(exported)
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLOv8 Banknot modelini ONNX formatına dönüştür')
+    parser.add_argument('--model', type=str, default='runs/classify/banknot_classifier/weights/best.pt',
+                        help='Eğitilmiş model yolu')
+    parser.add_argument('--imgsz', type=int, default=None,
+                        help='Giriş boyutu (varsayılan: eğitimdeki boyut)')
+    parser.add_argument('--static', action='store_true',
+                        help='Sabit batch boyutu (1) ile dışa aktar')
+    parser.add_argument('--opset', type=int, default=None,
+                        help='ONNX opset sürümü')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Çıktı yolu')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"HATA: Model dosyası bulunamadı: {args.model}")
+        print("Önce modeli eğitin: python train.py")
+        return
+
+    export_onnx(args.model, args.imgsz, dynamic=not args.static, opset=args.opset, output=args.output)
+
+if __name__ == '__main__':
+    main()
@@ -11,8 +11,20 @@ import cv2
 import threading
 from pathlib import Path
 import os
+import time
 import numpy as np
+from backends import BACKENDS, ArrayResult, model_file, model_imgsz, resolve_backend, to_numpy
+from cascade import STAGE_NAMES, CascadeClassifier, load_classifier
+from classifier import BanknoteClassifier, display_name, predict_arrays
+from decode import decode_image, decode_min_side
+from metrics import METRICS, SamplingProfiler
+from model_registry import ModelRegistry, model_key
+from prediction_cache import PredictionCache, model_fingerprint
+from tiles import detect_notes, draw_notes
+from video_stream import (AnnotatedVideoWriter, ChangeGate, LatestSlot, PredictionLog, PredictionTimeline,
+                          RateMeter, stream_video_predictions)
 # YOLO lazy import - sadece gerektiğinde yüklenecek (PyTorch DLL hatası önlemek için)
+# backends modülü ultralytics/torch'u yalnızca PyTorch arka ucu seçildiğinde içe aktarır
 
 # Banknot sınıfları - Model yüklendiğinde model.names'den güncellenecek
 # YOLOv8 klasör isimlerini alfabetik sıraya göre indexler
@@ -31,9 +43,19 @@ CLASS_NAMES = {
     4: '5 TL',
     5: '50 TL'
 } 
+
+# Canlı kaynaklarda sonuç panelinin saniyedeki en fazla güncellenme sayısı
+TEXT_REFRESH_HZ = 4
+
+# Webcam karelerinin çıkarım boyutu (ısındırma da bu boyutta yapılır)
+LIVE_IMGSZ = 640
+
 class BanknotDetectionGUI:
-    def __init__(self, root):
+    def __init__(self, root, start_time=None):
         self.root = root
+        # Açılış ölçümleri (pencere ve ilk sonuç süreleri) bu andan itibaren sayılır
+        self.start_time = start_time or time.perf_counter()
+        self.first_result_recorded = False
         self.root.title("Banknot Tespit Uygulaması - YOLOv8")
         self.root.geometry("1400x850")
         self.root.configure(bg='#0f172a')  # Modern dark blue-gray
@@ -63,15 +85,38 @@ class BanknotDetectionGUI:
         
         # Varsayılan model yolu
         self.model_path = 'runs/classify/banknot_classifier/weights/best.pt'
+        self.fast_model_path = None  # Kaskad ilk aşama modeli
         self.model = None
+        self.cache = None
+        # Arka plan model yükleyicisi - ilk yükleme sürerken tespit thread'leri bekler
+        self.model_loading = False
+        self.model_ready = threading.Event()
+        self.model_ready.set()
+        self.load_generation = 0
+        # Son kullanılan modeller bellekte tutulur - geri dönüş anında olur
+        self.registry = ModelRegistry()
         self.current_image = None
         self.webcam_running = False
         self.cap = None
         
+        # Canlı görüntü için yeniden kullanılan tamponlar
+        self.live_rgb = None
+        self.live_photo = None
+        self.last_text_update = 0.0
+        self.last_result_text = None
+        
+        # İstatistik paneli ve isteğe bağlı profilleyici
+        self.stats_window = None
+        self.stats_label = None
+        self.profiler = None
+        
         # GUI oluştur
         self.create_widgets()
         
-        # Model yükleme durumunu kontrol et
+        # Pencere ilk kez çizildiğinde açılış süresini kaydet
+        self.root.after_idle(self.record_window_shown)
+        
+        # Model arka planda yüklenir - pencere model yüklenmesini beklemeden açılır
         self.check_model()
     
     def create_widgets(self):
@@ -152,6 +197,33 @@ class BanknotDetectionGUI:
         )
         self.model_label.pack(anchor=tk.W, pady=(0, 10))
         
+        # Model yüklenirken gösterilen ilerleme göstergesi
+        self.load_progress = ttk.Progressbar(model_card, mode='indeterminate', length=280)
+
+        # Çıkarım arka ucu seçimi (auto: .onnx uzantısı ONNX Runtime ile çalışır)
+        backend_row = tk.Frame(model_card, bg=self.colors['bg_card'])
+        backend_row.pack(fill=tk.X, pady=(0, 10))
+
+        backend_label = tk.Label(
+            backend_row,
+            text="Arka uç:",
+            bg=self.colors['bg_card'],
+            font=('Segoe UI', 10),
+            fg=self.colors['text_secondary']
+        )
+        backend_label.pack(side=tk.LEFT)
+
+        self.backend_var = tk.StringVar(value='auto')
+        backend_combo = ttk.Combobox(
+            backend_row,
+            textvariable=self.backend_var,
+            values=BACKENDS,
+            state='readonly',
+            width=10
+        )
+        backend_combo.pack(side=tk.LEFT, padx=(10, 0))
+        backend_combo.bind('<<ComboboxSelected>>', self.on_backend_change)
+
         model_btn = tk.Button(
             model_card,
             text="📁 Model Seç",
@@ -169,6 +241,60 @@ class BanknotDetectionGUI:
         )
         model_btn.pack(fill=tk.X, pady=(0, 0))
         
+        # Kaskad - hızlı model her girişi sınıflandırır, düşük güvenliler seçili modele gider
+        self.cascade_var = tk.BooleanVar(value=False)
+        cascade_check = tk.Checkbutton(
+            model_card,
+            text="Kaskad: hızlı model → seçili model",
+            variable=self.cascade_var,
+            command=self.on_cascade_change,
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_secondary'],
+            selectcolor=self.colors['bg_hover'],
+            activebackground=self.colors['bg_card'],
+            activeforeground=self.colors['text_primary'],
+            font=('Segoe UI', 9),
+            anchor=tk.W
+        )
+        cascade_check.pack(fill=tk.X, pady=(8, 0))
+        
+        fast_model_btn = tk.Button(
+            model_card,
+            text="⚡ Hızlı Model Seç",
+            command=self.select_fast_model,
+            bg=self.colors['bg_hover'],
+            fg=self.colors['text_primary'],
+            font=('Segoe UI', 9),
+            relief=tk.FLAT,
+            padx=10,
+            pady=6,
+            cursor='hand2',
+            activebackground=self.colors['accent_hover'],
+            activeforeground='white',
+            bd=0
+        )
+        fast_model_btn.pack(fill=tk.X, pady=(4, 0))
+        
+        self.cascade_threshold_var = tk.DoubleVar(value=0.9)
+        cascade_scale = tk.Scale(
+            model_card,
+            label="Kaskad eşiği",
+            from_=0.5,
+            to=1.0,
+            resolution=0.01,
+            orient=tk.HORIZONTAL,
+            variable=self.cascade_threshold_var,
+            command=self.update_cascade_threshold,
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_secondary'],
+            highlightthickness=0,
+            troughcolor=self.colors['bg_hover'],
+            activebackground=self.colors['accent'],
+            font=('Segoe UI', 9),
+            length=280
+        )
+        cascade_scale.pack(fill=tk.X, pady=(4, 0))
+        
         # Güven eşiği - Modern card
         conf_card = tk.Frame(content_frame, bg=self.colors['bg_card'], relief=tk.FLAT)
         conf_card.pack(fill=tk.X, pady=(0, 20))
@@ -283,6 +409,73 @@ class BanknotDetectionGUI:
         )
         self.webcam_btn.pack(fill=tk.X, pady=(0, 0))
         
+        # Değişim kapısı - sahne değişmediğinde çıkarımı atla
+        self.gate_var = tk.BooleanVar(value=True)
+        gate_check = tk.Checkbutton(
+            action_card,
+            text="Sahne değişmediğinde tespiti atla",
+            variable=self.gate_var,
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_secondary'],
+            selectcolor=self.colors['bg_hover'],
+            activebackground=self.colors['bg_card'],
+            activeforeground=self.colors['text_primary'],
+            font=('Segoe UI', 9),
+            anchor=tk.W
+        )
+        gate_check.pack(fill=tk.X, pady=(8, 0))
+        
+        # Döşemeli mod - karedeki birden fazla banknotu ayrı kutularla bul
+        self.tiles_var = tk.BooleanVar(value=False)
+        tiles_check = tk.Checkbutton(
+            action_card,
+            text="Birden fazla banknot (döşemeli tespit)",
+            variable=self.tiles_var,
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_secondary'],
+            selectcolor=self.colors['bg_hover'],
+            activebackground=self.colors['bg_card'],
+            activeforeground=self.colors['text_primary'],
+            font=('Segoe UI', 9),
+            anchor=tk.W
+        )
+        tiles_check.pack(fill=tk.X, pady=(4, 0))
+        
+        # Hızlı çözme - büyük JPEG'ler modelin boyutuna küçültülmüş çözülür
+        # (tahminler tam çözmeye göre az farklı olabileceği için isteğe bağlı)
+        self.fast_decode_var = tk.BooleanVar(value=False)
+        fast_decode_check = tk.Checkbutton(
+            action_card,
+            text="Hızlı çözme (büyük JPEG resimler)",
+            variable=self.fast_decode_var,
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_secondary'],
+            selectcolor=self.colors['bg_hover'],
+            activebackground=self.colors['bg_card'],
+            activeforeground=self.colors['text_primary'],
+            font=('Segoe UI', 9),
+            anchor=tk.W
+        )
+        fast_decode_check.pack(fill=tk.X, pady=(4, 0))
+        
+        # Aşama gecikmeleri, düşürülen kareler ve bellek
+        stats_btn = tk.Button(
+            action_card,
+            text="📊 İstatistikler",
+            command=self.open_stats_panel,
+            bg=self.colors['bg_hover'],
+            fg=self.colors['text_primary'],
+            font=('Segoe UI', 9),
+            relief=tk.FLAT,
+            padx=10,
+            pady=6,
+            cursor='hand2',
+            activebackground=self.colors['border'],
+            activeforeground=self.colors['text_primary'],
+            bd=0
+        )
+        stats_btn.pack(fill=tk.X, pady=(8, 0))
+        
         # Sonuçlar - Modern card
         result_card = tk.Frame(content_frame, bg=self.colors['bg_card'], relief=tk.FLAT)
         result_card.pack(fill=tk.BOTH, expand=True, pady=(0, 0))
@@ -369,70 +562,261 @@ class BanknotDetectionGUI:
             # Model'in class isimlerini al (örn: {0: '10', 1: '100', 2: '20', 3: '200', 4: '5', 5: '50'})
             model_names = self.model.names
             # Class isimlerine ' TL' ekle
-            CLASS_NAMES = {idx: f"{name} TL" for idx, name in model_names.items()}
+            CLASS_NAMES = {idx: display_name(model_names, idx) for idx in model_names}
     
     def check_model(self):
-        """Model dosyasının varlığını kontrol et"""
-        if os.path.exists(self.model_path):
-            try:
-                # Lazy import - PyTorch DLL hatası önlemek için
-                try:
-                    from ultralytics import YOLO
-                except OSError as e:
-                    if "DLL" in str(e) or "WinError" in str(e):
-                        self.model_label.config(
-                            text="Model: ✗ PyTorch Hatası\nDLL yüklenemedi",
-                            fg='red'
-                        )
-                        self.update_status(
-                            "PyTorch yüklenemedi. Lütfen:\n"
-                            "1. Visual C++ Redistributables yükleyin\n"
-                            "2. pip install torch torchvision --index-url https://download.pytorch.org/whl/cpu"
-                        )
-                        messagebox.showerror(
-                            "PyTorch Hatası",
-                            "PyTorch kütüphanesi yüklenemedi.\n\n"
-                            "Çözüm:\n"
-                            "1. Visual C++ Redistributables'ı yükleyin\n"
-                            "2. PyTorch'u yeniden kurun:\n"
-                            "   pip install torch torchvision --index-url https://download.pytorch.org/whl/cpu\n"
-                            "3. Veya CPU-only versiyonu kullanın"
-                        )
-                        return
-                    raise
-                
-                self.model = YOLO(self.model_path)
-                # Model'den class isimlerini al ve güncelle
-                self.update_class_names_from_model()
-                self.model_label.config(
-                    text=f"Model: ✓ Yüklendi\n{Path(self.model_path).name}",
-                    fg=self.colors['success']
-                )
-                self.update_status("Model başarıyla yüklendi")
-            except Exception as e:
-                self.model_label.config(
-                    text=f"Model: ✗ Hata\n{str(e)[:30]}...",
-                    fg=self.colors['danger']
-                )
-                self.update_status(f"Model yükleme hatası: {str(e)}")
-        else:
+        """Model dosyasını kontrol et ve kayıt defterinden al ya da arka planda yükle"""
+        if not os.path.exists(self.model_path):
             self.model_label.config(
                 text=f"Model: ✗ Bulunamadı\n{Path(self.model_path).name if len(self.model_path) < 40 else 'Model yolu çok uzun'}",
                 fg=self.colors['danger']
             )
             self.update_status("Model dosyası bulunamadı. Lütfen model seçin veya eğitin.")
+            return
+        
+        backend = resolve_backend(self.model_path, self.backend_var.get())
+        fast_model_path = self.fast_model_path if self.cascade_var.get() else None
+        key = model_key(self.model_path, backend, fast_model_path)
+        # Yükleme sürerken model değiştirilirse eski yüklemenin sonucu devreye alınmaz
+        self.load_generation += 1
+        generation = self.load_generation
+        
+        model = self.registry.get(key)
+        if model is not None:
+            # Bellekteki model anında devreye alınır
+            self.activate_model(key, model, backend)
+            self.update_status("Model bellekten alındı ✓")
+            return
+        
+        # Önceki model yükleme bitene kadar çalışmaya devam eder (webcam durmaz)
+        if self.model is None:
+            self.model_ready.clear()
+        self.model_loading = True
+        self.show_load_progress(f"{Path(self.model_path).name} ({backend})")
+        self.update_status("Model yükleniyor...")
+        
+        # Yol burada yakalanır; yükleme sürerken seçilen yeni model bu anahtara yüklenmez
+        model_path = self.model_path
+        threshold = self.cascade_threshold_var.get()
+        future = self.registry.load_async(
+            key, lambda: self.load_and_warm_up(generation, model_path, backend, fast_model_path, threshold))
+        future.add_done_callback(
+            lambda f: self.root.after(0, lambda: self.on_load_done(generation, key, backend, f)))
+    
+    def load_and_warm_up(self, generation, model_path, backend, fast_model_path, threshold):
+        """Model yükleme ve ısındırma (kayıt defterinin yükleyici thread'inde çalışır)"""
+        # Lazy import - PyTorch DLL hatası önlemek için (ONNX arka ucu torch kullanmaz)
+        if backend == 'torch':
+            self.root.after(0, lambda: self.update_load_stage(generation, "PyTorch içe aktarılıyor..."))
+            from ultralytics import YOLO
+        
+        self.root.after(0, lambda: self.update_load_stage(generation, "Model yükleniyor..."))
+        load_start = time.perf_counter()
+        model = self.build_model(model_path, backend, fast_model_path, threshold)
+        load_seconds = time.perf_counter() - load_start
+        
+        self.root.after(0, lambda: self.update_load_stage(generation, "Model ısındırılıyor..."))
+        warmup_start = time.perf_counter()
+        self.warm_up(model)
+        warmup_seconds = time.perf_counter() - warmup_start
+        
+        METRICS.set('model_load_seconds', round(load_seconds, 3))
+        METRICS.set('model_warmup_seconds', round(warmup_seconds, 3))
+        if 'startup_model_load_seconds' not in METRICS.gauges:
+            METRICS.set('startup_model_load_seconds', round(load_seconds, 3))
+            METRICS.set('startup_warmup_seconds', round(warmup_seconds, 3))
+        return model
+    
+    def warm_up(self, model):
+        """
+        Sahte bir kareyle çıkarım yaparak ilk gerçek tespitin de kararlı
+        hızda çalışmasını sağlar (bellek ayırma, çekirdek seçimi vb. burada olur).
+        Resimler modelin varsayılan boyutunda, webcam LIVE_IMGSZ boyutunda çalışır.
+        """
+        dummy = np.zeros((480, 640, 3), dtype=np.uint8)
+        # Tespit (detect) modelleri olasılık üretmez; Results yolu ile ısındırılır
+        classify = getattr(model, 'task', 'classify') == 'classify'
+        for imgsz in (None, LIVE_IMGSZ):
+            if classify:
+                predict_arrays(model, [dummy], imgsz)
+            else:
+                model(dummy, verbose=False, **({'imgsz': imgsz} if imgsz else {}))
+        if isinstance(model, CascadeClassifier):
+            # Isındırma çağrıları kaskad istatistiklerine sayılmaz
+            model.stats = {'inputs': 0, 'escalated': 0, 'seconds': 0.0}
+    
+    def show_load_progress(self, model_text):
+        """Model etiketini ve ilerleme göstergesini yükleme durumuna getir"""
+        if self.model is not None:
+            model_text += "\n(yüklenene kadar önceki model kullanılır)"
+        self.model_label.config(text=f"Model: ⏳ Yükleniyor...\n{model_text}", fg=self.colors['accent'])
+        self.load_progress.pack(fill=tk.X, pady=(0, 10), after=self.model_label)
+        self.load_progress.start(12)
+    
+    def hide_load_progress(self):
+        self.load_progress.stop()
+        self.load_progress.pack_forget()
+    
+    def update_load_stage(self, generation, message):
+        """Yükleme aşamasını durum çubuğunda göster"""
+        if generation == self.load_generation:
+            self.update_status(message)
+    
+    def finish_loading(self):
+        """Yüklemeyi sonlandır ve bekleyen tespit thread'lerini serbest bırak"""
+        self.model_loading = False
+        self.model_ready.set()
+        self.hide_load_progress()
+    
+    def activate_model(self, key, model, backend):
+        """
+        Modeli etkin model yap (Tk döngüsünde çalışır).
+        Tespit thread'leri self.model'i kare başında bir kez okur; atama tek
+        adımda olduğu için geçiş iki kare arasında gerçekleşir.
+        """
+        self.registry.pin(key)
+        if isinstance(model, CascadeClassifier):
+            model.threshold = self.cascade_threshold_var.get()
+        self.model = model
+        # Model'den class isimlerini al ve güncelle
+        self.update_class_names_from_model()
+        self.finish_loading()
+        METRICS.set('resident_models', len(self.registry.sizes()))
+        METRICS.set('resident_models_mb', round(self.registry.total_mb, 1))
+        model_text = Path(self.model_path).name
+        if isinstance(model, CascadeClassifier):
+            model_text = f"{Path(self.fast_model_path).name} → {model_text}"
+        self.model_label.config(
+            text=f"Model: ✓ Yüklendi\n{model_text} ({backend})",
+            fg=self.colors['success']
+        )
+    
+    def on_load_done(self, generation, key, backend, future):
+        """Arka plan yüklemesinin sonucunu işle (Tk döngüsünde çalışır)"""
+        if generation != self.load_generation:
+            # Kullanıcı bu arada başka model seçti; yüklenen model kayıt defterinde kalır
+            return
+        error = future.exception()
+        if error is None:
+            self.activate_model(key, future.result(), backend)
+            self.update_status(
+                f"Model başarıyla yüklendi (yükleme {METRICS.gauges['model_load_seconds']:.1f} sn, "
+                f"ısındırma {METRICS.gauges['model_warmup_seconds']:.1f} sn)"
+            )
+        elif isinstance(error, OSError) and ("DLL" in str(error) or "WinError" in str(error)):
+            self.on_torch_dll_error()
+        else:
+            self.on_model_failed(str(error))
+    
+    def on_model_failed(self, error):
+        """Yükleme hatasını göster (Tk döngüsünde çalışır)"""
+        self.finish_loading()
+        self.model_label.config(
+            text=f"Model: ✗ Hata\n{error[:30]}...",
+            fg=self.colors['danger']
+        )
+        self.update_status(f"Model yükleme hatası: {error}")
+    
+    def on_torch_dll_error(self):
+        """PyTorch DLL hatası için çözüm önerilerini göster (Tk döngüsünde çalışır)"""
+        self.finish_loading()
+        self.model_label.config(
+            text="Model: ✗ PyTorch Hatası\nDLL yüklenemedi",
+            fg='red'
+        )
+        self.update_status(
+            "PyTorch yüklenemedi. Lütfen:\n"
+            "1. Visual C++ Redistributables yükleyin\n"
+            "2. pip install torch torchvision --index-url https://download.pytorch.org/whl/cpu"
+        )
+        messagebox.showerror(
+            "PyTorch Hatası",
+            "PyTorch kütüphanesi yüklenemedi.\n\n"
+            "Çözüm:\n"
+            "1. Visual C++ Redistributables'ı yükleyin\n"
+            "2. PyTorch'u yeniden kurun:\n"
+            "   pip install torch torchvision --index-url https://download.pytorch.org/whl/cpu\n"
+            "3. Veya CPU-only versiyonu kullanın"
+        )
+    
+    def current_model(self):
+        """
+        Etkin modeli döndür (tespit thread'lerinden çağrılır).
+        Henüz hiç model yoksa ilk yüklemenin bitmesini bekler; model asla
+        thread içinde yeniden yüklenmez.
+        """
+        self.model_ready.wait()
+        return self.model
+    
+    def record_window_shown(self):
+        """Pencerenin ilk çizildiği anı açılış metriği olarak kaydet"""
+        self.root.update_idletasks()
+        METRICS.set('startup_window_seconds', round(time.perf_counter() - self.start_time, 3))
+    
+    def mark_first_result(self):
+        """İlk tespit sonucunun gösterildiği anı açılış metriği olarak kaydet"""
+        if self.first_result_recorded:
+            return
+        self.first_result_recorded = True
+        METRICS.set('startup_first_result_seconds', round(time.perf_counter() - self.start_time, 3))
+    
+    def build_model(self, model_path, backend, fast_model_path=None, threshold=0.9):
+        """Verilen modeli veya hızlı model verildiyse hızlı model → model kaskadını yükle"""
+        if fast_model_path:
+            return CascadeClassifier(fast_model_path, model_path,
+                                     threshold=threshold, backend=backend)
+        # Tek model numpy API'si ile sarılır (Results nesnesi üretmez)
+        return load_classifier(model_path, backend)
+    
+    def get_cache(self):
+        """Geçerli model için tahmin önbelleğini döndür (model değiştiyse yenisini aç)"""
+        path = model_file(self.model_path, self.backend_var.get())
+        if (self.cache is None or self.cache.model_path != os.path.abspath(path)
+                or self.cache.fingerprint != model_fingerprint(path)):
+            if self.cache is not None:
+                self.cache.close()
+            # GUI tek tek resim işler; her kayıt hemen diske yazılır
+            self.cache = PredictionCache(path, commit_every=1)
+        return self.cache
     
     def select_model(self):
         """Model dosyası seç"""
         file_path = filedialog.askopenfilename(
             title="Model Dosyası Seç",
-            filetypes=[("PyTorch Model", "*.pt"), ("Tüm Dosyalar", "*.*")]
+            filetypes=[("Model Dosyaları", "*.pt *.onnx"), ("PyTorch Model", "*.pt"),
+                       ("ONNX Model", "*.onnx"), ("Tüm Dosyalar", "*.*")]
         )
         if file_path:
             self.model_path = file_path
-            self.model = None  # Eski modeli temizle
             self.check_model()
     
+    def select_fast_model(self):
+        """Kaskadın ilk (hızlı) aşama modelini seç"""
+        file_path = filedialog.askopenfilename(
+            title="Hızlı Model Seç",
+            filetypes=[("Model Dosyaları", "*.pt *.onnx"), ("Tüm Dosyalar", "*.*")]
+        )
+        if file_path:
+            self.fast_model_path = file_path
+            self.cascade_var.set(True)
+            self.on_cascade_change()
+    
+    def on_cascade_change(self):
+        """Kaskad açılıp kapandığında modeli yeniden yükle"""
+        if self.cascade_var.get() and not self.fast_model_path:
+            self.update_status("Kaskad için önce hızlı modeli seçin")
+            return
+        self.check_model()
+    
+    def update_cascade_threshold(self, value):
+        """Kaskad eşiği - model yeniden yüklenmeden uygulanır"""
+        if isinstance(self.model, CascadeClassifier):
+            self.model.threshold = float(value)
+    
+    def on_backend_change(self, event=None):
+        """Arka uç değiştiğinde modeli yeniden yükle"""
+        self.check_model()
+    
     def update_conf_label(self, value):
         """Güven eşiği etiketi güncelle"""
         conf_value = float(value)
@@ -470,9 +854,37 @@ class BanknotDetectionGUI:
         self.result_text.insert(tk.END, text)
         self.result_text.see(tk.END)
     
-    def display_image(self, image_path=None, image_array=None):
+    def update_result_text_live(self, text):
+        """Canlı kaynaklar için sonuç metnini en fazla TEXT_REFRESH_HZ hızında güncelle"""
+        now = time.perf_counter()
+        if text == self.last_result_text or now - self.last_text_update < 1.0 / TEXT_REFRESH_HZ:
+            return
+        self.last_text_update = now
+        self.last_result_text = text
+        self.update_result_text(text)
+    
+    def display_size(self, img_width, img_height):
+        """Görüntünün label'a sığan (büyütmesiz) boyutunu hesapla"""
+        label_width = self.image_label.winfo_width()
+        label_height = self.image_label.winfo_height()
+        
+        # Eğer label henüz render edilmediyse varsayılan değerler kullan
+        if label_width <= 1:
+            label_width = 600
+        if label_height <= 1:
+            label_height = 400
+        
+        # Orijinal boyut oranını koru
+        ratio = min(label_width / img_width, label_height / img_height, 1.0)  # Büyütme yok, sadece küçültme
+        return max(1, int(img_width * ratio)), max(1, int(img_height * ratio))
+    
+    def display_image(self, image_path=None, image_array=None, live=False):
         """Görüntüyü göster"""
         try:
+            if live and image_array is not None and len(image_array.shape) == 3:
+                self.display_live_frame(image_array)
+                return
+            
             if image_array is not None:
                 # OpenCV BGR -> RGB
                 if len(image_array.shape) == 3:
@@ -486,21 +898,7 @@ class BanknotDetectionGUI:
                 return
             
             # Görüntüyü label boyutuna göre ölçekle
-            label_width = self.image_label.winfo_width()
-            label_height = self.image_label.winfo_height()
-            
-            # Eğer label henüz render edilmediyse varsayılan değerler kullan
-            if label_width <= 1:
-                label_width = 600
-            if label_height <= 1:
-                label_height = 400
-            
-            # Orijinal boyut oranını koru
-            img_width, img_height = pil_image.size
-            ratio = min(label_width / img_width, label_height / img_height, 1.0)  # Büyütme yok, sadece küçültme
-            
-            new_width = int(img_width * ratio)
-            new_height = int(img_height * ratio)
+            new_width, new_height = self.display_size(*pil_image.size)
             
             # Yüksek kaliteli resize
             pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
@@ -509,12 +907,46 @@ class BanknotDetectionGUI:
             photo = ImageTk.PhotoImage(pil_image)
             self.image_label.config(image=photo, text="", bg=self.colors['bg_hover'])
             self.image_label.image = photo  # Referansı sakla (garbage collection önleme)
+            # Statik görüntü canlı PhotoImage'ın yerini aldı
+            self.live_photo = None
         except Exception as e:
             messagebox.showerror("Hata", f"Görüntü gösterilirken hata: {str(e)}")
     
+    def display_live_frame(self, frame_bgr):
+        """
+        Canlı kareler için düşük maliyetli gösterim.
+        Ölçekleme ve renk dönüşümü önceden ayrılmış tamponlara yapılır,
+        tek bir PhotoImage yeniden kullanılır.
+        """
+        img_height, img_width = frame_bgr.shape[:2]
+        new_width, new_height = self.display_size(img_width, img_height)
+        
+        # Boyut değiştiğinde tamponları yeniden ayır
+        if self.live_rgb is None or self.live_rgb.shape[:2] != (new_height, new_width):
+            self.live_rgb = np.empty((new_height, new_width, 3), dtype=np.uint8)
+            self.live_resized = np.empty((new_height, new_width, 3), dtype=np.uint8)
+            self.live_photo = None
+        
+        # Ucuz ölçekleme (INTER_LINEAR) ve BGR -> RGB, kopya oluşturmadan
+        if (new_width, new_height) != (img_width, img_height):
+            cv2.resize(frame_bgr, (new_width, new_height), dst=self.live_resized,
+                       interpolation=cv2.INTER_LINEAR)
+            cv2.cvtColor(self.live_resized, cv2.COLOR_BGR2RGB, dst=self.live_rgb)
+        else:
+            cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self.live_rgb)
+        pil_image = Image.frombuffer('RGB', (new_width, new_height), self.live_rgb, 'raw', 'RGB', 0, 1)
+        
+        if self.live_photo is None:
+            self.live_photo = ImageTk.PhotoImage(pil_image)
+            self.image_label.config(image=self.live_photo, text="", bg=self.colors['bg_hover'])
+            self.image_label.image = self.live_photo  # Referansı sakla (garbage collection önleme)
+        else:
+            # Mevcut PhotoImage'ın piksellerini yerinde güncelle
+            self.live_photo.paste(pil_image)
+    
     def select_and_detect_image(self):
         """Resim seç ve tespit et"""
-        if not self.model:
+        if not self.model and not self.model_loading:
             messagebox.showerror("Hata", "Lütfen önce bir model yükleyin!")
             return
         
@@ -528,36 +960,98 @@ class BanknotDetectionGUI:
         
         if file_path:
             self.update_status("Resim işleniyor...")
-            # Thread'de çalıştır
-            thread = threading.Thread(target=self.detect_image_thread, args=(file_path,))
+            # Thread'de çalıştır - ekran boyutu Tk thread'inde okunur
+            display_side = max(self.image_label.winfo_width(), self.image_label.winfo_height())
+            thread = threading.Thread(target=self.detect_image_thread, args=(file_path, display_side))
             thread.daemon = True
             thread.start()
     
-    def detect_image_thread(self, image_path):
+    @staticmethod
+    def tiled_results(notes, total):
+        """Döşemeli tespit sonuçlarını detected_results listesi ve sonuç metnine çevirir"""
+        detected_results = [
+            {'name': f"{note['name']} TL", 'conf': note['conf'], 'bbox': note['bbox']}
+            for note in notes
+        ]
+        if not detected_results:
+            return detected_results, "⚠ Hiç banknot tespit edilmedi.\n"
+        text = f"✅ {len(detected_results)} adet banknot tespit edildi:\n\n"
+        for i, det in enumerate(detected_results):
+            x1, y1, x2, y2 = det['bbox']
+            text += (
+                f"{i+1}. {det['name']} | Güven: {det['conf']:.2%} | "
+                f"Kutu: ({x1}, {y1}) - ({x2}, {y2})\n"
+            )
+        text += f"\n💰 Toplam: {total} TL\n"
+        return detected_results, text
+    
+    def detect_image_thread(self, image_path, display_side=0):
         """Resim tespiti (thread'de çalışır) - Basit ve verimli yaklaşım"""
         try:
-            if not self.model:
-                # Model yoksa lazy load dene
-                try:
-                    from ultralytics import YOLO
-                    self.model = YOLO(self.model_path)
-                    # Model'den class isimlerini güncelle
-                    self.update_class_names_from_model()
-                except Exception as e:
-                    error_msg = f"Model yüklenemedi: {str(e)}"
-                    self.root.after(0, lambda: messagebox.showerror("Hata", error_msg))
-                    self.root.after(0, lambda: self.update_status("Model yükleme hatası"))
-                    return
-            
-            # Görüntüyü yükle
-            img = cv2.imread(image_path)
+            # Model tespit boyunca bir kez okunur; bu sırada yeni model devreye alınabilir
+            model = self.current_model()
+            if model is None:
+                self.root.after(0, lambda: messagebox.showerror("Hata", "Model yüklenemedi!"))
+                self.root.after(0, lambda: self.update_status("Model yükleme hatası"))
+                return
+            
+            # Görüntüyü yükle - baytlar önbellek anahtarı için de kullanılır. Hızlı çözmede
+            # resim kaydedilmediği için model ve ekran boyutuna küçültülmüş çözülür
+            # (döşemeli modda varsayılan 2x3 ızgaranın her parçası modelin boyutunda kalır)
+            min_side = None
+            if self.fast_decode_var.get():
+                min_side = decode_min_side(model, scale=3 if self.tiles_var.get() else 1)
+                if min_side is not None:
+                    min_side = max(min_side, display_side)
+            with METRICS.time('decode'):
+                image_bytes = Path(image_path).read_bytes()
+                img = decode_image(image_bytes, min_side)
             if img is None:
                 error_msg = "Görüntü yüklenemedi!"
                 self.root.after(0, lambda msg=error_msg: messagebox.showerror("Hata", msg))
                 return
             
-            # Tespit yap - Modelin kendi yeteneklerini kullan
-            results = self.model(image_path, conf=self.conf_var.get(), verbose=False)
+            if self.tiles_var.get():
+                # Tüm parçalar tek batch'te sınıflandırılır; önbellek kullanılmaz
+                with METRICS.time('inference'):
+                    notes, total = detect_notes(model, img)
+                annotated_img = draw_notes(img, notes, total)
+                detected_results, tiles_text = self.tiled_results(notes, total)
+                result_text = f"📷 Resim: {Path(image_path).name}\n"
+                result_text += "=" * 50 + "\n\n" + tiles_text
+                self.current_image = annotated_img
+                self.root.after(0, lambda img=annotated_img: self.display_image(image_array=img))
+                self.root.after(0, lambda txt=result_text: self.update_result_text(txt))
+                self.root.after(0, self.mark_first_result)
+                status_msg = f"Tespit tamamlandı! - {len(detected_results)} banknot, toplam {total} TL"
+                self.root.after(0, lambda msg=status_msg: self.update_status(msg))
+                return
+            
+            # Aynı resim aynı modelle daha önce işlendiyse önbellekten al
+            # (kaskad sonuçları karar veren aşamayı içerdiği için önbelleğe alınmaz)
+            cascade = model if isinstance(model, CascadeClassifier) else None
+            cache = None if cascade else self.get_cache()
+            # Küçültülmüş çözmenin sonuçları tam çözmeninkilerden ayrı saklanır
+            decode = 'fast' if min_side else 'full'
+            if cache is not None:
+                cache.bind(model.names, model_imgsz(model))
+            cached_probs = cache.get(image_bytes, decode) if cache is not None else None
+            if cached_probs is not None:
+                results = [ArrayResult(img, image_path, model.names, cached_probs)]
+            else:
+                # Tespit yap - Modelin kendi yeteneklerini kullan
+                with METRICS.time('inference'):
+                    if isinstance(model, BanknoteClassifier):
+                        # Olasılıklar doğrudan numpy olarak alınır; görüntü kopyalanmaz
+                        _, _, probs = model.predict(img)
+                        results = [ArrayResult(img, image_path, model.names, probs)]
+                    else:
+                        results = model(img, conf=self.conf_var.get(), verbose=False)
+                for result in results:
+                    if cache is not None and getattr(result, 'probs', None) is not None:
+                        cache.put(image_bytes, to_numpy(result.probs.data), decode)
+            
+            postprocess_start = time.perf_counter()
             
             # Sonuç metni başlangıcı
             result_text = f"📷 Resim: {Path(image_path).name}\n"
@@ -607,7 +1101,12 @@ class BanknotDetectionGUI:
                     
                     if top1_conf >= self.conf_var.get():
                         result_text += f"✅ Tespit Edilen: {name}\n"
-                        result_text += f"Güven Skoru: {top1_conf:.2%}\n\n"
+                        result_text += f"Güven Skoru: {top1_conf:.2%}\n"
+                        stage = getattr(result, 'stage', None)
+                        if stage is not None:
+                            result_text += (f"Karar Veren Aşama: {STAGE_NAMES.get(stage, stage)} "
+                                            f"(ilk aşama: {result.fast_conf:.2%})\n")
+                        result_text += "\n"
                         
                         # Tüm görüntüyü kutu içine al
                         h, w = img.shape[:2]
@@ -629,10 +1128,17 @@ class BanknotDetectionGUI:
                         result_text += "⚠ Hiç banknot tespit edilmedi.\n"
             
             self.current_image = annotated_img
+            METRICS.observe('postprocess', time.perf_counter() - postprocess_start)
+            METRICS.inc('images')
+            if cache is not None:
+                result_text += f"\n💾 {cache.summary()}\n"
+            else:
+                result_text += f"\n🪜 {cascade.summary()}\n"
             
             # UI'ı güncelle
             self.root.after(0, lambda img=annotated_img: self.display_image(image_array=img))
             self.root.after(0, lambda txt=result_text: self.update_result_text(txt))
+            self.root.after(0, self.mark_first_result)
             status_msg = (
                 f"Tespit tamamlandı! - {len(detected_results)} banknot"
                 if len(detected_results) > 0 else "Tespit tamamlandı fakat banknot bulunamadı"
@@ -645,7 +1151,7 @@ class BanknotDetectionGUI:
     
     def select_and_detect_video(self):
         """Video seç ve tespit et"""
-        if not self.model:
+        if not self.model and not self.model_loading:
             messagebox.showerror("Hata", "Lütfen önce bir model yükleyin!")
             return
         
@@ -689,17 +1195,12 @@ class BanknotDetectionGUI:
     def detect_video_thread(self, video_path):
         """Video tespiti (thread'de çalışır)"""
         try:
-            if not self.model:
-                try:
-                    from ultralytics import YOLO
-                    self.model = YOLO(self.model_path)
-                    # Model'den class isimlerini güncelle
-                    self.update_class_names_from_model()
-                except Exception as e:
-                    error_msg = f"Model yüklenemedi: {str(e)}"
-                    self.root.after(0, lambda: messagebox.showerror("Hata", error_msg))
-                    self.root.after(0, lambda: self.update_status("Model yükleme hatası"))
-                    return
+            # Model tespit boyunca bir kez okunur; bu sırada yeni model devreye alınabilir
+            model = self.current_model()
+            if model is None:
+                self.root.after(0, lambda: messagebox.showerror("Hata", "Model yüklenemedi!"))
+                self.root.after(0, lambda: self.update_status("Model yükleme hatası"))
+                return
             
             # Video bilgilerini al
             cap = cv2.VideoCapture(video_path)
@@ -720,21 +1221,60 @@ class BanknotDetectionGUI:
             
             self.root.after(0, lambda: self.update_result_text(result_text))
             
-            # Video işleme
-            results = self.model(video_path, conf=self.conf_var.get(), save=True, verbose=False)
+            # Video işleme - kareler akış halinde işlenir, sonuçlar biriktirilmez
+            # İşaretlenmiş video ayrı thread'de kodlanır; kodlama çıkarımla örtüşür
+            stem = Path(video_path).stem
+            log_path = f"predictions_{stem}.csv"
+            timeline_path = f"timeline_{stem}.csv"
+            class_counts = {}
+            last_update = time.time()
+            with PredictionLog(log_path, fps=fps) as log, PredictionTimeline(timeline_path, fps=fps) as timeline, \
+                    AnnotatedVideoWriter(f"detected_{stem}.mp4", fps) as writer:
+                for frame_idx, result in stream_video_predictions(model, video_path, self.conf_var.get()):
+                    probs = result.probs
+                    top1_idx = probs.top1
+                    top1_conf = probs.top1conf.item()
+                    name = CLASS_NAMES.get(top1_idx, f'Class {top1_idx}')
+                    log.write(frame_idx, top1_idx, name, top1_conf, getattr(result, 'stage', None))
+                    timeline.write(frame_idx, top1_idx, name, top1_conf)
+                    writer.write(result.orig_img, f"{name}: {top1_conf:.1%}")
+                    class_counts[name] = class_counts.get(name, 0) + 1
+                    if frame_idx == 0:
+                        self.root.after(0, self.mark_first_result)
+                    
+                    # İlerlemeyi saniyede bir göster
+                    if time.time() - last_update >= 1.0:
+                        last_update = time.time()
+                        progress = f"⏳ İşlenen kare: {frame_idx + 1:,} / {total_frames:,}\n"
+                        self.root.after(0, lambda txt=result_text + progress: self.update_result_text(txt))
             
             result_text += "\n" + "=" * 50 + "\n"
             result_text += "✅ Video işleme tamamlandı!\n\n"
-            result_text += "💾 Sonuçlar şu klasöre kaydedildi:\n"
-            result_text += "   runs/classify/predict/\n"
+            result_text += f"🎬 İşlenen kare: {log.rows:,}\n"
+            for name, count in sorted(class_counts.items(), key=lambda item: -item[1]):
+                result_text += f"   {name}: {count:,} kare\n"
+            if isinstance(model, CascadeClassifier):
+                result_text += f"\n🪜 {model.summary()}\n"
+            # Son karelerdeki kodlama hataları ancak yazıcı kapanınca görülür
+            if writer.error is not None:
+                result_text += f"\n⚠️ İşaretlenmiş video kaydedilemedi: {writer.error}\n"
+            else:
+                result_text += f"\n💾 İşaretlenmiş video: {writer.path}\n"
+            result_text += f"   {writer.summary()}\n"
+            result_text += f"📝 Kare tahminleri: {log_path}\n"
+            result_text += f"🕒 Zaman çizelgesi: {timeline_path} ({timeline.segments:,} bölüm)\n"
             
             self.root.after(0, lambda: self.update_result_text(result_text))
             self.root.after(0, lambda: self.update_status("Video işleme tamamlandı!"))
-            self.root.after(0, lambda: messagebox.showinfo(
-                "Başarılı", 
-                f"Video işleme tamamlandı!\n\n"
-                f"Sonuçlar 'runs/classify/predict' klasörüne kaydedildi."
-            ))
+            if writer.error is not None:
+                error_msg = f"Video işlendi ancak işaretlenmiş video kaydedilemedi:\n{writer.error}"
+                self.root.after(0, lambda msg=error_msg: messagebox.showerror("Hata", msg))
+            else:
+                self.root.after(0, lambda: messagebox.showinfo(
+                    "Başarılı", 
+                    f"Video işleme tamamlandı!\n\n"
+                    f"İşaretlenmiş video '{writer.path}' olarak kaydedildi."
+                ))
             
             cap.release()
         except Exception as e:
@@ -744,7 +1284,7 @@ class BanknotDetectionGUI:
     
     def toggle_webcam(self):
         """Webcam'i başlat/durdur"""
-        if not self.model:
+        if not self.model and not self.model_loading:
             messagebox.showerror("Hata", "Lütfen önce bir model yükleyin!")
             return
         
@@ -759,56 +1299,117 @@ class BanknotDetectionGUI:
         if not self.cap.isOpened():
             messagebox.showerror("Hata", "Webcam açılamadı!")
             return
+        # Sürücü tamponunu küçült - eski kareler birikmesin
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         
         self.webcam_running = True
         self.webcam_btn.config(text="🛑 Webcam'i Durdur", bg=self.colors['danger'], activebackground=self.colors['danger_hover'])
         self.update_status("Webcam aktif - Çıkmak için 'Durdur' butonuna basın")
         
-        # Webcam thread'i başlat
-        thread = threading.Thread(target=self.webcam_loop)
-        thread.daemon = True
-        thread.start()
+        # Aşamalar arası tek elemanlı "yalnızca en yeni" tamponlar
+        self.frame_slot = LatestSlot()
+        self.render_slot = LatestSlot()
+        self.capture_meter = RateMeter()
+        self.inference_meter = RateMeter()
+        self.gate = ChangeGate()
+        
+        # Yakalama ve tespit thread'lerini başlat, çizimi Tk döngüsünde yap
+        for target in (self.capture_loop, self.webcam_loop):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+        self.root.after(15, self.render_loop)
     
     def stop_webcam(self):
         """Webcam'i durdur"""
         self.webcam_running = False
-        if self.cap:
-            self.cap.release()
+        # Kamera, yakalama thread'i tarafından kapatılır
+        self.frame_slot.close()
+        self.render_slot.close()
         self.webcam_btn.config(text="📹 Webcam'i Başlat", bg=self.colors['purple'])
         self.update_status("Webcam durduruldu")
+        self.live_photo = None
+        self.last_result_text = None
         self.image_label.config(image="", text="🖼️ Görüntü burada görüntülenecek\n\nResim seçin veya webcam'i başlatın", 
                                bg=self.colors['bg_hover'], fg=self.colors['text_muted'])
     
-    def webcam_loop(self):
-        """Webcam döngüsü - Her frame'de tespit"""
-        import time
-        frame_count = 0
-        start_time = time.time()
-        
+    def capture_loop(self):
+        """Yakalama aşaması - Kameradan okunan her kare tampona bırakılır"""
+        cap = self.cap
         while self.webcam_running:
-            ret, frame = self.cap.read()
+            ret, frame = cap.read()
             if not ret:
+                # Kamera çıkarıldı veya okunamıyor - webcam'i arayüz thread'inde durdur
+                self.root.after(0, lambda: self.on_camera_lost(cap))
                 break
-            
-            if not self.model:
-                try:
-                    from ultralytics import YOLO
-                    self.model = YOLO(self.model_path)
-                    # Model'den class isimlerini güncelle
-                    self.update_class_names_from_model()
-                except Exception as e:
-                    self.root.after(0, lambda: messagebox.showerror("Hata", f"Model yüklenemedi: {str(e)}"))
+            self.frame_slot.put(frame)
+            self.capture_meter.tick()
+            METRICS.inc('frames')
+        
+        self.frame_slot.close()
+        cap.release()
+    
+    def on_camera_lost(self, cap):
+        """Kare okunamadığında webcam'i durdur (yeni açılan oturumu etkilemez)"""
+        if self.webcam_running and self.cap is cap:
+            self.stop_webcam()
+            self.update_status("Kameradan kare okunamadı - webcam durduruldu")
+    
+    def webcam_loop(self):
+        """Tespit aşaması - Her seferinde en yeni kare üzerinde tespit"""
+        results = None
+        results_tiled = False
+        results_model = None
+        while self.webcam_running:
+            frame = self.frame_slot.get(timeout=0.1)
+            if frame is None:
+                # Yakalama thread'i bittiyse bekleme (boş döngü CPU'yu tüketir)
+                if self.frame_slot.closed:
                     break
+                continue
             
-            # Her frame'de tespit yap - Performans için imgsz parametresi kullan
-            # Görüntü boyutunu küçült (640x480 gibi) ama orijinal frame'i göster
-            results = self.model(frame, conf=self.conf_var.get(), verbose=False, imgsz=640)
+            # Model kare başında bir kez okunur - yeni model iki kare arasında devreye girer
+            model = self.current_model()
+            if model is None:
+                self.root.after(0, lambda: messagebox.showerror("Hata", "Model yüklenemedi!"))
+                break
+            
+            # Sahne değişmediyse önceki tahmini yeniden kullan (değişim kapısı). Önceki tahmin
+            # yoksa veya geçersizse kapı sıfırlanır; çıkarım yapılan kare kapının referansı olur
+            tiled = self.tiles_var.get()
+            if results is None or tiled != results_tiled or model is not results_model:
+                self.gate.reset()
+            if not self.gate_var.get() or self.gate.should_infer(frame):
+                inference_start = time.perf_counter()
+                if tiled:
+                    # Döşemeli mod - tüm parçalar tek ileri geçişte sınıflandırılır
+                    results = detect_notes(model, frame)
+                else:
+                    # Tespit yap - Performans için imgsz parametresi kullan
+                    # Görüntü boyutunu küçült (640x480 gibi) ama orijinal frame'i göster
+                    if isinstance(model, BanknoteClassifier):
+                        _, _, probs = model.predict(frame, imgsz=LIVE_IMGSZ)
+                        results = [ArrayResult(frame, None, model.names, probs)]
+                    else:
+                        results = model(frame, conf=self.conf_var.get(), verbose=False, imgsz=LIVE_IMGSZ)
+                METRICS.observe('inference', time.perf_counter() - inference_start)
+                results_tiled = tiled
+                results_model = model
+                self.inference_meter.tick()
+            else:
+                METRICS.inc('frames_skipped')
+            postprocess_start = time.perf_counter()
             
             # YOLO'nun kutulu görüntüsünü al
             annotated_frame = None
             detected_results = []
+            tiles_text = None
             
-            for result in results:
+            if results_tiled:
+                annotated_frame = draw_notes(frame, *results)
+                detected_results, tiles_text = self.tiled_results(*results)
+            
+            for result in ([] if results_tiled else results):
                 # Detection modeli kontrolü
                 if hasattr(result, 'boxes') and result.boxes is not None:
                     boxes = result.boxes
@@ -865,6 +1466,9 @@ class BanknotDetectionGUI:
                         color = (0, 255, 0)
                         cv2.rectangle(annotated_frame, (10, 10), (w-10, h-10), color, 3)
                         label = f"{name}: {top1_conf:.1%}"
+                        stage = getattr(result, 'stage', None)
+                        if stage is not None:
+                            label += f" [{STAGE_NAMES.get(stage, stage)}]"
                         label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.9, 2)
                         cv2.rectangle(annotated_frame, (10, 10), (10 + label_size[0] + 20, 10 + label_size[1] + 20), color, -1)
                         cv2.putText(annotated_frame, label, (20, 10 + label_size[1] + 10),
@@ -873,28 +1477,39 @@ class BanknotDetectionGUI:
             if annotated_frame is None:
                 annotated_frame = frame.copy()
             
-            # FPS hesapla
-            frame_count += 1
-            elapsed = time.time() - start_time
-            if elapsed > 0:
-                fps = frame_count / elapsed
-                fps_text = f"FPS: {fps:.1f}"
-            else:
-                fps_text = "FPS: --"
+            # Aşama bazlı FPS ve düşürülen kare sayıları
+            fps_text = (
+                f"Kamera: {self.capture_meter.rate():.1f} FPS | "
+                f"Tespit: {self.inference_meter.rate():.1f} FPS"
+            )
+            drop_text = (
+                f"Düşürülen kare - tespit: {self.frame_slot.dropped:,} | "
+                f"çizim: {self.render_slot.dropped:,}"
+            )
+            gate_text = (
+                f"Atlanan çıkarım: {self.gate.skip_ratio:.1%} "
+                f"(fark: {self.gate.last_score:.1f})"
+            )
             
             # Sonuç metni
             result_text = f"📹 Webcam - Canlı Tespit\n"
             result_text += "=" * 50 + "\n\n"
-            if len(detected_results) > 0:
-                result_text += f"⚡ {fps_text}\n\n"
+            result_text += f"⚡ {fps_text}\n"
+            result_text += f"🗑️ {drop_text}\n"
+            if self.gate_var.get():
+                result_text += f"💤 {gate_text}\n"
+            if isinstance(model, CascadeClassifier):
+                result_text += f"🪜 {model.summary()}\n"
+            if tiles_text is not None:
+                result_text += "\n" + tiles_text
+            elif len(detected_results) > 0:
+                result_text += "\n"
                 for i, det in enumerate(detected_results):
                     x1, y1, x2, y2 = det['bbox']
                     result_text += (
                         f"{i+1}. {det['name']} | Güven: {det['conf']:.2%} | "
                         f"Kutu: ({x1}, {y1}) - ({x2}, {y2})\n"
                     )
-            else:
-                result_text += f"⚡ {fps_text}\n"
             
             # FPS'i sağ alta yaz
             h, w = annotated_frame.shape[:2]
@@ -919,16 +1534,95 @@ class BanknotDetectionGUI:
                 cv2.LINE_AA
             )
             
-            # UI'ı güncelle
-            self.root.after(0, lambda img=annotated_frame: self.display_image(image_array=img))
-            self.root.after(0, lambda txt=result_text: self.update_result_text(txt))
+            METRICS.observe('postprocess', time.perf_counter() - postprocess_start)
+            METRICS.set('dropped_frames_detect', self.frame_slot.dropped)
+            METRICS.set('dropped_frames_render', self.render_slot.dropped)
+            
+            # Çizim aşamasına yalnızca en yeni sonucu bırak
+            self.render_slot.put((annotated_frame, result_text))
+    
+    def render_loop(self):
+        """Çizim aşaması - Tk döngüsünde en yeni sonucu gösterir"""
+        if not self.webcam_running:
+            return
+        
+        item = self.render_slot.get_nowait()
+        if item is not None:
+            annotated_frame, result_text = item
+            with METRICS.time('render'):
+                self.display_image(image_array=annotated_frame, live=True)
+                self.update_result_text_live(result_text)
+            self.mark_first_result()
+        
+        self.root.after(15, self.render_loop)
+    
+    def open_stats_panel(self):
+        """Aşama gecikmeleri, sayaçlar ve bellek için istatistik penceresini aç"""
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            return
+        
+        self.stats_window = tk.Toplevel(self.root)
+        self.stats_window.title("İstatistikler")
+        self.stats_window.configure(bg=self.colors['bg_card'])
+        self.stats_window.geometry("420x480")
+        
+        self.stats_label = tk.Label(
+            self.stats_window,
+            text="",
+            font=('Consolas', 10),
+            bg=self.colors['bg_card'],
+            fg=self.colors['text_primary'],
+            justify=tk.LEFT,
+            anchor=tk.NW
+        )
+        self.stats_label.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
         
-        if self.cap:
-            self.cap.release()
+        self.profile_btn = tk.Button(
+            self.stats_window,
+            text="🔥 Profili Başlat" if self.profiler is None else "💾 Profili Durdur ve Kaydet",
+            command=self.toggle_profiler,
+            bg=self.colors['bg_hover'],
+            fg=self.colors['text_primary'],
+            font=('Segoe UI', 9),
+            relief=tk.FLAT,
+            padx=10,
+            pady=6,
+            cursor='hand2',
+            bd=0
+        )
+        self.profile_btn.pack(fill=tk.X, padx=15, pady=(0, 15))
+        self.refresh_stats_panel()
+    
+    def refresh_stats_panel(self):
+        """İstatistik penceresini saniyede bir güncelle"""
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            self.stats_window = None
+            return
+        text = METRICS.summary() or "Henüz ölçüm yok"
+        text += f"\n\n{self.registry.summary()}"
+        if self.profiler is not None:
+            text += f"\n\nProfil: {self.profiler.samples:,} örnek"
+        self.stats_label.config(text=text)
+        self.root.after(1000, self.refresh_stats_panel)
+    
+    def toggle_profiler(self):
+        """Örnekleyen profilleyiciyi başlat veya durdurup katlanmış yığınları kaydet"""
+        if self.profiler is None:
+            self.profiler = SamplingProfiler().start()
+            self.profile_btn.config(text="💾 Profili Durdur ve Kaydet")
+            self.update_status("Profilleyici çalışıyor")
+            return
+        self.profiler.stop()
+        path = self.profiler.dump(f"profile_{time.strftime('%Y%m%d_%H%M%S')}.folded")
+        self.profiler = None
+        self.profile_btn.config(text="🔥 Profili Başlat")
+        self.update_status(f"Profil kaydedildi: {path}")
 
 def main():
+    start_time = time.perf_counter()
     root = tk.Tk()
-    app = BanknotDetectionGUI(root)
+    app = BanknotDetectionGUI(root, start_time)
     root.mainloop()
 
 if __name__ == '__main__':
@@ -0,0 +1,145 @@
+"""
+server.py için yerel yük üreteci.
+validation.txt (veya bir klasör) içindeki resimleri eşzamanlı bağlantılarla
+POST /predict uç noktasına gönderir; verim, gecikme yüzdelikleri ve doğruluğu
+ölçer, ardından sunucunun batch boyutu ve kuyruk derinliği histogramlarını yazdırır.
+
+Dosya adı pytest'in *_test.py desenine uymaz; test olarak toplanmaz.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from benchmark import summarize
+from quantize import read_split
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
+
+def load_images(source, source_dir='.'):
+    """Resim listesi dosyasından veya klasörden (bayt, beklenen sınıf) çiftleri okur."""
+    if os.path.isdir(source):
+        paths = [(p, None) for p in sorted(Path(source).rglob('*')) if p.suffix.lower() in IMAGE_EXTENSIONS]
+    else:
+        paths = [(path, class_name) for path, class_name, _ in read_split(source, source_dir)]
+    return [(Path(path).read_bytes(), class_name) for path, class_name in paths]
+
+def run_load(host, port, images, requests=500, concurrency=16):
+    """
+    `concurrency` kalıcı bağlantı üzerinden toplam `requests` istek gönderir.
+
+    Returns:
+        (gecikmeler ms, doğru sayısı, etiketli istek sayısı, hata sayısı, geçen süre s)
+    """
+    lock = threading.Lock()
+    state = {'next': 0, 'correct': 0, 'labelled': 0, 'errors': 0}
+    latencies = []
+
+    def worker():
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        while True:
+            with lock:
+                index = state['next']
+                if index >= requests:
+                    break
+                state['next'] += 1
+            body, expected = images[index % len(images)]
+            start = time.perf_counter()
+            try:
+                conn.request('POST', '/predict', body=body, headers={'Content-Type': 'application/octet-stream'})
+                response = conn.getresponse()
+                payload = json.loads(response.read())
+            except (OSError, http.client.HTTPException, ValueError):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=60)
+                with lock:
+                    state['errors'] += 1
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if response.status != 200:
+                    state['errors'] += 1
+                    continue
+                latencies.append(elapsed)
+                if expected is not None:
+                    state['labelled'] += 1
+                    state['correct'] += payload['class'] == expected
+        conn.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, concurrency))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, state['correct'], state['labelled'], state['errors'], time.perf_counter() - start
+
+def fetch_metrics(host, port):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request('GET', '/metrics')
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Banknot çıkarım sunucusu yük testi')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Sunucu adresi')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='Sunucu portu')
+    parser.add_argument('--images', type=str, default='validation.txt',
+                        help='Resim listesi dosyası veya resim klasörü')
+    parser.add_argument('--source-dir', type=str, default='.',
+                        help='Liste dosyasındaki resimlerin kök klasörü')
+    parser.add_argument('--requests', type=int, default=500,
+                        help='Gönderilecek toplam istek sayısı')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='Eşzamanlı bağlantı sayısı')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.images):
+        print(f"HATA: {args.images} bulunamadı!")
+        return 1
+    images = load_images(args.images, args.source_dir)
+    if not images:
+        print(f"HATA: {args.images} içinde resim bulunamadı")
+        return 1
+
+    try:
+        before = fetch_metrics(args.host, args.port)
+    except OSError:
+        print(f"HATA: Sunucuya bağlanılamadı: {args.host}:{args.port}")
+        print("Önce sunucuyu başlatın: python server.py")
+        return 1
+
+    print(f"{args.requests} istek, {args.concurrency} eşzamanlı bağlantı ({len(images)} farklı resim)...")
+    latencies, correct, labelled, errors, elapsed = run_load(args.host, args.port, images,
+                                                            args.requests, args.concurrency)
+    after = fetch_metrics(args.host, args.port)
+
+    stats = summarize(latencies)
+    print(f"\nVerim: {len(latencies) / elapsed:.1f} istek/sn ({len(latencies)} başarılı, {errors} hata, "
+          f"{elapsed:.2f} sn)")
+    if latencies:
+        print(f"Gecikme (ms): ort={stats['mean']:.1f} p50={stats['p50']:.1f} "
+              f"p95={stats['p95']:.1f} p99={stats['p99']:.1f}")
+    if labelled:
+        print(f"Doğruluk: {correct / labelled:.2%} ({correct}/{labelled})")
+
+    batches = after['batches'] - before['batches']
+    requests = after['requests'] - before['requests']
+    if batches:
+        print(f"Sunucu: {batches} batch, ortalama batch boyutu {requests / batches:.2f}")
+    print(f"Batch boyutu histogramı: {after['batch_size_histogram']}")
+    print(f"Kuyruk derinliği histogramı: {after['queue_depth_histogram']}")
+    return 0 if not errors else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
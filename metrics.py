@@ -0,0 +1,370 @@
+"""
+Çalışma zamanı metrikleri ve örnekleyen profilleyici.
+Aşama bazlı (decode, inference, postprocess, render) gecikme histogramları,
+sayaçlar (işlenen/düşürülen kare) ve tepe bellek kullanımını tutar; bunları
+Prometheus metin biçiminde dosyaya veya yerel bir HTTP uç noktasına yazar.
+SamplingProfiler sıcak döngünün yığınlarını örnekleyip flame graph araçlarının
+(flamegraph.pl, speedscope) okuyabildiği katlanmış (collapsed) biçimde kaydeder.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from video_stream import peak_rss_mb
+
+STAGES = ['decode', 'inference', 'postprocess', 'render']
+
+# Gecikme histogramı kova sınırları (saniye)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class Histogram:
+    """Sabit kovalı, Prometheus uyumlu (kümülatif) gecikme histogramı."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def merge(self, other):
+        """Aynı kovalı başka bir histogramın (örn. işçi sürecinden) gözlemlerini ekler."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q):
+        """Kova sınırlarından yaklaşık yüzdelik (saniye, bilinmiyorsa None)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+class Metrics:
+    """
+    Thread güvenli metrik kayıt defteri.
+
+    Sayaçlar yalnızca artar; göstergeler (gauge) son değeri tutar; histogramlar
+    aşama adına göre saklanır.
+    """
+
+    def __init__(self, prefix='banknot'):
+        self.prefix = prefix
+        self.counters = Counter()
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def set(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        """`with metrics.time('inference'):` bloğunun süresini kaydeder."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def wrap(self, stage, func):
+        """Fonksiyonun her çağrısının süresini kaydeden sarmalayıcı döndürür."""
+        def timed(*args, **kwargs):
+            with self.time(stage):
+                return func(*args, **kwargs)
+        return timed
+
+    def timed_iter(self, stage, iterable):
+        """Her öğenin üretilme süresini kaydederek iterable'ı dolaşır (örn. akış halinde çıkarım)."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(stage, time.perf_counter() - start)
+            yield item
+
+    def reset(self):
+        """Tüm sayaç, gösterge ve histogramları sıfırlar."""
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def merge(self, histograms, counters=None):
+        """
+        Başka bir süreçte toplanan histogram ve sayaçları ekler.
+
+        Args:
+            histograms: {aşama: Histogram} (işçinin METRICS.histograms sözlüğü)
+            counters: {isim: değer} (None: sayaç ekleme)
+        """
+        with self._lock:
+            for stage, other in histograms.items():
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = self.histograms[stage] = Histogram(other.buckets)
+                histogram.merge(other)
+            self.counters.update(counters or {})
+
+    def snapshot(self):
+        """Sayaç, gösterge ve aşama özetlerinin (ms) sözlüğü."""
+        peak = peak_rss_mb()
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'mean_ms': h.sum * 1000 / h.count if h.count else None,
+                    'p50_ms': h.quantile(0.5) * 1000 if h.count else None,
+                    'p95_ms': h.quantile(0.95) * 1000 if h.count else None
+                }
+                for stage, h in self.histograms.items()
+            }
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'stages': stages,
+                'peak_rss_mb': peak
+            }
+
+    def render_prometheus(self):
+        """Tüm metrikleri Prometheus metin biçiminde döndürür."""
+        p = self.prefix
+        lines = []
+        peak = peak_rss_mb()
+        with self._lock:
+            for name in sorted(self.counters):
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                lines.append(f"{p}_{name}_total {self.counters[name]}")
+            for name in sorted(self.gauges):
+                lines.append(f"# TYPE {p}_{name} gauge")
+                lines.append(f"{p}_{name} {self.gauges[name]}")
+            if self.histograms:
+                lines.append(f"# HELP {p}_stage_seconds Aşama başına gecikme")
+                lines.append(f"# TYPE {p}_stage_seconds histogram")
+            for stage in sorted(self.histograms):
+                h = self.histograms[stage]
+                for bound, total in h.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {total}')
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        if peak is not None:
+            lines.append(f"# TYPE {p}_peak_rss_bytes gauge")
+            lines.append(f"{p}_peak_rss_bytes {int(peak * 1024 * 1024)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Metrikleri dosyaya atomik olarak yazar (node_exporter textfile toplayıcısı için)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        """Aşama başına ortalama/p95 gecikmenin kısa metin özeti."""
+        snap = self.snapshot()
+        lines = []
+        for stage in STAGES + sorted(set(snap['stages']) - set(STAGES)):
+            stats = snap['stages'].get(stage)
+            if stats and stats['count']:
+                p95 = (f"p95≤{stats['p95_ms']:.1f} ms" if stats['p95_ms'] != float('inf')
+                       else f"p95>{LATENCY_BUCKETS[-1] * 1000:.0f} ms")
+                lines.append(f"{stage}: n={stats['count']}, ort={stats['mean_ms']:.1f} ms, {p95}")
+        for name, value in sorted(snap['counters'].items()):
+            lines.append(f"{name}: {value:,}")
+        for name, value in sorted(snap['gauges'].items()):
+            lines.append(f"{name}: {value:,}" if isinstance(value, int) else f"{name}: {value}")
+        if snap['peak_rss_mb'] is not None:
+            lines.append(f"tepe bellek: {snap['peak_rss_mb']:.0f} MB")
+        return "\n".join(lines)
+
+# Süreç genelinde paylaşılan kayıt defteri
+METRICS = Metrics()
+
+class MetricsExporter:
+    """Metrikleri periyodik olarak dosyaya ve/veya yerel HTTP uç noktasına yayınlar."""
+
+    def __init__(self, metrics=METRICS, path=None, port=None, host='127.0.0.1', interval=5.0):
+        """
+        Args:
+            metrics: Yayınlanacak kayıt defteri
+            path: Prometheus metin dosyası (None: dosyaya yazma)
+            port: GET /metrics uç noktası portu (None: sunucu açma)
+            host: Uç noktanın dinleyeceği adres (varsayılan yalnızca yerel)
+            interval: Dosya yazma aralığı (saniye)
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        if port is not None:
+            self._server = ThreadingHTTPServer((host, port), self._handler())
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"Metrikler: http://{host}:{self._server.server_address[1]}/metrics")
+        if path:
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            self.metrics.write_prometheus(self.path)
+
+    def close(self):
+        """Son durumu dosyaya yazar ve sunucuyu kapatır."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.path:
+            self.metrics.write_prometheus(self.path)
+            print(f"Metrikler kaydedildi: {self.path}")
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+class SamplingProfiler:
+    """
+    İsteğe bağlı örnekleyen profilleyici.
+
+    Arka plandaki thread `interval` saniyede bir hedef thread'lerin yığınını
+    sys._current_frames() ile okur; kod değiştirilmeden sıcak döngünün zamanı
+    nerede harcadığı görülür. Çıktı 'çerçeve;çerçeve;... sayı' satırlarıdır.
+    """
+
+    def __init__(self, interval=0.005, thread_ids=None):
+        """
+        Args:
+            interval: Örnekleme aralığı (saniye)
+            thread_ids: Örneklenecek thread kimlikleri (None: profilleyici hariç hepsi)
+        """
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self.samples = 0
+        # dump() sinyal işleyicisinden (ana thread) örnekleme sürerken çağrılabilir;
+        # RLock, dump() sırasında gelen ikinci sinyalde kilitlenmeyi önler
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stacks = [self._collapse(frame) for thread_id, frame in sys._current_frames().items()
+                      if thread_id != own_id and (not self.thread_ids or thread_id in self.thread_ids)]
+            with self._lock:
+                self.stacks.update(stacks)
+                self.samples += 1
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def dump(self, path):
+        """Katlanmış yığınları yazar (flamegraph.pl veya speedscope ile açılabilir)."""
+        # Örnekleyici thread yazmaya devam ederken kopya üzerinden yazılır
+        with self._lock:
+            stacks = Counter(self.stacks)
+            samples = self.samples
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Profil kaydedildi: {path} ({samples} örnek)")
+        return path
+
+def install_dump_signal(profiler, path):
+    """
+    SIGUSR1 alındığında profili çalışma durdurulmadan yazar (yalnızca POSIX).
+    Örn: kill -USR1 <pid>
+    """
+    import signal
+    if not hasattr(signal, 'SIGUSR1'):
+        return False
+    signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.dump(path))
+    return True
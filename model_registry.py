@@ -0,0 +1,151 @@
+"""
+Thread güvenli model kayıt defteri.
+Modeller tek bir arka plan thread'inde yüklenir; aynı model için eşzamanlı
+istekler aynı yüklemeyi bekler (model iki kez yüklenmez). Son kullanılan
+birkaç model (örn. n, s ve INT8 varyantları) bellekte tutulur, böylece
+geri dönüş anında olur. Sayı ve toplam boyut sınırı aşılınca en eski model
+bellekten çıkarılır; model başına bellekteki boyut raporlanır.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from backends import OnnxClassifier
+from cascade import CascadeClassifier
+from classifier import BanknoteClassifier
+
+def model_key(model_path, backend, fast_model_path=None):
+    """
+    Kayıt defteri anahtarı. Dosyanın değişme zamanı da anahtara girer;
+    aynı yolda yeniden eğitilen best.pt yeni model olarak yüklenir.
+    """
+    paths = [p for p in (fast_model_path, model_path) if p]
+    return tuple((os.path.abspath(p), os.stat(p).st_mtime_ns) for p in paths) + (backend,)
+
+def resident_bytes(model):
+    """
+    Modelin bellekte tuttuğu ağırlıkların yaklaşık boyutu (byte).
+
+    PyTorch modellerinde parametre ve tamponların, ONNX oturumlarında
+    ağırlıkları içeren model dosyasının boyutu kullanılır.
+    """
+    if isinstance(model, CascadeClassifier):
+        return resident_bytes(model.fast) + resident_bytes(model.accurate)
+    if isinstance(model, BanknoteClassifier):
+        return resident_bytes(model.model)
+    if isinstance(model, OnnxClassifier):
+        return os.path.getsize(model.model_path)
+    net = getattr(model, 'model', None)
+    if net is None or not hasattr(net, 'parameters'):
+        return 0
+    tensors = list(net.parameters()) + list(net.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+class ModelRegistry:
+    """
+    Yüklenmiş modellerin LRU kayıt defteri.
+
+    get() bellekteki modeli anında döndürür; load_async() modeli arka planda
+    yükler ve Future döndürür. Etkin model (pin) hiçbir zaman çıkarılmaz.
+    """
+
+    def __init__(self, max_models=3, max_mb=512):
+        """
+        Args:
+            max_models: Bellekte tutulacak en fazla model sayısı
+            max_mb: Bellekteki modellerin toplam boyut sınırı (MB, None: sınırsız)
+        """
+        self.max_models = max_models
+        self.max_mb = max_mb
+        self.pinned = None
+        self._models = OrderedDict()  # anahtar -> (model, byte)
+        self._pending = {}            # anahtar -> Future
+        self._lock = threading.Lock()
+        # Tek yükleyici thread - aynı anda iki modelin tepe belleği oluşmaz
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-loader')
+
+    def get(self, key):
+        """Bellekteki modeli döndürür ve en yeni kullanılan yapar (yoksa None)."""
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return None
+            self._models.move_to_end(key)
+            return entry[0]
+
+    def load_async(self, key, build):
+        """
+        Model bellekte değilse `build()` ile arka planda yükler.
+
+        Aynı anahtar için süren bir yükleme varsa onun Future'ı döndürülür.
+
+        Returns:
+            Sonucu model olan concurrent.futures.Future
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                future = Future()
+                future.set_result(entry[0])
+                return future
+            future = self._pending[key] = self._executor.submit(self._load, key, build)
+            return future
+
+    def _load(self, key, build):
+        try:
+            model = build()
+            size = resident_bytes(model)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+        with self._lock:
+            self._models[key] = (model, size)
+            self._models.move_to_end(key)
+            # Yeni yüklenen model henüz etkinleştirilmedi (pin) ama çağıran onu bekliyor
+            self._evict(keep=key)
+        return model
+
+    def pin(self, key):
+        """Etkin modeli işaretler; etkin model bellekten çıkarılmaz."""
+        with self._lock:
+            self.pinned = key
+            if key in self._models:
+                self._models.move_to_end(key)
+            self._evict()
+
+    def _evict(self, keep=None):
+        # En eski kullanılan modelden başlayarak sınırların altına in (etkin model ve `keep` hariç)
+        limit = self.max_mb * 1024 * 1024 if self.max_mb else None
+        for key in list(self._models):
+            total = sum(size for _, size in self._models.values())
+            if len(self._models) <= self.max_models and (limit is None or total <= limit):
+                break
+            if key not in (self.pinned, keep):
+                del self._models[key]
+
+    def sizes(self):
+        """(model adı, MB, etkin mi) listesi - en eski kullanılandan yeniye."""
+        with self._lock:
+            return [
+                (' → '.join(os.path.basename(path) for path, _ in key[:-1]) + f" ({key[-1]})",
+                 size / (1024 * 1024), key == self.pinned)
+                for key, (_, size) in self._models.items()
+            ]
+
+    @property
+    def total_mb(self):
+        return sum(mb for _, mb, _ in self.sizes())
+
+    def summary(self):
+        """Bellekteki modellerin çok satırlı özeti."""
+        lines = [f"Bellekteki modeller: {len(self._models)}/{self.max_models}, {self.total_mb:.1f} MB"
+                 + (f" (sınır {self.max_mb} MB)" if self.max_mb else "")]
+        for name, mb, active in reversed(self.sizes()):
+            lines.append(f"  {'●' if active else '○'} {name}: {mb:.1f} MB")
+        return "\n".join(lines)
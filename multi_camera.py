@@ -0,0 +1,386 @@
+"""
+Birden fazla kamera (veya kamera yerine video dosyası) için ortak modelle canlı tespit.
+Her kaynağın kendi yakalama thread'i vardır; tek çıkarım thread'i her kaynağın
+en yeni karesini alır, hepsini tek batch'lik ileri geçişte sınıflandırır ve
+sonuçları kaynak başına çıkışlara dağıtır. Model süreçte bir kez bellekte tutulur.
+
+Karşılaştırma (aynı kaynaklarla kaynak başına ayrı süreç):
+    python multi_camera.py --sources 0,1 --compare
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import cv2
+
+from backends import BACKENDS
+from classifier import display_name, predict_arrays
+from video_stream import LatestSlot, RateMeter, annotate_frame, peak_rss_mb
+
+def parse_sources(value):
+    """'0,1,klip.mp4' biçimini kamera indeksleri ve dosya yolları listesine çevirir."""
+    sources = []
+    for item in value.split(','):
+        item = item.strip()
+        if item:
+            sources.append(int(item) if item.isdigit() else item)
+    if not sources:
+        raise ValueError(f"Geçersiz kaynak listesi: {value} (örn: 0,1 veya a.mp4,b.mp4)")
+    return sources
+
+class CameraStream:
+    """
+    Tek bir kaynağın yakalama thread'i.
+
+    Okunan kareler "yalnızca en yeni" tampona bırakılır. Video dosyaları
+    canlı kamerayı taklit etmek için kendi FPS'lerinde okunur ve isteğe
+    bağlı olarak sonunda başa sarılır.
+    """
+
+    def __init__(self, source, notify=None, realtime=True, loop=False):
+        """
+        Args:
+            source: Kamera indeksi (int) veya video dosyası yolu
+            notify: Yeni kare geldiğinde işaretlenecek threading.Event
+            realtime: Video dosyalarını kendi FPS'lerinde oku
+            loop: Video dosyası bitince başa sar
+        """
+        self.source = source
+        self.name = f"Kamera {source}" if isinstance(source, int) else os.path.basename(str(source))
+        self.cap = cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            raise IOError(f"Kaynak açılamadı: {source}")
+        self.is_file = not isinstance(source, int)
+        if not self.is_file:
+            # Sürücü tamponunu küçült - eski kareler birikmesin
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.interval = 1.0 / fps if self.is_file and realtime and fps and fps > 0 else 0.0
+        self.loop = loop
+        self.notify = notify
+        self.slot = LatestSlot()
+        self.output = LatestSlot()
+        self.capture_meter = RateMeter()
+        self.inference_meter = RateMeter()
+        self.frames = 0
+        self.inferred = 0
+        self.finished = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        next_time = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    if self.is_file and self.loop:
+                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                self.slot.put(frame)
+                self.frames += 1
+                self.capture_meter.tick()
+                if self.notify is not None:
+                    self.notify.set()
+                if self.interval:
+                    next_time += self.interval
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    else:
+                        next_time = time.perf_counter()
+        finally:
+            self.finished = True
+            self.slot.close()
+            self.cap.release()
+            if self.notify is not None:
+                self.notify.set()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.output.close()
+
+class MultiCameraInference:
+    """
+    Kaynakların en yeni karelerini tek batch'te sınıflandıran çıkarım döngüsü.
+
+    Her adımda yeni karesi olan kaynaklar toplanır; N kaynak için N ayrı
+    çağrı yerine tek ileri geçiş yapılır. Sonuç (kare, top-1, güven) olarak
+    kaynağın `output` tamponuna bırakılır.
+    """
+
+    def __init__(self, model, sources, imgsz=None, realtime=True, loop=False):
+        """
+        Args:
+            model: Yüklenmiş model (BanknoteClassifier veya CascadeClassifier)
+            sources: Kamera indeksleri ve/veya video dosyası yolları
+            imgsz: Çıkarım boyutu (None: modelin varsayılanı)
+            realtime: Video dosyalarını kendi FPS'lerinde oku
+            loop: Video dosyaları bitince başa sar
+        """
+        self.model = model
+        self.imgsz = imgsz
+        self.new_frame = threading.Event()
+        self.streams = []
+        try:
+            for source in sources:
+                self.streams.append(CameraStream(source, self.new_frame, realtime, loop))
+        except IOError:
+            for stream in self.streams:
+                stream.cap.release()
+            raise
+        self.batches = 0
+        self.frames = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def step(self, timeout=0.1):
+        """
+        Yeni kareleri tek batch'te sınıflandırır.
+
+        Returns:
+            Batch'teki kare sayısı (yeni kare yoksa 0)
+        """
+        if not self.new_frame.wait(timeout):
+            return 0
+        self.new_frame.clear()
+        ready = []
+        for stream in self.streams:
+            frame = stream.slot.get_nowait()
+            if frame is not None:
+                ready.append((stream, frame))
+        if not ready:
+            return 0
+
+        top1, confs, _ = predict_arrays(self.model, [frame for _, frame in ready], self.imgsz)
+        for (stream, frame), class_id, conf in zip(ready, top1.tolist(), confs.tolist()):
+            stream.inferred += 1
+            stream.inference_meter.tick()
+            stream.output.put((frame, class_id, conf))
+        self.batches += 1
+        self.frames += len(ready)
+        return len(ready)
+
+    @property
+    def finished(self):
+        return all(stream.finished for stream in self.streams)
+
+    def _run(self):
+        while not self._stop.is_set() and not self.finished:
+            self.step()
+        # Kaynaklar bittiyse son kareleri de sınıflandır
+        self.step(timeout=0)
+
+    def start(self):
+        for stream in self.streams:
+            stream.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for stream in self.streams:
+            stream.stop()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def mean_batch(self):
+        return self.frames / self.batches if self.batches else 0.0
+
+    def summary(self):
+        """Kaynak başına ve toplam hızların çok satırlı özeti."""
+        lines = [f"{len(self.streams)} kaynak, {self.batches:,} batch (ortalama {self.mean_batch:.2f} kare)"]
+        for stream in self.streams:
+            lines.append(f"  {stream.name}: yakalanan {stream.frames:,}, sınıflandırılan {stream.inferred:,}, "
+                         f"düşürülen {stream.slot.dropped:,}")
+        return "\n".join(lines)
+
+def run_cameras(model, sources, conf_threshold=0.25, imgsz=None, show=True, duration=None, loop=False):
+    """
+    Kaynakları ortak modelle çalıştırır ve her kaynağı kendi penceresinde gösterir.
+
+    Args:
+        model: Yüklenmiş model
+        sources: Kamera indeksleri ve/veya video dosyası yolları
+        conf_threshold: Bu güvenin altındaki tahminler etiketlenmez
+        imgsz: Çıkarım boyutu (None: modelin varsayılanı)
+        show: Pencereleri göster (False: yalnızca ölç)
+        duration: Saniye cinsinden çalışma süresi (None: 'q' tuşuna veya kaynaklar bitene kadar)
+        loop: Video dosyaları bitince başa sar
+
+    Returns:
+        MultiCameraInference (istatistikler için)
+    """
+    runner = MultiCameraInference(model, sources, imgsz, realtime=True, loop=loop).start()
+    start = time.perf_counter()
+    try:
+        while not runner.finished:
+            if duration is not None and time.perf_counter() - start >= duration:
+                break
+            if not show:
+                time.sleep(0.05)
+                continue
+            # Pencereler ana thread'de güncellenir (OpenCV GUI gereksinimi)
+            for stream in runner.streams:
+                item = stream.output.get_nowait()
+                if item is None:
+                    continue
+                frame, class_id, conf = item
+                label = (f"{display_name(model.names, class_id)}: {conf:.1%}" if conf >= conf_threshold
+                         else "Banknot yok")
+                label += f" | {stream.inference_meter.rate():.1f} FPS"
+                cv2.imshow(stream.name, annotate_frame(frame.copy(), label))
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        runner.stop()
+        if show:
+            cv2.destroyAllWindows()
+    elapsed = time.perf_counter() - start
+    print(runner.summary())
+    print(f"Toplam çıkarım hızı: {runner.frames / elapsed:.1f} kare/sn")
+    return runner
+
+def _bench_worker(model_path, backend, sources, duration, imgsz, realtime, output):
+    """
+    Ayrı süreçte kaynakları çalıştırır; (kare, süre, tepe bellek MB) döndürür.
+    Hata olursa ana süreç beklemede kalmasın diye (None, hata mesajı) döndürülür.
+    """
+    try:
+        from cascade import load_classifier
+        model = load_classifier(model_path, backend)
+        runner = MultiCameraInference(model, sources, imgsz, realtime=realtime, loop=True).start()
+        start = time.perf_counter()
+        time.sleep(duration)
+        runner.stop()
+        output.put((runner.frames, time.perf_counter() - start, peak_rss_mb() or 0.0))
+    except Exception as e:
+        output.put((None, f"{', '.join(map(str, sources))}: {e}"))
+
+def _collect(output, workers):
+    """İşçi sonuçlarını toplar; sonuç vermeden sonlanan süreçleri beklemez."""
+    stats = []
+    while len(stats) < len(workers):
+        try:
+            stats.append(output.get(timeout=1.0))
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                # Son sonuçlar kuyruğa süreç bitmeden önce yazılmış olabilir
+                try:
+                    while len(stats) < len(workers):
+                        stats.append(output.get(timeout=0.5))
+                except queue.Empty:
+                    pass
+                break
+    errors = [stat[1] for stat in stats if stat[0] is None]
+    lost = [f"süreç {worker.pid} çıkış kodu {worker.exitcode}" for worker in workers if worker.exitcode]
+    if errors or len(stats) < len(workers):
+        raise RuntimeError("Ölçüm süreci başarısız oldu: " + "; ".join(errors or lost or ['sonuç alınamadı']))
+    return stats
+
+def compare(model_path, sources, duration=10.0, backend='auto', imgsz=None, realtime=True):
+    """
+    Ortak batch'li modeli kaynak başına ayrı süreçlerle karşılaştırır.
+
+    Bellek, süreçlerin tepe bellek kullanımlarının toplamıdır; ayrı süreçlerde
+    her süreç modelin ve çalışma zamanının kendi kopyasını taşır.
+
+    Returns:
+        {'batched': (kare/sn, toplam tepe MB), 'independent': (kare/sn, toplam tepe MB)}
+
+    Raises:
+        RuntimeError: Bir ölçüm süreci hata verirse veya sonuç vermeden sonlanırsa
+    """
+    ctx = multiprocessing.get_context('spawn')
+    report = {}
+    for mode, groups in (('batched', [sources]), ('independent', [[s] for s in sources])):
+        output = ctx.Queue()
+        workers = [ctx.Process(target=_bench_worker, args=(model_path, backend, group, duration, imgsz, realtime, output))
+                   for group in groups]
+        for worker in workers:
+            worker.start()
+        try:
+            stats = _collect(output, workers)
+        finally:
+            for worker in workers:
+                worker.join()
+        fps = sum(frames / elapsed for frames, elapsed, _ in stats)
+        report[mode] = (fps, sum(peak for _, _, peak in stats))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Ortak modelle çoklu kamera canlı tespit')
+    parser.add_argument('--model', type=str, default='runs/classify/banknot_classifier/weights/best.pt',
+                        help='Eğitilmiş model yolu')
+    parser.add_argument('--backend', type=str, default='auto', choices=BACKENDS,
+                        help='Çıkarım arka ucu')
+    parser.add_argument('--sources', type=str, default='0',
+                        help='Virgülle ayrılmış kamera indeksleri veya video dosyaları (örn: 0,1 veya a.mp4,b.mp4)')
+    parser.add_argument('--conf', type=float, default=0.25,
+                        help='Güven eşiği (0-1 arası)')
+    parser.add_argument('--imgsz', type=int, default=None,
+                        help='Çıkarım boyutu (varsayılan: modelin eğitildiği boyut)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Çalışma süresi (saniye, varsayılan: q tuşuna kadar)')
+    parser.add_argument('--loop', action='store_true',
+                        help='Video dosyaları bitince başa sar')
+    parser.add_argument('--no-show', action='store_true',
+                        help='Pencere açmadan yalnızca hızı ölç')
+    parser.add_argument('--compare', action='store_true',
+                        help='Ortak batch\'li modeli kaynak başına ayrı süreçlerle karşılaştır')
+    parser.add_argument('--no-pace', action='store_true',
+                        help='Video dosyalarını kendi FPS\'leri yerine olabildiğince hızlı oku (en yüksek verim)')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"HATA: Model dosyası bulunamadı: {args.model}")
+        return 1
+    try:
+        sources = parse_sources(args.sources)
+    except ValueError as e:
+        print(f"HATA: {e}")
+        return 1
+
+    if args.compare:
+        duration = args.duration or 10.0
+        print(f"{len(sources)} kaynak, her mod {duration:.0f} sn çalıştırılıyor...")
+        try:
+            report = compare(args.model, sources, duration, args.backend, args.imgsz, not args.no_pace)
+        except RuntimeError as e:
+            print(f"HATA: {e}")
+            return 1
+        print(f"{'Mod':<22} {'toplam kare/sn':>15} {'toplam tepe MB':>15}")
+        for mode, label in (('batched', 'Ortak model (batch)'), ('independent', 'Kaynak başına süreç')):
+            fps, memory = report[mode]
+            print(f"{label:<22} {fps:>15.1f} {memory:>15.0f}")
+        return 0
+
+    from cascade import load_classifier
+    model = load_classifier(args.model, args.backend)
+    try:
+        run_cameras(model, sources, args.conf, args.imgsz, show=not args.no_show,
+                    duration=args.duration, loop=args.loop)
+    except IOError as e:
+        print(f"HATA: {e}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
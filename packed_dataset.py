@@ -0,0 +1,154 @@
+"""
+Önceden boyutlandırılmış, bellek eşlemeli (memory-mapped) eğitim deposu.
+prepare_data.py tarafından yazılır, train.py tarafından okunur.
+Her epoch'ta PNG çözme ve yeniden boyutlandırma maliyetini ortadan kaldırır.
+
+Resimler kırpılmadan, en-boy oranı korunarak kısa kenarı imgsz olacak şekilde
+saklanır; eğitimdeki artırmalar PNG klasöründen okunan resmin tamamını görür.
+
+Depo yapısı:
+    index.json              - imgsz, sınıflar, her bölüm için shard listesi, etiketler,
+                              yollar ve resim boyutları (yükseklik, genişlik)
+    train_000.npy, ...      - resimlerin art arda yazıldığı tek boyutlu uint8 RGB shard'lar
+    val_000.npy, ...
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+
+INDEX_NAME = 'index.json'
+STORE_VERSION = 2
+
+def resize_short_side(img_bgr, size):
+    """
+    Kısa kenarı `size` olacak şekilde küçültür ve RGB'ye çevirir.
+    Kırpma yapılmaz ve en-boy oranı korunur; zaten küçük resimler büyütülmez.
+    """
+    h, w = img_bgr.shape[:2]
+    scale = size / min(h, w)
+    if scale < 1:
+        img_bgr = cv2.resize(img_bgr, (max(1, round(w * scale)), max(1, round(h * scale))),
+                             interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+
+def write_packed_store(items_by_split, output_dir, imgsz=640, shard_size=2048, threads=8):
+    """
+    Resimleri önceden boyutlandırılmış uint8 shard'lara yazar.
+
+    Args:
+        items_by_split: {'train': [(kaynak yol, sınıf), ...], 'val': [...]}
+        output_dir: Depo klasörü
+        imgsz: Saklanacak kısa kenar boyutu
+        shard_size: Shard başına resim sayısı
+        threads: Paralel çözme thread sayısı
+
+    Returns:
+        (depo boyutu bayt, kaynak resimlerin toplam boyutu bayt)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Ultralytics sınıf klasörlerini alfabetik sıralar; aynı indeksleri kullan
+    classes = sorted({cls for items in items_by_split.values() for _, cls in items})
+    class_to_idx = {cls: idx for idx, cls in enumerate(classes)}
+    index = {'version': STORE_VERSION, 'imgsz': imgsz, 'classes': classes, 'splits': {}}
+
+    def load(item):
+        img = cv2.imread(str(item[0]))
+        return None if img is None else resize_short_side(img, imgsz)
+
+    store_bytes = 0
+    source_bytes = 0
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        for split, items in items_by_split.items():
+            shards, labels, paths, shapes = [], [], [], []
+            for start in range(0, len(items), shard_size):
+                chunk = items[start:start + shard_size]
+                arrays = list(executor.map(load, chunk))
+                kept = [(item, arr) for item, arr in zip(chunk, arrays) if arr is not None]
+                if not kept:
+                    continue
+
+                # Resimlerin boyutları farklıdır; shard tek boyutlu bir bayt dizisidir
+                shard_name = f"{split}_{len(shards):03d}.npy"
+                shard = np.lib.format.open_memmap(output_dir / shard_name, mode='w+', dtype=np.uint8,
+                                                  shape=(sum(arr.size for _, arr in kept),))
+                offset = 0
+                for (src, cls), arr in kept:
+                    shard[offset:offset + arr.size] = arr.reshape(-1)
+                    offset += arr.size
+                    labels.append(class_to_idx[cls])
+                    paths.append(str(src))
+                    shapes.append(arr.shape[:2])
+                    source_bytes += os.path.getsize(src)
+                shard.flush()
+                del shard
+                shards.append({'file': shard_name, 'count': len(kept)})
+                store_bytes += os.path.getsize(output_dir / shard_name)
+
+            index['splits'][split] = {'shards': shards, 'labels': labels, 'paths': paths, 'shapes': shapes}
+            print(f"  {split}: {len(labels)} resim, {len(shards)} shard")
+
+    with open(output_dir / INDEX_NAME, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    return store_bytes, source_bytes
+
+class PackedSplit:
+    """Deponun tek bir bölümü (train/val); resimlere kopyasız erişim sağlar."""
+
+    def __init__(self, root, info):
+        self.files = [str(Path(root) / shard['file']) for shard in info['shards']]
+        self.offsets = np.cumsum([0] + [shard['count'] for shard in info['shards']])
+        self.labels = np.asarray(info['labels'], dtype=np.int64)
+        self.paths = info['paths']
+        self.shapes = np.asarray(info['shapes'], dtype=np.int64).reshape(-1, 2)
+        # Her resmin kendi shard'ı içindeki bayt konumu
+        sizes = self.shapes[:, 0] * self.shapes[:, 1] * 3
+        self.starts = np.zeros(len(sizes), dtype=np.int64)
+        for first, last in zip(self.offsets[:-1], self.offsets[1:]):
+            self.starts[first:last] = np.cumsum(sizes[first:last]) - sizes[first:last]
+        self._shards = None
+
+    def __getstate__(self):
+        # DataLoader worker'larına (spawn) dizinin kendisi değil yalnızca dosya yolları gönderilir
+        state = self.__dict__.copy()
+        state['_shards'] = None
+        return state
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, i):
+        """(yükseklik, genişlik, 3) RGB uint8 görüntü ve sınıf indeksi döndürür."""
+        if self._shards is None:
+            # Shard'lar her süreçte ilk erişimde açılır
+            self._shards = [np.load(path, mmap_mode='r') for path in self.files]
+        shard = int(np.searchsorted(self.offsets, i, side='right')) - 1
+        h, w = self.shapes[i]
+        start = self.starts[i]
+        img = self._shards[shard][start:start + h * w * 3].reshape(h, w, 3)
+        return img, int(self.labels[i])
+
+class PackedStore:
+    """prepare_data.py --pack ile yazılmış depoyu okur."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        with open(self.root / INDEX_NAME, 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+        if self.index.get('version') != STORE_VERSION:
+            raise ValueError(f"{self.root} eski biçimde (kare kırpılmış) yazılmış; "
+                             f"'python prepare_data.py --pack {self.root}' ile yeniden oluşturun")
+        self.imgsz = self.index['imgsz']
+        self.classes = self.index['classes']
+
+    @staticmethod
+    def exists(root):
+        return (Path(root) / INDEX_NAME).exists()
+
+    def split(self, name):
+        return PackedSplit(self.root, self.index['splits'][name])
@@ -0,0 +1,240 @@
+"""
+Tekrarlanan resimler için içerik adresli tahmin önbelleği.
+Anahtar: resim baytlarının özeti + model parmak izi + imgsz + çözme kipi
+(tam veya küçültülmüş çözme aynı resim için farklı tahmin üretebilir).
+Süreç içi LRU katmanı ve SQLite üzerinde kalıcı disk katmanı içerir.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+
+DEFAULT_CACHE_PATH = 'runs/classify/prediction_cache.sqlite'
+
+_fingerprints = {}
+
+def model_fingerprint(model_path):
+    """
+    Model dosyasının içerik özetini döndürür.
+    Aynı yolda yeniden eğitilmiş bir best.pt farklı parmak izi üretir.
+    """
+    stat = os.stat(model_path)
+    cache_key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+    if cache_key not in _fingerprints:
+        digest = hashlib.sha256()
+        with open(model_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _fingerprints[cache_key] = digest.hexdigest()[:16]
+    return _fingerprints[cache_key]
+
+class PredictionCache:
+    """
+    Olasılık vektörlerini saklayan iki katmanlı önbellek.
+
+    Bellek katmanı OrderedDict ile LRU, disk katmanı SQLite ile son
+    kullanım zamanına göre boyut sınırlıdır. Aynı yoldaki model dosyası
+    değiştiğinde o modele ait eski kayıtlar açılışta silinir.
+
+    Aynı SQLite dosyası birden fazla süreçten (detect.py --workers) açılabilir:
+    WAL kipi okuyucuları yazıcıdan ayırır, kilit beklemesi `timeout` ile
+    sınırlıdır ve yazmalar ile son kullanım güncellemeleri `commit_every`
+    kayıtta bir tek işlemde diske aktarılır. close() bekleyenleri yazar.
+    """
+
+    def __init__(self, model_path, imgsz=None, db_path=DEFAULT_CACHE_PATH,
+                 memory_entries=1024, disk_entries=100000, commit_every=64, timeout=30.0, decode='full'):
+        """
+        Args:
+            model_path: Tahminleri üreten model dosyası
+            imgsz: Çıkarım boyutu (None: bind() ile veya daha önce kaydedilen değerden)
+            db_path: SQLite dosyası (None: yalnızca bellek katmanı)
+            memory_entries: Bellek katmanındaki en fazla kayıt
+            disk_entries: Disk katmanındaki en fazla kayıt
+            commit_every: Diske tek işlemde aktarılacak bekleyen yazma/güncelleme sayısı
+            timeout: Başka bir süreç veritabanını kilitlediğinde en uzun bekleme (saniye)
+            decode: Varsayılan çözme kipi ('full' veya 'fast' - küçültülmüş çözme)
+        """
+        self.model_path = os.path.abspath(model_path)
+        self.fingerprint = model_fingerprint(model_path)
+        self.imgsz = imgsz
+        self.names = None
+        self.decode = decode
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.commit_every = max(1, commit_every)
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._memory = OrderedDict()
+        self._pending_writes = {}   # anahtar -> olasılık baytları
+        self._pending_touches = {}  # anahtar -> son kullanım zamanı
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False)
+            self._db.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, model_path TEXT, fingerprint TEXT, "
+                "probs BLOB, last_used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON predictions(last_used)")
+            # Model yüklenmeden önbellekten sonuç verilebilmesi için sınıf isimleri ve imgsz
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS models (fingerprint TEXT PRIMARY KEY, imgsz INTEGER, names TEXT)"
+            )
+            row = self._db.execute(
+                "SELECT imgsz, names FROM models WHERE fingerprint = ?", (self.fingerprint,)
+            ).fetchone()
+            if row is not None:
+                self.imgsz = self.imgsz or row[0]
+                self.names = {int(idx): name for idx, name in json.loads(row[1]).items()}
+            # Aynı yoldaki eski modelin kayıtlarını geçersiz kıl
+            self._db.execute(
+                "DELETE FROM predictions WHERE model_path = ? AND fingerprint != ?",
+                (self.model_path, self.fingerprint)
+            )
+            self._db.commit()
+            self._disk_count = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def bind(self, names, imgsz=None):
+        """
+        Yüklenen modelin sınıf isimlerini ve çıkarım boyutunu kaydeder.
+
+        Sonraki çalıştırmalarda önbellek isabeti model yüklenmeden doğru sınıf
+        isimleriyle gösterilir ve anahtar gerçek imgsz'yi içerir.
+        """
+        names = {int(idx): str(name) for idx, name in names.items()}
+        if isinstance(imgsz, (list, tuple)):
+            imgsz = max(imgsz)
+        with self._lock:
+            if names == self.names and (self.imgsz or not imgsz):
+                return
+            self.names = names
+            self.imgsz = self.imgsz or imgsz
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO models VALUES (?, ?, ?)",
+                        (self.fingerprint, self.imgsz, json.dumps(names))
+                    )
+
+    def key(self, image_bytes, decode=None):
+        """Resim baytları için önbellek anahtarı (decode: None ise varsayılan çözme kipi)."""
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        return f"{image_hash}:{self.fingerprint}:{self.imgsz or 'default'}:{decode or self.decode}"
+
+    def get(self, image_bytes, decode=None):
+        """Önbellekteki olasılık vektörünü döndürür (yoksa None)."""
+        key = self.key(image_bytes, decode)
+        with self._lock:
+            probs = self._memory.get(key)
+            if probs is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return probs
+
+            if self._db is not None:
+                blob = self._pending_writes.get(key)
+                row = (blob,) if blob is not None else self._db.execute(
+                    "SELECT probs FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    probs = np.frombuffer(row[0], dtype=np.float32)
+                    # Son kullanım zamanı toplu olarak güncellenir
+                    self._pending_touches[key] = time.time()
+                    self._flush_if_due()
+                    self._remember(key, probs)
+                    self.stats['disk_hits'] += 1
+                    return probs
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, image_bytes, probs, decode=None):
+        """Olasılık vektörünü her iki katmana yazar."""
+        key = self.key(image_bytes, decode)
+        probs = np.ascontiguousarray(probs, dtype=np.float32)
+        with self._lock:
+            self._remember(key, probs)
+            if self._db is not None:
+                self._pending_writes[key] = probs.tobytes()
+                self._flush_if_due()
+
+    def _flush_if_due(self):
+        if len(self._pending_writes) + len(self._pending_touches) >= self.commit_every:
+            self._flush()
+
+    def _flush(self):
+        # Bekleyen yazma ve güncellemeleri tek işlemde diske aktarır (kilit tutulurken çağrılır)
+        if self._db is None or not (self._pending_writes or self._pending_touches):
+            return
+        now = time.time()
+        with self._db:
+            if self._pending_writes:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                    [(key, self.model_path, self.fingerprint, blob, now)
+                     for key, blob in self._pending_writes.items()]
+                )
+                self._disk_count += len(self._pending_writes)
+            if self._pending_touches:
+                self._db.executemany(
+                    "UPDATE predictions SET last_used = ? WHERE key = ?",
+                    [(used, key) for key, used in self._pending_touches.items()]
+                )
+            self._evict_disk()
+        self._pending_writes.clear()
+        self._pending_touches.clear()
+
+    def flush(self):
+        """Bekleyen kayıtları diske yazar."""
+        with self._lock:
+            self._flush()
+
+    def _remember(self, key, probs):
+        self._memory[key] = probs
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        # Sınır aşıldığında en eski %10'luk dilim tek seferde silinir
+        if self._disk_count <= self.disk_entries:
+            return
+        excess = self._disk_count - self.disk_entries + max(1, self.disk_entries // 10)
+        self._db.execute(
+            "DELETE FROM predictions WHERE key IN "
+            "(SELECT key FROM predictions ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    @property
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def summary(self):
+        """İsabet/ıska istatistiklerinin tek satırlık özeti."""
+        return (
+            f"Önbellek: bellek isabeti={self.stats['memory_hits']}, "
+            f"disk isabeti={self.stats['disk_hits']}, ıska={self.stats['misses']} "
+            f"(isabet oranı {self.hit_rate:.1%})"
+        )
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._flush()
+            self._db.close()
+            self._db = None
@@ -3,77 +3,294 @@ YOLOv8 Classification için veri hazırlama scripti.
 train.txt ve validation.txt dosyalarını kullanarak YOLOv8 formatına dönüştürür.
 """
 
+import argparse
+import json
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def prepare_yolo_dataset(train_txt='train.txt', val_txt='validation.txt', 
-                         output_dir='dataset', source_dir='.'):
+# Sınıf isimleri (banknot değerleri)
+CLASSES = ['5', '10', '20', '50', '100', '200']
+
+# Dosyaları hedefe aktarma yöntemleri
+MODES = ['copy', 'hardlink', 'symlink']
+
+MANIFEST_NAME = 'manifest.json'
+
+def read_file_list(list_file):
+    """Liste dosyasındaki boş olmayan satırları döndürür."""
+    with open(list_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f.readlines() if line.strip()]
+
+def load_manifest(output_dir):
+    """Önceki çalıştırmanın manifest'ini okur (yoksa boş)."""
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'files': {}}
+
+def save_manifest(output_dir, manifest):
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+def materialize(src, dst, mode):
+    """
+    Kaynak dosyayı hedefe kopyalar veya bağlar.
+
+    Returns:
+        Gerçekte kullanılan yöntem (bağlantı kurulamazsa 'copy')
+    """
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+    try:
+        if mode == 'hardlink':
+            os.link(src, dst)
+            return mode
+        if mode == 'symlink':
+            os.symlink(src.resolve(), dst)
+            return mode
+    except OSError:
+        # Farklı disk bölümü veya yetki sorunu - kopyalamaya geri dön
+        pass
+    shutil.copy2(src, dst)
+    return 'copy'
+
+def prepare_yolo_dataset(train_txt='train.txt', val_txt='validation.txt',
+                         output_dir='dataset', source_dir='.', mode='copy',
+                         threads=8, incremental=True, base_only=False, estimate_samples=32):
     """
     train.txt ve validation.txt dosyalarını kullanarak YOLOv8 classification formatına dönüştürür.
-    
+
+    Her çalıştırmada bir manifest yazılır. Artımlı çalıştırmalarda boyutu ve
+    değiştirilme zamanı değişmemiş dosyalar atlanır, listeden çıkarılan
+    dosyalar hedeften silinir ve istatistikler manifest'ten hesaplanır.
+
+    base_only modunda eğitim listesindeki ön işlenmiş varyantlardan (eminus_,
+    eplus_, flipped_, saltAndPeppered_) temel resmi de listede olanlar atlanır;
+    aile parametreleri çiftlerden tahmin edilip augment.json dosyasına yazılır
+    ve train.py bu dönüşümleri eğitim sırasında anlık uygular.
+
     Args:
         train_txt: Eğitim dosyalarının listesi
         val_txt: Validasyon dosyalarının listesi
         output_dir: Çıktı klasörü
         source_dir: Kaynak klasör (resimlerin bulunduğu yer)
+        mode: 'copy', 'hardlink' veya 'symlink'
+        threads: Paralel aktarım thread sayısı
+        incremental: Değişmemiş dosyaları atla (False: her şeyi yeniden aktar)
+        base_only: Eğitim setinde yalnızca temel resimleri sakla
+        estimate_samples: Aile başına parametre tahmininde kullanılacak çift sayısı
+
+    Returns:
+        Manifest dosya kayıtları (hedef yol -> kayıt)
     """
-    
+
     # Çıktı klasörlerini oluştur
-    train_dir = Path(output_dir) / 'train'
-    val_dir = Path(output_dir) / 'val'
-    
-    # Sınıf isimleri (banknot değerleri)
-    classes = ['5', '10', '20', '50', '100', '200']
-    
+    splits = {
+        'train': Path(output_dir) / 'train',
+        'val': Path(output_dir) / 'val'
+    }
+
     # Her sınıf için klasör oluştur
-    for cls in classes:
-        (train_dir / cls).mkdir(parents=True, exist_ok=True)
-        (val_dir / cls).mkdir(parents=True, exist_ok=True)
-    
-    # Eğitim verilerini kopyala
-    print("Eğitim verileri hazırlanıyor...")
-    with open(train_txt, 'r', encoding='utf-8') as f:
-        train_files = [line.strip() for line in f.readlines() if line.strip()]
-    
-    for file_path in train_files:
-        # Dosya yolundan sınıfı çıkar (örn: "5/image.png" -> "5")
-        class_name = file_path.split('/')[0]
-        
-        if class_name in classes:
-            src = Path(source_dir) / file_path
-            dst = train_dir / class_name / Path(file_path).name
-            
-            if src.exists():
-                shutil.copy2(src, dst)
-    
-    # Validasyon verilerini kopyala
-    print("Validasyon verileri hazırlanıyor...")
-    with open(val_txt, 'r', encoding='utf-8') as f:
-        val_files = [line.strip() for line in f.readlines() if line.strip()]
-    
-    for file_path in val_files:
-        # Dosya yolundan sınıfı çıkar
-        class_name = file_path.split('/')[0]
-        
-        if class_name in classes:
-            src = Path(source_dir) / file_path
-            dst = val_dir / class_name / Path(file_path).name
-            
-            if src.exists():
-                shutil.copy2(src, dst)
-    
+    for split_dir in splits.values():
+        for cls in CLASSES:
+            (split_dir / cls).mkdir(parents=True, exist_ok=True)
+
+    old_files = load_manifest(output_dir).get('files', {})
+
+    # Hedef -> kaynak eşlemesini oluştur
+    print("Dosya listeleri okunuyor...")
+    wanted = {}
+    train_total = 0
+    variant_pairs = {}
+    for split, list_file in (('train', train_txt), ('val', val_txt)):
+        file_list = read_file_list(list_file)
+        if base_only and split == 'train':
+            # numpy/cv2 yalnızca bu modda gerekir
+            from variant_augment import augmentation_family, base_file
+            listed = set(file_list)
+        for file_path in file_list:
+            # Dosya yolundan sınıfı çıkar (örn: "5/image.png" -> "5")
+            class_name = file_path.split('/')[0]
+            if class_name not in CLASSES:
+                continue
+            if split == 'train':
+                train_total += 1
+            if base_only and split == 'train':
+                family = augmentation_family(file_path)
+                base = base_file(file_path)
+                # Temel resmi listede olmayan varyantlar normal resim gibi saklanır
+                if family != 'original' and base in listed:
+                    variant_pairs.setdefault(family, []).append(
+                        (Path(source_dir) / file_path, Path(source_dir) / base))
+                    continue
+            dst = splits[split] / class_name / Path(file_path).name
+            wanted[dst.relative_to(output_dir).as_posix()] = (Path(source_dir) / file_path, split, class_name)
+
+    # Değişmemiş dosyaları atla, değişenleri aktarım listesine ekle
+    files = {}
+    todo = []
+    missing = 0
+    for rel_dst, (src, split, class_name) in wanted.items():
+        try:
+            stat = src.stat()
+        except OSError:
+            missing += 1
+            continue
+        entry = {
+            'src': str(src),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'split': split,
+            'class': class_name,
+            'mode': mode,
+            'method': mode
+        }
+        old = old_files.get(rel_dst)
+        dst = Path(output_dir) / rel_dst
+        if incremental and old is not None and (dst.exists() or dst.is_symlink()) and all(
+                old.get(key) == entry[key] for key in ('src', 'size', 'mtime_ns', 'mode')):
+            files[rel_dst] = old
+        else:
+            files[rel_dst] = entry
+            todo.append((src, dst, rel_dst))
+
+    # Listeden çıkarılmış eski dosyaları sil
+    stale = [rel_dst for rel_dst in old_files if rel_dst not in files]
+    for rel_dst in stale:
+        stale_path = Path(output_dir) / rel_dst
+        if stale_path.exists() or stale_path.is_symlink():
+            stale_path.unlink()
+
+    # Değişen dosyaları paralel olarak aktar
+    print(f"Veriler hazırlanıyor ({mode}, {threads} thread)...")
+    fallback = 0
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        used_modes = executor.map(lambda job: materialize(job[0], job[1], mode), todo)
+        for (_, _, rel_dst), used_mode in zip(todo, used_modes):
+            files[rel_dst]['method'] = used_mode
+            fallback += used_mode != mode
+
+    save_manifest(output_dir, {'version': 1, 'files': files})
+
+    params_path = Path(output_dir) / 'augment.json'
+    if base_only:
+        from variant_augment import estimate_params, save_params
+        train_kept = sum(1 for entry in files.values() if entry['split'] == 'train')
+        skipped = sum(len(family_pairs) for family_pairs in variant_pairs.values())
+        print(f"\nAtlanan varyant: {skipped}, saklanan eğitim resmi: {train_kept} "
+              f"(eğitim seti {train_total / max(1, train_kept):.1f}x küçüldü)")
+        print("Artırma parametreleri tahmin ediliyor...")
+        save_params(output_dir, {
+            'families': estimate_params(variant_pairs, estimate_samples),
+            # Temel resim başına aile sıklıkları ve epoch uzunluğunu koruyan tekrar sayısı
+            'weights': {'original': 1.0, **{family: len(family_pairs) / max(1, train_kept)
+                                            for family, family_pairs in variant_pairs.items()}},
+            'repeats': max(1, round(train_total / max(1, train_kept)))
+        })
+        print(f"Artırma parametreleri kaydedildi: {params_path}")
+    elif params_path.exists():
+        # Tam veri setinde varyantlar diskte olduğundan anlık artırma kapatılır
+        params_path.unlink()
+
     print(f"\nVeri hazırlama tamamlandı!")
-    print(f"Eğitim verileri: {train_dir}")
-    print(f"Validasyon verileri: {val_dir}")
-    
-    # İstatistikler
+    print(f"Eğitim verileri: {splits['train']}")
+    print(f"Validasyon verileri: {splits['val']}")
+    print(f"Aktarılan: {len(todo)}, değişmeyen: {len(files) - len(todo)}, "
+          f"silinen: {len(stale)}, kaynakta bulunamayan: {missing}")
+    if fallback:
+        print(f"UYARI: {fallback} dosya bağlanamadığı için kopyalandı")
+
+    # İstatistikler - klasörleri yeniden taramak yerine manifest'ten
     print("\nİstatistikler:")
-    for cls in classes:
-        train_count = len(list((train_dir / cls).glob('*')))
-        val_count = len(list((val_dir / cls).glob('*')))
+    counts = {}
+    for entry in files.values():
+        key = (entry['split'], entry['class'])
+        counts[key] = counts.get(key, 0) + 1
+    for cls in CLASSES:
+        train_count = counts.get(('train', cls), 0)
+        val_count = counts.get(('val', cls), 0)
         print(f"  {cls} TL: Eğitim={train_count}, Validasyon={val_count}")
 
-if __name__ == '__main__':
-    prepare_yolo_dataset()
+    return files
 
+def pack_dataset(files, pack_dir, imgsz=640, shard_size=2048, threads=8, data_dir='dataset'):
+    """
+    Manifest'teki resimleri önceden boyutlandırılmış bellek eşlemeli depoya yazar.
+    train.py --packed bu depodan PNG çözmeden eğitim yapar.
+
+    Args:
+        files: prepare_yolo_dataset'in döndürdüğü manifest kayıtları
+        pack_dir: Depo klasörü
+        imgsz: Saklanacak kısa kenar boyutu (eğitim imgsz değerine eşit olmalı)
+        shard_size: Shard başına resim sayısı
+        threads: Paralel çözme thread sayısı
+        data_dir: prepare_yolo_dataset çıktı klasörü (augment.json buradan kopyalanır)
+    """
+    # numpy/cv2 yalnızca paketleme istendiğinde gerekir
+    from packed_dataset import write_packed_store
+
+    items_by_split = {'train': [], 'val': []}
+    for rel_dst in sorted(files):
+        entry = files[rel_dst]
+        items_by_split[entry['split']].append((entry['src'], entry['class']))
+
+    print(f"\nPaketlenmiş depo yazılıyor: {pack_dir} (imgsz={imgsz})")
+    store_bytes, source_bytes = write_packed_store(items_by_split, pack_dir, imgsz=imgsz,
+                                                   shard_size=shard_size, threads=threads)
+    ratio = store_bytes / source_bytes if source_bytes else 0.0
+    print(f"Depo boyutu: {store_bytes / 1e6:.1f} MB, kaynak resimler: {source_bytes / 1e6:.1f} MB "
+          f"(oran {ratio:.2f})")
+    if ratio > 1:
+        print("UYARI: Depo PNG'lerden büyük; daha küçük --pack-size kullanmayı düşünün")
+
+    params_path = Path(data_dir) / 'augment.json'
+    packed_params = Path(pack_dir) / 'augment.json'
+    if params_path.exists():
+        shutil.copy2(params_path, packed_params)
+    elif packed_params.exists():
+        packed_params.unlink()
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLOv8 Banknot veri hazırlama')
+    parser.add_argument('--train', type=str, default='train.txt',
+                        help='Eğitim dosyalarının listesi')
+    parser.add_argument('--val', type=str, default='validation.txt',
+                        help='Validasyon dosyalarının listesi')
+    parser.add_argument('--output', type=str, default='dataset',
+                        help='Çıktı klasörü')
+    parser.add_argument('--source-dir', type=str, default='.',
+                        help='Resimlerin bulunduğu kök klasör')
+    parser.add_argument('--mode', type=str, default='copy', choices=MODES,
+                        help='Dosyaları kopyala veya bağla (hardlink/symlink kopyalamayı tamamen önler)')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Paralel aktarım thread sayısı')
+    parser.add_argument('--full', action='store_true',
+                        help='Değişmemiş dosyaları da yeniden aktar')
+    parser.add_argument('--pack', type=str, default=None,
+                        help='Önceden boyutlandırılmış bellek eşlemeli depo klasörü (örn: dataset_packed)')
+    parser.add_argument('--pack-size', type=int, default=640,
+                        help='Depoda saklanacak kısa kenar boyutu (eğitim imgsz ile aynı olmalı)')
+    parser.add_argument('--shard-size', type=int, default=2048,
+                        help='Depo shard başına resim sayısı')
+    parser.add_argument('--base-only', action='store_true',
+                        help='Eğitimde ön işlenmiş varyantları atla, train.py ile anlık üret')
+    parser.add_argument('--estimate-samples', type=int, default=32,
+                        help='Aile başına parametre tahmininde kullanılacak çift sayısı')
+
+    args = parser.parse_args()
+
+    files = prepare_yolo_dataset(args.train, args.val, args.output, args.source_dir,
+                                 mode=args.mode, threads=args.threads, incremental=not args.full,
+                                 base_only=args.base_only, estimate_samples=args.estimate_samples)
+    if args.pack:
+        pack_dataset(files, args.pack, imgsz=args.pack_size, shard_size=args.shard_size,
+                     threads=args.threads, data_dir=args.output)
+
+if __name__ == '__main__':
+    main()
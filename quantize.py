@@ -0,0 +1,268 @@
+"""
+YOLOv8 Classification modeli için INT8 eğitim sonrası nicemleme (quantization) scripti.
+validation.txt içindeki resimlerle kalibre eder ve FP32 best.pt ile
+doğruluk, gecikme ve model boyutu karşılaştırma raporu yazar.
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+import cv2
+import numpy as np
+
+from backends import OnnxClassifier, classify_preprocess, load_model
+from variant_augment import AUGMENTATION_FAMILIES, augmentation_family
+
+def read_split(list_file, source_dir='.'):
+    """
+    Liste dosyasındaki resimleri (yol, sınıf klasörü, aile) olarak okur.
+    Diskte bulunmayan dosyalar atlanır.
+    """
+    items = []
+    with open(list_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            file_path = line.strip()
+            if not file_path:
+                continue
+            src = Path(source_dir) / file_path
+            if src.exists():
+                items.append((str(src), file_path.split('/')[0], augmentation_family(file_path)))
+    return items
+
+class ValidationCalibrationReader:
+    """
+    onnxruntime nicemleme kalibrasyonu için veri okuyucu.
+    Resimleri model ile aynı ön işlemeden geçirip batch'ler halinde verir.
+    """
+
+    def __init__(self, image_paths, input_name, imgsz, batch=16):
+        self.image_paths = image_paths
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self.batch = batch
+        self._index = 0
+
+    def get_next(self):
+        while self._index < len(self.image_paths):
+            paths = self.image_paths[self._index:self._index + self.batch]
+            self._index += self.batch
+            images = [img for img in (cv2.imread(p) for p in paths) if img is not None]
+            if images:
+                return {self.input_name: classify_preprocess(images, self.imgsz)}
+        return None
+
+    def rewind(self):
+        self._index = 0
+
+def quantize_model(fp32_onnx, output_path, calibration_paths, batch=16, per_channel=True):
+    """
+    FP32 ONNX modelini statik INT8 nicemleme ile dönüştürür.
+
+    Args:
+        fp32_onnx: FP32 ONNX model yolu
+        output_path: INT8 model çıktı yolu
+        calibration_paths: Kalibrasyon resimleri
+        batch: Kalibrasyon batch boyutu
+        per_channel: Ağırlıkları kanal bazında nicemle
+
+    Returns:
+        INT8 model yolu
+    """
+    from onnxruntime.quantization import (CalibrationMethod, QuantFormat, QuantType,
+                                          quantize_static)
+
+    fp32 = OnnxClassifier(fp32_onnx)
+    model_input = fp32_onnx
+    try:
+        # Şekil çıkarımı ve graf sadeleştirme nicemleme kalitesini artırır
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+        model_input = str(Path(output_path).with_suffix('.prep.onnx'))
+        quant_pre_process(fp32_onnx, model_input)
+    except Exception as e:
+        print(f"UYARI: Ön işleme atlandı ({e})")
+        model_input = fp32_onnx
+
+    reader = ValidationCalibrationReader(calibration_paths, fp32.input_name, fp32.imgsz, batch)
+    quantize_static(
+        model_input,
+        output_path,
+        reader,
+        quant_format=QuantFormat.QDQ,
+        per_channel=per_channel,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax
+    )
+
+    # Sınıf isimleri ve giriş boyutu metadata'sını INT8 modele taşı
+    import onnx
+    quantized = onnx.load(output_path)
+    existing = {prop.key for prop in quantized.metadata_props}
+    for key, value in fp32.session.get_modelmeta().custom_metadata_map.items():
+        if key not in existing:
+            prop = quantized.metadata_props.add()
+            prop.key, prop.value = key, value
+    onnx.save(quantized, output_path)
+
+    if model_input != fp32_onnx and os.path.exists(model_input):
+        os.remove(model_input)
+    return output_path
+
+def evaluate(model, items, batch=32):
+    """
+    Modelin genel ve artırma ailesi bazında top-1 doğruluğunu hesaplar.
+
+    Args:
+        model: load_model() ile yüklenmiş model
+        items: read_split() çıktısı
+        batch: Değerlendirme batch boyutu
+
+    Returns:
+        {'overall': doğruluk, 'families': {aile: doğruluk}, 'count': resim sayısı}
+    """
+    # Klasör adı -> model sınıf indeksi
+    name_to_idx = {str(name): idx for idx, name in model.names.items()}
+    correct = {}
+    total = {}
+    for start in range(0, len(items), batch):
+        chunk = items[start:start + batch]
+        images = [cv2.imread(path) for path, _, _ in chunk]
+        pairs = [(img, item) for img, item in zip(images, chunk) if img is not None]
+        if not pairs:
+            continue
+        results = model([img for img, _ in pairs], verbose=False)
+        for result, (_, (_, class_dir, family)) in zip(results, pairs):
+            hit = int(result.probs.top1 == name_to_idx.get(class_dir, -1))
+            for key in ('overall', family):
+                correct[key] = correct.get(key, 0) + hit
+                total[key] = total.get(key, 0) + 1
+
+    accuracy = lambda key: correct.get(key, 0) / total[key] if total.get(key) else None
+    return {
+        'overall': accuracy('overall'),
+        'families': {family: accuracy(family) for family in ['original'] + AUGMENTATION_FAMILIES},
+        'count': total.get('overall', 0)
+    }
+
+def measure_latency(model, image_paths, runs=50, warmup=5, **predict_args):
+    """Tek resimlik çıkarımın ortalama ve p95 gecikmesini (ms) ölçer."""
+    images = [img for img in (cv2.imread(p) for p in image_paths[:runs]) if img is not None]
+    if not images:
+        return {'mean_ms': None, 'p95_ms': None}
+    for img in images[:warmup]:
+        model(img, verbose=False, **predict_args)
+    timings = []
+    for img in images:
+        start = time.perf_counter()
+        model(img, verbose=False, **predict_args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {'mean_ms': float(np.mean(timings)), 'p95_ms': float(np.percentile(timings, 95))}
+
+def model_size_mb(path):
+    return os.path.getsize(path) / (1024 * 1024)
+
+def write_report(report, report_path):
+    """Raporu JSON ve okunabilir Markdown olarak yazar."""
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    fmt = lambda value: f"{value:.2%}" if value is not None else "-"
+    lines = [
+        "# INT8 Nicemleme Raporu",
+        "",
+        "| Model | Boyut (MB) | Gecikme ort. (ms) | Gecikme p95 (ms) | Top-1 (tümü) | "
+        + " | ".join(['original'] + AUGMENTATION_FAMILIES) + " |",
+        "|---" * (5 + 1 + len(AUGMENTATION_FAMILIES)) + "|",
+    ]
+    for name, entry in report['models'].items():
+        latency = entry['latency']
+        mean_ms = f"{latency['mean_ms']:.2f}" if latency['mean_ms'] is not None else "-"
+        p95_ms = f"{latency['p95_ms']:.2f}" if latency['p95_ms'] is not None else "-"
+        families = [fmt(entry['accuracy']['families'][f]) for f in ['original'] + AUGMENTATION_FAMILIES]
+        lines.append(
+            f"| {name} | {entry['size_mb']:.2f} | {mean_ms} | {p95_ms} | "
+            f"{fmt(entry['accuracy']['overall'])} | " + " | ".join(families) + " |"
+        )
+    lines.append("")
+    lines.append(f"Değerlendirilen resim sayısı: {report['count']}")
+    markdown_path = str(Path(report_path).with_suffix('.md'))
+    with open(markdown_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return markdown_path
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLOv8 Banknot modeli için INT8 nicemleme')
+    parser.add_argument('--model', type=str, default='runs/classify/banknot_classifier/weights/best.pt',
+                        help='FP32 PyTorch model yolu')
+    parser.add_argument('--val', type=str, default='validation.txt',
+                        help='Kalibrasyon ve değerlendirme listesi')
+    parser.add_argument('--source-dir', type=str, default='.',
+                        help='Resimlerin bulunduğu kök klasör')
+    parser.add_argument('--output', type=str, default=None,
+                        help='INT8 model yolu (varsayılan: best_int8.onnx)')
+    parser.add_argument('--calib-size', type=int, default=0,
+                        help='Kalibrasyonda kullanılacak resim sayısı (0: tümü)')
+    parser.add_argument('--batch', type=int, default=16,
+                        help='Kalibrasyon ve değerlendirme batch boyutu')
+    parser.add_argument('--per-tensor', action='store_true',
+                        help='Ağırlıkları kanal yerine tensör bazında nicemle')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"HATA: Model dosyası bulunamadı: {args.model}")
+        print("Önce modeli eğitin: python train.py")
+        return
+
+    items = read_split(args.val, args.source_dir)
+    if not items:
+        print(f"HATA: {args.val} içindeki resimler bulunamadı (kaynak: {args.source_dir})")
+        return
+
+    # FP32 ONNX modelini hazırla
+    fp32_onnx = str(Path(args.model).with_suffix('.onnx'))
+    if not os.path.exists(fp32_onnx):
+        from export_onnx import export_onnx
+        fp32_onnx = export_onnx(args.model)
+    int8_onnx = args.output or str(Path(args.model).with_name(Path(args.model).stem + '_int8.onnx'))
+
+    calibration_paths = [path for path, _, _ in items]
+    if args.calib_size > 0:
+        # Tüm sınıf ve ailelerden örnek almak için eşit aralıklı seçim
+        step = max(1, len(calibration_paths) // args.calib_size)
+        calibration_paths = calibration_paths[::step][:args.calib_size]
+
+    print(f"Kalibrasyon: {len(calibration_paths)} resim")
+    quantize_model(fp32_onnx, int8_onnx, calibration_paths, batch=args.batch,
+                   per_channel=not args.per_tensor)
+    print(f"INT8 model kaydedildi: {int8_onnx}")
+
+    # Karşılaştırma
+    report = {'count': len(items), 'models': {}}
+    candidates = [
+        ('FP32 (best.pt)', args.model, 'torch'),
+        ('FP32 (ONNX)', fp32_onnx, 'onnx'),
+        ('INT8 (ONNX)', int8_onnx, 'onnx'),
+    ]
+    for name, path, backend in candidates:
+        print(f"\nDeğerlendiriliyor: {name}")
+        model = load_model(path, backend)
+        accuracy = evaluate(model, items, batch=args.batch)
+        report['models'][name] = {
+            'path': path,
+            'size_mb': model_size_mb(path),
+            'latency': measure_latency(model, calibration_paths),
+            'accuracy': accuracy
+        }
+        if accuracy['overall'] is not None:
+            print(f"  Top-1: {accuracy['overall']:.2%}")
+
+    report_path = str(Path(int8_onnx).with_name('quantization_report.json'))
+    markdown_path = write_report(report, report_path)
+    print(f"\nRapor kaydedildi: {report_path}, {markdown_path}")
+    print(f"Kullanım: python detect.py --source <resim> --model {int8_onnx}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+Yerel HTTP çıkarım sunucusu (dinamik mikro-batch).
+Modeli bir kez yükleyip sıcak tutar; eşzamanlı istekleri asyncio ile en fazla
+`--max-batch` boyutunda ve en fazla `--max-wait-ms` bekleyen mikro-batch'lerde
+toplayıp tek ileri geçişte sınıflandırır. Harici bağımlılık gerektirmez.
+
+Uç noktalar:
+    POST /predict  - gövde: ham resim baytları (jpg/png), yanıt: sınıf ve olasılıklar (JSON)
+    GET  /metrics  - kuyruk derinliği ve batch boyutu histogramları (JSON)
+    GET  /metrics/prometheus - aşama gecikmeleri ve sayaçlar (Prometheus metin biçimi)
+    GET  /health   - sunucu durumu
+
+Yük üretimi (ayrı terminalde):
+    python load_generator.py --requests 1000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from backends import BACKENDS, model_imgsz
+from cascade import load_classifier, parse_cascade
+from classifier import predict_arrays
+from decode import decode_image, decode_min_side
+from metrics import METRICS, PROMETHEUS_CONTENT_TYPE
+from video_stream import peak_rss_mb
+
+# Kabul edilen en büyük istek gövdesi (byte)
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+def sorted_histogram(counter):
+    return {str(key): counter[key] for key in sorted(counter)}
+
+class MicroBatcher:
+    """
+    Eşzamanlı istekleri mikro-batch'lerde toplayan asyncio kuyruğu.
+
+    İlk istek geldiğinde en fazla `max_wait_ms` beklenir; bu sürede kuyruğa düşen
+    istekler (en fazla `max_batch`) aynı ileri geçişe eklenir. Model çağrısı tek
+    thread'lik havuzda çalışır, böylece olay döngüsü bloklanmaz.
+    """
+
+    def __init__(self, model, max_batch=16, max_wait_ms=10.0, imgsz=None):
+        """
+        Args:
+            model: Yüklenmiş model (YOLO, OnnxClassifier veya CascadeClassifier)
+            max_batch: Tek ileri geçişteki en fazla resim sayısı
+            max_wait_ms: Batch doldurmak için ilk istekten sonra beklenecek en uzun süre
+            imgsz: Çıkarım boyutu (None: modelin varsayılanı)
+        """
+        self.model = model
+        self.names = model.names
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.size_args = {'imgsz': imgsz} if imgsz else {}
+        self.queue = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self.batch_sizes = Counter()
+        self.queue_depths = Counter()
+        self.stats = {'requests': 0, 'batches': 0, 'errors': 0, 'inference_seconds': 0.0}
+        self.started = time.time()
+
+    def infer(self, images):
+        """Resim listesini tek model çağrısında sınıflandırır; olasılık matrisini döndürür."""
+        return predict_arrays(self.model, images, **self.size_args)[2]
+
+    async def submit(self, img):
+        """Resmi kuyruğa ekler ve sonucunu (olasılıklar, batch boyutu, kuyruk süresi) bekler."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((img, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            # Kuyrukta bekleyenler beklemeden alınır; boşsa süre dolana kadar beklenir
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        """Kuyruğu sürekli boşaltan batch döngüsü."""
+        self.queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Batch oluştuğu anda geride kalan istek sayısı
+            self.queue_depths[self.queue.qsize()] += 1
+            self.batch_sizes[len(batch)] += 1
+            METRICS.set('queue_depth', self.queue.qsize())
+            dispatched = time.perf_counter()
+            try:
+                probs = await loop.run_in_executor(self.executor, self.infer, [item[0] for item in batch])
+            except Exception as e:
+                self.stats['errors'] += len(batch)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['inference_seconds'] += time.perf_counter() - dispatched
+            METRICS.observe('inference', time.perf_counter() - dispatched)
+            METRICS.inc('requests', len(batch))
+            METRICS.inc('batches')
+            for (_, future, queued), row in zip(batch, probs):
+                if not future.done():
+                    future.set_result((row, len(batch), dispatched - queued))
+
+    def metrics(self):
+        """Kuyruk derinliği ve batch boyutu histogramları ile sayaçlar."""
+        batches = self.stats['batches']
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'requests': self.stats['requests'],
+            'batches': batches,
+            'errors': self.stats['errors'],
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'mean_batch_size': self.stats['requests'] / batches if batches else 0.0,
+            'mean_inference_ms': self.stats['inference_seconds'] * 1000 / batches if batches else 0.0,
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000,
+            'batch_size_histogram': sorted_histogram(self.batch_sizes),
+            'queue_depth_histogram': sorted_histogram(self.queue_depths),
+            'peak_rss_mb': peak_rss_mb()
+        }
+
+class InferenceServer:
+    """asyncio akışları üzerinde çalışan küçük HTTP/1.1 sunucusu (keep-alive destekli)."""
+
+    def __init__(self, batcher, fast_decode=False):
+        self.batcher = batcher
+        # Yanıt yalnızca sınıf içerir; istenirse büyük JPEG'ler modelin boyutuna küçültülmüş çözülür
+        min_side = decode_min_side(batcher.model, batcher.size_args.get('imgsz')) if fast_decode else None
+        self.decode = METRICS.wrap('decode', lambda image_bytes: decode_image(image_bytes, min_side))
+        self.decode_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4,
+                                                  thread_name_prefix='decode')
+
+    async def predict(self, body):
+        if not body:
+            return 400, {'error': 'İstek gövdesinde resim yok'}
+        start = time.perf_counter()
+        img = await asyncio.get_running_loop().run_in_executor(
+            self.decode_executor, self.decode, body)
+        if img is None:
+            return 400, {'error': 'Resim çözülemedi'}
+        probs, batch_size, queue_seconds = await self.batcher.submit(img)
+        top1 = int(np.argmax(probs))
+        names = self.batcher.names
+        return 200, {
+            'class_id': top1,
+            'class': names.get(top1, str(top1)),
+            'confidence': float(probs[top1]),
+            'probabilities': {names.get(i, str(i)): float(p) for i, p in enumerate(probs)},
+            'batch_size': batch_size,
+            'queue_ms': queue_seconds * 1000,
+            'latency_ms': (time.perf_counter() - start) * 1000
+        }
+
+    async def route(self, method, path, body):
+        path = path.split('?', 1)[0]
+        if path == '/predict':
+            if method != 'POST':
+                return 405, {'error': 'POST kullanın'}
+            return await self.predict(body)
+        if path == '/metrics/prometheus' and method == 'GET':
+            return 200, METRICS.render_prometheus()
+        if path == '/metrics' and method == 'GET':
+            return 200, self.batcher.metrics()
+        if path == '/health' and method == 'GET':
+            return 200, {'status': 'ok', 'classes': list(self.batcher.names.values())}
+        return 404, {'error': f'Bilinmeyen uç nokta: {path}'}
+
+    @staticmethod
+    async def respond(writer, status, payload, keep_alive):
+        # Metin yanıtlar (Prometheus) olduğu gibi, diğerleri JSON olarak gönderilir
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = PROMETHEUS_CONTENT_TYPE
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        """Bir bağlantıdaki istekleri sırayla işler."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, {'error': 'İstek gövdesi çok büyük'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    status, payload = await self.route(method.upper(), path, body)
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(batcher, host='127.0.0.1', port=8000, fast_decode=False):
+    server = InferenceServer(batcher, fast_decode)
+    batch_task = asyncio.create_task(batcher.run())
+    tcp_server = await asyncio.start_server(server.handle, host, port)
+    print(f"Sunucu hazır: http://{host}:{port} (POST /predict, GET /metrics, GET /health)")
+    print(f"Mikro-batch: en fazla {batcher.max_batch} resim, en fazla {batcher.max_wait * 1000:.1f} ms bekleme")
+    try:
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        batch_task.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLOv8 Banknot HTTP çıkarım sunucusu')
+    parser.add_argument('--model', type=str, default='runs/classify/banknot_classifier/weights/best.pt',
+                        help='Eğitilmiş model yolu')
+    parser.add_argument('--backend', type=str, default='auto', choices=BACKENDS,
+                        help='Çıkarım arka ucu (auto: .onnx uzantısı ONNX Runtime ile çalışır)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='ONNX Runtime intra-op thread sayısı')
+    parser.add_argument('--cascade', type=str, default=None,
+                        help='İki aşamalı kaskad: hizli.pt[@imgsz],dogru.pt[@imgsz] (--model yerine kullanılır)')
+    parser.add_argument('--cascade-threshold', type=float, default=0.9,
+                        help='Bu güvenin altındaki girişler ikinci aşamaya gider')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Dinlenecek adres (varsayılan yalnızca yerel)')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='Dinlenecek port')
+    parser.add_argument('--max-batch', type=int, default=16,
+                        help='Tek ileri geçişte işlenecek en fazla resim')
+    parser.add_argument('--max-wait-ms', type=float, default=10.0,
+                        help='Batch doldurmak için ilk istekten sonra en fazla bekleme (ms)')
+    parser.add_argument('--imgsz', type=int, default=None,
+                        help='Çıkarım boyutu (varsayılan: modelin eğitildiği boyut)')
+    parser.add_argument('--fast-decode', action='store_true',
+                        help="Büyük JPEG'leri modelin boyutuna küçültülmüş çöz (tahminler az farklı olabilir)")
+
+    args = parser.parse_args()
+
+    cascade = None
+    if args.cascade:
+        try:
+            cascade = parse_cascade(args.cascade, args.cascade_threshold)
+        except ValueError as e:
+            print(f"HATA: {e}")
+            return
+    model_paths = [cascade['fast_path'], cascade['accurate_path']] if cascade else [args.model]
+    for model_path in model_paths:
+        if not os.path.exists(model_path):
+            print(f"HATA: Model dosyası bulunamadı: {model_path}")
+            print("Önce modeli eğitin: python train.py")
+            return
+
+    model = load_classifier(args.model, args.backend, threads=args.threads, cascade=cascade)
+    imgsz = None if cascade else (args.imgsz or model_imgsz(model))
+    batcher = MicroBatcher(model, args.max_batch, args.max_wait_ms, imgsz)
+
+    # İlk istek ısınma maliyetini ödemesin diye boş bir batch ile ısıt
+    print("Model ısıtılıyor...")
+    batcher.infer([np.zeros((imgsz or 224, imgsz or 224, 3), dtype=np.uint8)])
+
+    try:
+        asyncio.run(serve(batcher, args.host, args.port, args.fast_decode))
+    except KeyboardInterrupt:
+        metrics = batcher.metrics()
+        print(f"\nSunucu durduruldu: {metrics['requests']} istek, {metrics['batches']} batch "
+              f"(ortalama batch {metrics['mean_batch_size']:.2f})")
+
+if __name__ == '__main__':
+    main()
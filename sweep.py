@@ -0,0 +1,229 @@
+"""
+Çözünürlük ve model boyutu taraması (Pareto sweep) scripti.
+imgsz ve model boyutu kombinasyonlarını eğitir, validasyon doğruluğunu ve
+CPU gecikmesini ölçer, doğruluk-gecikme tablosu ve grafiği yazar ve Pareto
+sınırını işaretler. Seçilen yapılandırma varsayılan best.pt olarak dışa aktarılabilir.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from backends import load_model
+from benchmark import parse_list
+from quantize import evaluate, measure_latency, model_size_mb, read_split
+
+DEFAULT_MODEL_PATH = 'runs/classify/banknot_classifier/weights/best.pt'
+
+def run_name(model_size, imgsz):
+    return f"yolov8{model_size}_{imgsz}"
+
+def pareto_frontier(entries):
+    """
+    Hiçbir yapılandırmanın hem daha hızlı hem daha doğru olmadığı kayıtları döndürür.
+    Gecikmeye göre artan sırada dolaşılır; doğruluğu o ana kadarki en iyiyi aşanlar sınırdadır.
+    """
+    frontier = []
+    best_accuracy = -1.0
+    for entry in sorted(entries, key=lambda e: (e['latency_ms'], -e['accuracy'])):
+        if entry['accuracy'] > best_accuracy:
+            frontier.append(entry)
+            best_accuracy = entry['accuracy']
+    return frontier
+
+def choose_config(entries, tolerance=0.005):
+    """En iyi doğruluğa `tolerance` kadar yakın yapılandırmalar arasından en hızlısını seçer."""
+    best_accuracy = max(entry['accuracy'] for entry in entries)
+    candidates = [entry for entry in entries if entry['accuracy'] >= best_accuracy - tolerance]
+    return min(candidates, key=lambda e: e['latency_ms'])
+
+def write_table(report, path):
+    """Sonuçları Markdown tablosu olarak yazar."""
+    lines = [
+        "# Çözünürlük / Model Boyutu Taraması",
+        "",
+        "| Yapılandırma | Model | imgsz | Top-1 | Gecikme ort. (ms) | Gecikme p95 (ms) | Boyut (MB) | Pareto |",
+        "|---|---|---|---|---|---|---|---|"
+    ]
+    for entry in sorted(report['runs'], key=lambda e: e['latency_ms']):
+        marker = "✓" if entry['pareto'] else ""
+        if entry['name'] == report.get('chosen'):
+            marker += " (seçilen)"
+        lines.append(
+            f"| {entry['name']} | {entry['model_size']} | {entry['imgsz']} | {entry['accuracy']:.2%} | "
+            f"{entry['latency_ms']:.2f} | {entry['latency_p95_ms']:.2f} | {entry['size_mb']:.2f} | {marker} |"
+        )
+    lines.append("")
+    lines.append(f"Değerlendirilen resim sayısı: {report['images']}")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+def plot_sweep(report, path):
+    """Doğruluk-gecikme grafiğini Pareto sınırı ve seçilen yapılandırma ile çizer."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    runs = report['runs']
+    frontier = sorted((e for e in runs if e['pareto']), key=lambda e: e['latency_ms'])
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.scatter([e['latency_ms'] for e in runs], [e['accuracy'] for e in runs], color='tab:blue', label='Yapılandırmalar')
+    ax.plot([e['latency_ms'] for e in frontier], [e['accuracy'] for e in frontier],
+            color='tab:red', marker='o', label='Pareto sınırı')
+    for entry in runs:
+        ax.annotate(entry['name'], (entry['latency_ms'], entry['accuracy']),
+                    textcoords='offset points', xytext=(4, 4), fontsize=8)
+    chosen = next((e for e in runs if e['name'] == report.get('chosen')), None)
+    if chosen:
+        ax.scatter([chosen['latency_ms']], [chosen['accuracy']], marker='*', s=250,
+                   color='tab:green', zorder=3, label='Seçilen')
+    ax.set_xlabel('CPU gecikmesi (ms / resim)')
+    ax.set_ylabel('Top-1 doğruluk (validasyon)')
+    ax.set_title('Doğruluk - gecikme')
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+
+def export_default(weights, target=DEFAULT_MODEL_PATH):
+    """Seçilen modeli detect.py ve gui.py'nin yüklediği varsayılan yola kopyalar."""
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        backup = target.with_name(f"{target.stem}_before_sweep{target.suffix}")
+        shutil.copy2(target, backup)
+        print(f"Önceki model yedeklendi: {backup}")
+    shutil.copy2(weights, target)
+    print(f"Seçilen model varsayılan olarak kaydedildi: {target}")
+    if target.with_suffix('.onnx').exists():
+        print(f"UYARI: {target.with_suffix('.onnx')} eski modele ait; yeniden dışa aktarın: "
+              f"python export_onnx.py --model {target}")
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLOv8 Banknot çözünürlük / model boyutu taraması')
+    parser.add_argument('--data', type=str, default='dataset',
+                        help='Veri klasörü (veya prepare_data.py --pack deposu)')
+    parser.add_argument('--imgsz', type=str, default='128,224,320,640',
+                        help='Taranacak görüntü boyutları (virgülle ayrılmış)')
+    parser.add_argument('--sizes', type=str, default='n,s,m',
+                        help='Taranacak model boyutları (virgülle ayrılmış)')
+    parser.add_argument('--epochs', type=int, default=20,
+                        help='Yapılandırma başına eğitim epoch sayısı')
+    parser.add_argument('--batch', type=int, default=8,
+                        help='Eğitim batch boyutu')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='DataLoader worker sayısı')
+    parser.add_argument('--val', type=str, default='validation.txt',
+                        help='Değerlendirmede kullanılacak resim listesi')
+    parser.add_argument('--source-dir', type=str, default='.',
+                        help='Resimlerin bulunduğu kök klasör')
+    parser.add_argument('--latency-runs', type=int, default=50,
+                        help='Gecikme ölçümünde kullanılacak resim sayısı')
+    parser.add_argument('--threads', type=int, default=0,
+                        help='CPU gecikme ölçümünde torch thread sayısı (0: varsayılan)')
+    parser.add_argument('--output', type=str, default='runs/sweep',
+                        help='Tarama çalıştırmalarının ve raporun klasörü')
+    parser.add_argument('--retrain', action='store_true',
+                        help='Ağırlıkları mevcut yapılandırmaları da yeniden eğit')
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help='Seçimde en iyi doğruluktan kabul edilen en fazla düşüş')
+    parser.add_argument('--choose', type=str, default=None,
+                        help='Otomatik seçim yerine kullanılacak yapılandırma (örn: yolov8n_224)')
+    parser.add_argument('--export', action='store_true',
+                        help='Seçilen modeli varsayılan best.pt olarak kaydet')
+    parser.add_argument('--target', type=str, default=DEFAULT_MODEL_PATH,
+                        help='--export için hedef model yolu')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.data):
+        print(f"HATA: '{args.data}' klasörü bulunamadı!")
+        print("Önce 'python prepare_data.py' komutunu çalıştırın.")
+        return 1
+
+    items = read_split(args.val, args.source_dir)
+    if not items:
+        print(f"HATA: {args.val} içindeki resimler bulunamadı (kaynak: {args.source_dir})")
+        return 1
+
+    if args.threads > 0:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    output = Path(args.output)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'data': args.data,
+        'epochs': args.epochs,
+        'images': len(items),
+        'runs': []
+    }
+
+    for model_size in [s.strip() for s in args.sizes.split(',') if s.strip()]:
+        for imgsz in parse_list(args.imgsz):
+            name = run_name(model_size, imgsz)
+            weights = output / name / 'weights' / 'best.pt'
+            if args.retrain or not weights.exists():
+                print(f"\n=== Eğitiliyor: {name} ===")
+                # Eğitim modülü (ultralytics trainer) yalnızca gerektiğinde içe aktarılır
+                from train import train_model
+                train_model(data_dir=args.data, epochs=args.epochs, imgsz=imgsz, batch=args.batch,
+                            model_size=model_size, workers=args.workers,
+                            name=name, project=str(output), exist_ok=True)
+            else:
+                print(f"\n=== Mevcut ağırlıklar kullanılıyor: {weights} ===")
+
+            model = load_model(str(weights), 'torch')
+            accuracy = evaluate(model, items)
+            latency = measure_latency(model, [path for path, _, _ in items], runs=args.latency_runs,
+                                      imgsz=imgsz, device='cpu')
+            entry = {
+                'name': name,
+                'model_size': model_size,
+                'imgsz': imgsz,
+                'weights': str(weights),
+                'accuracy': accuracy['overall'],
+                'families': accuracy['families'],
+                'latency_ms': latency['mean_ms'],
+                'latency_p95_ms': latency['p95_ms'],
+                'size_mb': model_size_mb(weights)
+            }
+            report['runs'].append(entry)
+            print(f"{name}: top-1={entry['accuracy']:.2%}, CPU gecikmesi={entry['latency_ms']:.2f} ms")
+
+    frontier = {entry['name'] for entry in pareto_frontier(report['runs'])}
+    for entry in report['runs']:
+        entry['pareto'] = entry['name'] in frontier
+
+    if args.choose:
+        chosen = next((e for e in report['runs'] if e['name'] == args.choose), None)
+        if chosen is None:
+            print(f"HATA: Yapılandırma bulunamadı: {args.choose}")
+            return 1
+    else:
+        chosen = choose_config(report['runs'], args.tolerance)
+    report['chosen'] = chosen['name']
+
+    output.mkdir(parents=True, exist_ok=True)
+    with open(output / 'sweep.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    write_table(report, output / 'sweep.md')
+    plot_sweep(report, output / 'sweep.png')
+    print(f"\nRapor kaydedildi: {output / 'sweep.md'}, {output / 'sweep.png'}")
+    print(f"Pareto sınırı: {', '.join(e['name'] for e in pareto_frontier(report['runs']))}")
+    print(f"Seçilen yapılandırma: {chosen['name']} (top-1={chosen['accuracy']:.2%}, "
+          f"{chosen['latency_ms']:.2f} ms)")
+
+    if args.export:
+        export_default(chosen['weights'], args.target)
+    else:
+        print("Varsayılan model olarak kaydetmek için --export ekleyin.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
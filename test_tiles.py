@@ -0,0 +1,76 @@
+"""tiles.py ızgara ve parça birleştirme testleri."""
+
+import pytest
+
+pytest.importorskip('cv2')
+
+from tiles import denomination, grid_tiles, merge_tiles
+
+def tile_detection(box, class_id=5, name='200', conf=0.95):
+    return {'class_id': class_id, 'name': name, 'conf': conf, 'bbox': box}
+
+def total(notes):
+    return sum(denomination(note['name']) for note in notes)
+
+def test_note_spanning_several_tiles_is_one_detection():
+    # 2x3 ızgara, 0.25 örtüşme: komşu parçaların IoU'su ≈ 0.14
+    boxes = grid_tiles(600, 900)
+    assert len(boxes) == 6
+    # Banknot sol üstteki dört parçayı kaplar
+    note_region = (0, 0, 600, 560)
+    detections = [tile_detection(box) for box in (boxes[0], boxes[1], boxes[3], boxes[4])]
+
+    notes = merge_tiles(detections, [note_region])
+
+    assert len(notes) == 1
+    assert notes[0]['tiles'] == 4
+    assert notes[0]['bbox'] == note_region
+    assert total(notes) == 200
+
+def test_note_spanning_several_tiles_without_regions():
+    boxes = grid_tiles(600, 900)
+    # Tohum (en güvenli parça) diğer üç parçayla doğrudan örtüşür
+    detections = [tile_detection(boxes[0], conf=0.99)]
+    detections += [tile_detection(box) for box in (boxes[1], boxes[3], boxes[4])]
+
+    notes = merge_tiles(detections)
+
+    assert len(notes) == 1
+    assert notes[0]['bbox'] == (0, 0, boxes[4][2], boxes[4][3])
+    assert total(notes) == 200
+
+def test_adjacent_same_class_notes_stay_apart():
+    # Yan yana iki 100 TL banknot tüm ızgarayı kaplar; her parça komşusuyla örtüşür
+    boxes = grid_tiles(600, 900)
+    regions = [(10, 20, 440, 580), (460, 20, 890, 580)]
+    detections = [tile_detection(box, class_id=1, name='100') for box in boxes]
+
+    notes = merge_tiles(detections, regions)
+
+    assert len(notes) == 2
+    assert sorted(note['bbox'] for note in notes) == regions
+    assert total(notes) == 200
+
+def test_grid_neighbours_are_not_chained():
+    # Bölge yoksa ortadaki parça iki yandaki parçayı tek banknotta birleştirmez
+    boxes = grid_tiles(600, 900)
+    detections = [tile_detection(boxes[0], conf=0.99), tile_detection(boxes[1]), tile_detection(boxes[2])]
+
+    notes = merge_tiles(detections)
+
+    assert len(notes) == 2
+    assert total(notes) == 400
+
+def test_separate_classes_stay_apart():
+    boxes = grid_tiles(600, 900)
+    detections = [
+        tile_detection(boxes[0]),
+        tile_detection(boxes[1], class_id=2, name='20'),
+        tile_detection(boxes[2])
+    ]
+
+    notes = merge_tiles(detections)
+
+    # Aynı sınıftaki 0 ve 2 numaralı parçalar örtüşmez
+    assert len(notes) == 3
+    assert total(notes) == 420
@@ -0,0 +1,204 @@
+"""
+Birden fazla banknot içeren kareler için döşemeli (tiled) sınıflandırma.
+Kare ızgara/kayan pencerelere (isteğe bağlı olarak kontur tabanlı banknot
+önerilerine) bölünür, tüm parçalar tek batch'lik ileri geçişte sınıflandırılır,
+aynı sınıftaki parçalar kontur bölgelerine göre banknotlarda birleştirilir ve
+banknot başına kutular ile toplam TL tutarı döndürülür.
+"""
+
+import re
+import cv2
+import numpy as np
+
+from classifier import predict_arrays
+
+def parse_grid(value):
+    """'2x3' biçimindeki ızgara tanımını (satır, sütun) olarak çözümler."""
+    match = re.fullmatch(r'\s*(\d+)\s*[xX*]\s*(\d+)\s*', value)
+    if not match or min(int(match.group(1)), int(match.group(2))) < 1:
+        raise ValueError(f"Geçersiz ızgara: {value} (örn: 2x3)")
+    return int(match.group(1)), int(match.group(2))
+
+def grid_tiles(h, w, rows=2, cols=3, overlap=0.25):
+    """
+    Kareyi örtüşen pencerelere böler.
+
+    Args:
+        h, w: Kare boyutu
+        rows, cols: Izgara boyutu
+        overlap: Komşu pencereler arasındaki örtüşme oranı (0: kayan pencere yok)
+
+    Returns:
+        (x1, y1, x2, y2) kutu listesi
+    """
+    tile_w = w / (cols - (cols - 1) * overlap)
+    tile_h = h / (rows - (rows - 1) * overlap)
+    step_x = tile_w * (1 - overlap)
+    step_y = tile_h * (1 - overlap)
+    boxes = []
+    for r in range(rows):
+        for c in range(cols):
+            x1, y1 = int(round(c * step_x)), int(round(r * step_y))
+            boxes.append((x1, y1, min(w, int(round(x1 + tile_w))), min(h, int(round(y1 + tile_h)))))
+    return boxes
+
+def contour_proposals(img, min_area=0.02, max_area=0.9, max_boxes=12):
+    """
+    Kenar ve kontur analizi ile banknot adayı kutular önerir.
+
+    Args:
+        img: BGR görüntü
+        min_area, max_area: Kutunun kare alanına oranı için sınırlar
+        max_boxes: En fazla öneri sayısı (büyükten küçüğe)
+
+    Returns:
+        (x1, y1, x2, y2) kutu listesi
+    """
+    h, w = img.shape[:2]
+    # Kontur araması küçültülmüş gri görüntüde yapılır
+    scale = 480.0 / max(h, w) if max(h, w) > 480 else 1.0
+    small = cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) if scale < 1 else img
+    gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+    edges = cv2.dilate(cv2.Canny(gray, 50, 150), np.ones((5, 5), np.uint8), iterations=2)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    frame_area = float(h * w)
+    for contour in contours:
+        x, y, bw, bh = cv2.boundingRect(contour)
+        x1, y1 = int(x / scale), int(y / scale)
+        x2, y2 = int((x + bw) / scale), int((y + bh) / scale)
+        area = (x2 - x1) * (y2 - y1) / frame_area
+        aspect = max(bw, bh) / max(1, min(bw, bh))
+        # Banknotlar yaklaşık 2:1 en-boy oranına sahiptir
+        if min_area <= area <= max_area and aspect <= 3.5:
+            boxes.append((x1, y1, x2, y2))
+    boxes.sort(key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True)
+    return boxes[:max_boxes]
+
+def box_area(box):
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+def box_overlap(a, b):
+    """Kesişim alanının küçük kutunun alanına oranı (0: örtüşme yok)."""
+    inter = max(0, min(a[2], b[2]) - max(a[0], b[0])) * max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    smaller = min(box_area(a), box_area(b))
+    return inter / smaller if smaller > 0 else 0.0
+
+def merge_tiles(detections, regions=(), region_threshold=0.25):
+    """
+    Aynı sınıftaki parçaları banknot başına tek kutuda birleştirir.
+
+    Izgara parçaları komşularıyla her zaman örtüştüğü için örtüşme tek başına
+    banknot sınırını vermez. Parçalar önce gerçek banknot bölgelerine (kontur
+    önerileri) atanır: aynı bölgeye düşen aynı sınıf parçalar tek banknottur
+    ve kutu bölgenin kendisidir. Bölgesi olmayan parçalar en güvenli parçanın
+    (tohum) doğrudan örtüştüğü parçalarla birleşir; komşuluk zincirleme
+    izlenmez, böylece yan yana iki aynı banknot tek banknota dönüşmez.
+
+    Args:
+        detections: {'class_id', 'name', 'conf', 'bbox'} listesi
+        regions: Banknot bölgeleri - (x1, y1, x2, y2) listesi (örn. contour_proposals())
+        region_threshold: Parçanın bölgeye atanması için en küçük kesişim / küçük kutu oranı
+
+    Returns:
+        Birleştirilmiş banknot listesi ('tiles': birleşen parça sayısı)
+    """
+    groups = {}
+    seeds = []  # bölgesi olmayan parçalar: [tohum kutusu, grup]
+    for det in sorted(detections, key=lambda d: -d['conf']):
+        overlaps = [box_overlap(det['bbox'], region) for region in regions]
+        # Eşit örtüşmede küçük bölge seçilir (iki banknotu saran dış kontur yerine)
+        best = max(range(len(overlaps)), key=lambda i: (overlaps[i], -box_area(regions[i]))) if overlaps else None
+        if best is not None and overlaps[best] >= region_threshold:
+            groups.setdefault((det['class_id'], best), []).append(det)
+            continue
+        for seed_box, group in seeds:
+            if group[0]['class_id'] == det['class_id'] and box_overlap(seed_box, det['bbox']) > 0:
+                group.append(det)
+                break
+        else:
+            seeds.append((det['bbox'], [det]))
+
+    notes = []
+    for (_, region_idx), group in groups.items():
+        notes.append({**group[0], 'bbox': tuple(regions[region_idx]), 'tiles': len(group)})
+    for _, group in seeds:
+        notes.append({
+            **group[0],
+            'bbox': (min(d['bbox'][0] for d in group), min(d['bbox'][1] for d in group),
+                     max(d['bbox'][2] for d in group), max(d['bbox'][3] for d in group)),
+            'tiles': len(group)
+        })
+    notes.sort(key=lambda note: -note['conf'])
+    return notes
+
+def denomination(name):
+    """Sınıf isminden banknot değerini çıkarır (örn: '200' veya '200 TL' -> 200)."""
+    match = re.search(r'\d+', str(name))
+    return int(match.group()) if match else 0
+
+def detect_notes(model, img, grid=(2, 3), overlap=0.25, proposals=False, conf=0.8, imgsz=None):
+    """
+    Karedeki banknotları döşemeli sınıflandırma ile bulur.
+
+    Tüm parçalar tek model çağrısında (tek batch) sınıflandırılır; maliyet
+    parça sayısıyla doğrusal artan ardışık çağrılar yerine tek çıkarıma yakındır.
+
+    Args:
+        model: Yüklenmiş model (BanknoteClassifier veya CascadeClassifier)
+        img: BGR görüntü
+        grid: (satır, sütun) ızgara boyutu
+        overlap: Pencere örtüşme oranı
+        proposals: Kontur tabanlı banknot önerilerini de sınıflandır (öneriler her
+            durumda parçaları banknotlara atamak için kullanılır)
+        conf: Bu güvenin altındaki parçalar arka plan sayılır
+        imgsz: Çıkarım boyutu (None: modelin varsayılanı)
+
+    Returns:
+        (banknot listesi, toplam TL)
+    """
+    h, w = img.shape[:2]
+    boxes = grid_tiles(h, w, *grid, overlap=overlap)
+    # Kontur bölgeleri parçaları banknotlara atamak için her zaman hesaplanır
+    # (küçültülmüş gri görüntüde, çıkarıma göre ihmal edilebilir maliyet)
+    regions = contour_proposals(img)
+    if proposals:
+        boxes += regions
+    crops = [img[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes if x2 > x1 and y2 > y1]
+    boxes = [box for box in boxes if box[2] > box[0] and box[3] > box[1]]
+
+    top1, confs, _ = predict_arrays(model, crops, imgsz)
+
+    detections = []
+    for box, class_id, top1_conf in zip(boxes, top1.tolist(), confs.tolist()):
+        if top1_conf >= conf:
+            detections.append({
+                'class_id': class_id,
+                'name': model.names.get(class_id, str(class_id)),
+                'conf': top1_conf,
+                'bbox': box
+            })
+
+    notes = merge_tiles(detections, regions)
+    total = sum(denomination(note['name']) for note in notes)
+    return notes, total
+
+def draw_notes(img, notes, total, color=(0, 255, 0)):
+    """Banknot kutularını, etiketleri ve toplam tutarı çizer; yeni görüntü döndürür."""
+    annotated = img.copy()
+    for note in notes:
+        x1, y1, x2, y2 = note['bbox']
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 3)
+        label = f"{note['name']} TL: {note['conf']:.1%}"
+        label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+        label_y = max(y1, label_size[1] + 10)
+        cv2.rectangle(annotated, (x1, label_y - label_size[1] - 10), (x1 + label_size[0] + 10, label_y), color, -1)
+        cv2.putText(annotated, label, (x1 + 5, label_y - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2, cv2.LINE_AA)
+    total_label = f"Toplam: {total} TL ({len(notes)} banknot)"
+    label_size, _ = cv2.getTextSize(total_label, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2)
+    h = annotated.shape[0]
+    cv2.rectangle(annotated, (10, h - label_size[1] - 30), (30 + label_size[0], h - 10), (0, 0, 0), -1)
+    cv2.putText(annotated, total_label, (20, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 2, cv2.LINE_AA)
+    return annotated
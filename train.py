@@ -3,58 +3,397 @@ YOLOv8 Classification model eğitim scripti.
 """
 
 from ultralytics import YOLO
+from ultralytics.data import ClassificationDataset
+from ultralytics.engine.trainer import BaseTrainer
+from ultralytics.models.yolo.classify import ClassificationTrainer
+import argparse
+import inspect
+import json
 import os
+import time
+from copy import copy
+from functools import partial
+from pathlib import Path
+import numpy as np
+import torch
+import torch.nn.functional as F
+from PIL import Image
 
-def train_model(data_dir='dataset', epochs=100, imgsz=640, batch=8, model_size='n', workers=4):
+from packed_dataset import PackedStore
+from variant_augment import VariantAugment, load_params
+
+# Yeni ultralytics sürümlerinde get_dataset() veri sözlüğünü döndürür ve BaseTrainer onu
+# self.data'ya atar; eski 8.x sürümleri self.data'yı get_dataset() içinde bekler ve
+# (train, val) çifti döndürülmesini ister
+GET_DATASET_RETURNS_DICT = 'self.data = self.get_dataset()' in inspect.getsource(BaseTrainer)
+
+class PackedClassificationDataset(torch.utils.data.Dataset):
+    """
+    prepare_data.py --pack ile yazılmış depodan okuyan sınıflandırma veri seti.
+    Resimler önceden boyutlandırıldığı için her epoch'ta PNG çözülmez;
+    kırpılmadan saklandıkları için dönüşümler ultralytics ClassificationDataset
+    ile aynı şekilde resmin tamamına uygulanır.
+    """
+
+    def __init__(self, root, split, args, augment=False):
+        from ultralytics.data.augment import classify_augmentations, classify_transforms
+
+        store = PackedStore(root)
+        if store.imgsz < args.imgsz:
+            print(f"UYARI: Depo boyutu ({store.imgsz}) eğitim imgsz değerinden ({args.imgsz}) küçük")
+        self.split = store.split(split)
+        self.samples = list(zip(self.split.paths, self.split.labels.tolist()))
+        self.torch_transforms = (
+            classify_augmentations(
+                size=args.imgsz,
+                scale=(1.0 - args.scale, 1.0),
+                hflip=args.fliplr,
+                vflip=args.flipud,
+                erasing=args.erasing,
+                auto_augment=args.auto_augment,
+                hsv_h=args.hsv_h,
+                hsv_s=args.hsv_s,
+                hsv_v=args.hsv_v
+            )
+            if augment
+            else classify_transforms(size=args.imgsz)
+        )
+
+    def __len__(self):
+        return len(self.split)
+
+    def __getitem__(self, i):
+        img, label = self.split[i]
+        # Bellek eşlemeli görüntüden yalnızca bu resmin baytları okunur
+        sample = self.torch_transforms(Image.fromarray(np.array(img)))
+        return {'img': sample, 'cls': label}
+
+class VariantAugmentedDataset(torch.utils.data.Dataset):
+    """
+    Yalnızca temel resimleri içeren veri setini anlık varyant artırmasıyla sarar.
+    Her temel resim `repeats` kez tekrarlanır; böylece epoch başına adım sayısı
+    ön işlenmiş varyantlarla eğitimdekiyle aynı kalır.
+    """
+
+    def __init__(self, dataset, params):
+        self.dataset = dataset
+        self.repeats = params.get('repeats', 1)
+        self.torch_transforms = VariantAugment(params, dataset.torch_transforms)
+        dataset.torch_transforms = self.torch_transforms
+
+    def __len__(self):
+        return len(self.dataset) * self.repeats
+
+    def __getitem__(self, i):
+        return self.dataset[i % len(self.dataset)]
+
+class BanknoteTrainer(ClassificationTrainer):
+    """
+    Veri setini paketlenmiş depodan da okuyabilen ve prepare_data.py --base-only
+    ile hazırlanmış veride varyantları anlık üreten eğitici.
+    """
+
+    def get_dataset(self):
+        if not PackedStore.exists(self.args.data):
+            return super().get_dataset()
+        store = PackedStore(self.args.data)
+        names = dict(enumerate(store.classes))
+        data = {'path': str(store.root), 'train': 'train', 'val': 'val', 'test': 'val',
+                'nc': len(names), 'names': names, 'channels': 3}
+        if GET_DATASET_RETURNS_DICT:
+            return data
+        self.data = data
+        return data['train'], data['val']
+
+    def dataset_args(self, mode):
+        """Veri setinin oluşturulacağı parametreler (alt sınıflar eğitim imgsz'sini değiştirebilir)."""
+        return self.args
+
+    def build_dataset(self, img_path, mode='train', batch=None):
+        args = self.dataset_args(mode)
+        if PackedStore.exists(self.args.data):
+            split = 'train' if mode == 'train' else 'val'
+            dataset = PackedClassificationDataset(self.args.data, split, args, augment=mode == 'train')
+        else:
+            dataset = ClassificationDataset(root=img_path, args=args, augment=mode == 'train', prefix=mode)
+
+        # Validasyon seti değişmez; artırma yalnızca eğitimde uygulanır
+        params = load_params(self.args.data)
+        if mode == 'train' and params:
+            dataset = VariantAugmentedDataset(dataset, params)
+        return dataset
+
+class DistillationLoss:
+    """
+    Öğretmenin yumuşak olasılıkları ile etiketlerin ağırlıklı karışımı.
+    loss = alpha * T^2 * KL(öğretmen_T || öğrenci_T) + (1 - alpha) * CE(öğrenci, etiket)
+    """
+
+    def __init__(self, temperature=4.0, alpha=0.7):
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def __call__(self, preds, batch):
+        preds = preds[1] if isinstance(preds, (list, tuple)) else preds
+        loss = F.cross_entropy(preds, batch['cls'], reduction='mean')
+        soft = batch.get('soft')
+        if soft is not None:
+            t = self.temperature
+            kd = F.kl_div(F.log_softmax(preds / t, dim=1), F.softmax(soft / t, dim=1),
+                          reduction='batchmean') * (t * t)
+            loss = self.alpha * kd + (1 - self.alpha) * loss
+        return loss, loss.detach()
+
+class DistillationTrainer(BanknoteTrainer):
+    """
+    Öğrenci modeli öğretmen modelin yumuşak hedefleriyle eğiten eğitici.
+
+    Eğitim resimleri öğretmenin imgsz değerinde yüklenir; öğretmen bu
+    resimleri görür, öğrenci ise aynı resimlerin kendi imgsz değerine
+    küçültülmüş halini görür. Validasyon öğrenci imgsz değerinde yapılır.
+    """
+
+    def __init__(self, *args, teacher=None, temperature=4.0, alpha=0.7, **kwargs):
+        super().__init__(*args, **kwargs)
+        teacher_model = YOLO(teacher)
+        if teacher_model.names != self.data['names']:
+            raise ValueError(f"Öğretmen sınıfları veri setiyle uyuşmuyor: {teacher_model.names}")
+        self.teacher = teacher_model.model.to(self.device).eval()
+        for param in self.teacher.parameters():
+            param.requires_grad = False
+        self.teacher_imgsz = int(teacher_model.overrides.get('imgsz', self.args.imgsz))
+        self.distill_loss = DistillationLoss(temperature, alpha)
+
+    def dataset_args(self, mode):
+        if mode != 'train':
+            return self.args
+        args = copy(self.args)
+        args.imgsz = max(self.teacher_imgsz, self.args.imgsz)
+        return args
+
+    def preprocess_batch(self, batch):
+        batch = super().preprocess_batch(batch)
+        with torch.no_grad():
+            out = self.teacher(batch['img'].float())
+        # Eval modundaki sınıflandırma başlığı (olasılık, logit) veya yalnızca olasılık döndürür
+        batch['soft'] = out[1] if isinstance(out, (list, tuple)) else out.clamp_min(1e-8).log()
+        if batch['img'].shape[-1] != self.args.imgsz:
+            batch['img'] = F.interpolate(batch['img'], size=(self.args.imgsz, self.args.imgsz),
+                                         mode='bilinear', align_corners=False, antialias=True)
+
+        # Kayıp fonksiyonu EMA kopyası oluşturulduktan sonra yalnızca eğitilen modele bağlanır;
+        # böylece checkpoint'e öğretmen veya özel sınıf yazılmaz
+        model = getattr(self.model, 'module', self.model)
+        if getattr(model, 'criterion', None) is not self.distill_loss:
+            model.criterion = self.distill_loss
+        return batch
+
+def train_model(data_dir='dataset', epochs=100, imgsz=640, batch=8, model_size='n', workers=4,
+                packed_dir=None, name='banknot_classifier', project='runs/classify',
+                teacher=None, temperature=4.0, alpha=0.7, **train_args):
     """
     YOLOv8 Classification modeli eğitir.
-    
+
     Args:
         data_dir: Veri klasörü (train ve val alt klasörleri içermeli)
         epochs: Eğitim epoch sayısı
         imgsz: Görüntü boyutu
         batch: Batch size
         model_size: Model boyutu ('n', 's', 'm', 'l', 'x')
+        workers: DataLoader worker sayısı
+        packed_dir: Paketlenmiş depo klasörü (verilirse data_dir yerine kullanılır)
+        name: Çalıştırma adı
+        project: Çalıştırma klasörü
+        teacher: Öğretmen model yolu (verilirse bilgi damıtma ile eğitilir)
+        temperature: Damıtma sıcaklığı
+        alpha: Yumuşak hedef kaybının ağırlığı
+        train_args: model.train'e aktarılan ek parametreler
     """
-    
+
     # Model oluştur (YOLOv8 classification)
     model = YOLO(f'yolov8{model_size}-cls.pt')  # Pre-trained model
-    
+
+    trainer = BanknoteTrainer
+    if teacher:
+        trainer = partial(DistillationTrainer, teacher=teacher, temperature=temperature, alpha=alpha)
+
     # Eğitim parametreleri
     results = model.train(
-        data=data_dir,
+        data=packed_dir or data_dir,
+        trainer=trainer,
         epochs=epochs,
         imgsz=imgsz,
         batch=batch,
         workers=workers,
-        name='banknot_classifier',
-        project='runs/classify',
+        name=name,
+        project=project,
         patience=20,  # Early stopping patience
         save=True,
         val=True,
         plots=True,
-        verbose=True
+        verbose=True,
+        **train_args
     )
-    
+
     print("\nEğitim tamamlandı!")
-    print(f"Model kaydedildi: runs/classify/banknot_classifier/weights/best.pt")
-    
+    print(f"Model kaydedildi: {model.trainer.best}")
+
+    if teacher:
+        distillation_report(teacher, str(model.trainer.best))
+
     return results
 
-if __name__ == '__main__':
+def distillation_report(teacher_path, student_path, val_txt='validation.txt', source_dir='.'):
+    """
+    Öğrenci ve öğretmenin validasyon doğruluğunu ve tek resimlik CPU gecikmesini karşılaştırır.
+    Rapor öğrencinin çalıştırma klasörüne distill_report.json olarak yazılır.
+    """
+    from backends import load_model
+    from quantize import evaluate, measure_latency, model_size_mb, read_split
+
+    items = read_split(val_txt, source_dir)
+    if not items:
+        print(f"UYARI: {val_txt} içindeki resimler bulunamadı, karşılaştırma atlandı")
+        return None
+
+    report = {}
+    for role, path in (('teacher', teacher_path), ('student', student_path)):
+        model = load_model(path, 'torch')
+        imgsz = int(model.overrides.get('imgsz', 640))
+        accuracy = evaluate(model, items)
+        latency = measure_latency(model, [p for p, _, _ in items], imgsz=imgsz, device='cpu')
+        report[role] = {'model': path, 'imgsz': imgsz, 'accuracy': accuracy['overall'],
+                        'latency_ms': latency['mean_ms'], 'latency_p95_ms': latency['p95_ms'],
+                        'size_mb': model_size_mb(path)}
+
+    print("\nÖğrenci / öğretmen karşılaştırması:")
+    print(f"{'':>10} {'imgsz':>6} {'top-1':>8} {'CPU ms':>8} {'MB':>7}")
+    for role, label in (('teacher', 'Öğretmen'), ('student', 'Öğrenci')):
+        entry = report[role]
+        print(f"{label:>10} {entry['imgsz']:>6} {entry['accuracy']:>8.2%} "
+              f"{entry['latency_ms']:>8.2f} {entry['size_mb']:>7.2f}")
+    if report['student']['latency_ms']:
+        print(f"Hızlanma: {report['teacher']['latency_ms'] / report['student']['latency_ms']:.2f}x")
+
+    report_path = Path(student_path).parent.parent / 'distill_report.json'
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Rapor kaydedildi: {report_path}")
+    return report
+
+def loader_throughput(dataset, batch=8, workers=4, batches=50):
+    """
+    Veri setinin DataLoader üzerinden saniyede kaç resim ürettiğini ölçer.
+
+    Returns:
+        Resim/saniye (ilk batch worker başlatma süresi nedeniyle hariç tutulur)
+    """
+    loader = torch.utils.data.DataLoader(dataset, batch_size=batch, shuffle=True, num_workers=workers)
+    count = 0
+    start = None
+    for i, item in enumerate(loader):
+        if i == 0:
+            start = time.perf_counter()
+            continue
+        count += len(item['img'])
+        if i >= batches:
+            break
+    elapsed = time.perf_counter() - start if start else 0.0
+    return count / elapsed if elapsed > 0 else 0.0
+
+def compare_loaders(data_dir, packed_dir, imgsz=640, batch=8, workers=4, batches=50):
+    """PNG klasöründen ve paketlenmiş depodan veri yükleme hızını karşılaştırır."""
+    from ultralytics.cfg import get_cfg
+    from ultralytics.data import ClassificationDataset
+    from ultralytics.utils import DEFAULT_CFG
+
+    args = get_cfg(DEFAULT_CFG, {'imgsz': imgsz})
+    print(f"Veri yükleme hızı ölçülüyor (imgsz={imgsz}, batch={batch}, workers={workers}, {batches} batch)...")
+    png_speed = loader_throughput(
+        ClassificationDataset(root=os.path.join(data_dir, 'train'), args=args, augment=True, prefix='train'),
+        batch, workers, batches
+    )
+    print(f"  PNG klasörü ({data_dir}): {png_speed:.1f} resim/sn")
+    packed_speed = loader_throughput(
+        PackedClassificationDataset(packed_dir, 'train', args, augment=True), batch, workers, batches
+    )
+    print(f"  Paketlenmiş depo ({packed_dir}): {packed_speed:.1f} resim/sn")
+    if png_speed > 0:
+        print(f"  Hızlanma: {packed_speed / png_speed:.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLOv8 Banknot model eğitimi')
+    parser.add_argument('--data', type=str, default='dataset',
+                        help='Veri klasörü (train ve val alt klasörleri içermeli)')
+    parser.add_argument('--packed', type=str, default=None,
+                        help='prepare_data.py --pack ile yazılmış depodan eğit')
+    parser.add_argument('--epochs', type=int, default=100,
+                        help='Eğitim epoch sayısı')
+    parser.add_argument('--imgsz', type=int, default=640,
+                        help='Görüntü boyutu')
+    parser.add_argument('--batch', type=int, default=8,
+                        help='Batch size (VRAM için azaltıldı)')
+    parser.add_argument('--model-size', type=str, default='n', choices=['n', 's', 'm', 'l', 'x'],
+                        help="Model boyutu ('nano' model varsayılan)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help='DataLoader worker sayısı')
+    parser.add_argument('--name', type=str, default=None,
+                        help='Çalıştırma adı (varsayılan: banknot_classifier, damıtmada banknot_student)')
+    parser.add_argument('--teacher', type=str, default=None,
+                        help='Bilgi damıtma için öğretmen model yolu (örn: yolov8s ile eğitilmiş best.pt)')
+    parser.add_argument('--temperature', type=float, default=4.0,
+                        help='Damıtma sıcaklığı')
+    parser.add_argument('--alpha', type=float, default=0.7,
+                        help='Yumuşak hedef kaybının ağırlığı (0-1)')
+    parser.add_argument('--bench-loader', action='store_true',
+                        help='Eğitmeden PNG klasörü ve paketlenmiş depo yükleme hızını karşılaştır')
+    parser.add_argument('--bench-batches', type=int, default=50,
+                        help='Yükleme hızı ölçümünde okunacak batch sayısı')
+
+    args = parser.parse_args()
+
+    if args.packed and not PackedStore.exists(args.packed):
+        print(f"HATA: Paketlenmiş depo bulunamadı: {args.packed}")
+        print(f"Önce 'python prepare_data.py --pack {args.packed}' komutunu çalıştırın.")
+        exit(1)
+    if args.packed:
+        try:
+            PackedStore(args.packed)
+        except ValueError as e:
+            print(f"HATA: {e}")
+            exit(1)
+
+    if args.bench_loader:
+        if not args.packed or not os.path.exists(args.data):
+            print("HATA: Karşılaştırma için hem --data klasörü hem de --packed depo gerekli.")
+            exit(1)
+        compare_loaders(args.data, args.packed, args.imgsz, args.batch, args.workers, args.bench_batches)
+        return
+
     # Veri klasörünün varlığını kontrol et
-    if not os.path.exists('dataset'):
-        print("HATA: 'dataset' klasörü bulunamadı!")
+    if not args.packed and not os.path.exists(args.data):
+        print(f"HATA: '{args.data}' klasörü bulunamadı!")
         print("Önce 'python prepare_data.py' komutunu çalıştırın.")
         exit(1)
-    
+
+    if args.teacher and not os.path.exists(args.teacher):
+        print(f"HATA: Öğretmen model bulunamadı: {args.teacher}")
+        exit(1)
+
     # Eğitimi başlat
     train_model(
-        data_dir='dataset',
-        epochs=100,
-        imgsz=640,      # daha küçük çözünürlük
-        batch=8,        # VRAM için azaltıldı
-        model_size='n', # 'nano' model
-        workers=4       # DataLoader worker sayısı
+        data_dir=args.data,
+        epochs=args.epochs,
+        imgsz=args.imgsz,
+        batch=args.batch,
+        model_size=args.model_size,
+        workers=args.workers,
+        packed_dir=args.packed,
+        name=args.name or ('banknot_student' if args.teacher else 'banknot_classifier'),
+        teacher=args.teacher,
+        temperature=args.temperature,
+        alpha=args.alpha
     )
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Ön işlenmiş (pre-rendered) artırma varyantları yerine eğitim sırasında anlık artırma.
+eminus_/eplus_ (pozlama), flipped_ (çevirme) ve saltAndPeppered_ (tuz-biber gürültüsü)
+ailelerini tanır, parametrelerini temel resim/varyant çiftlerinden tahmin eder ve
+aynı dönüşümleri numpy ile vektörel olarak uygular.
+"""
+
+import json
+import os
+from pathlib import Path
+import cv2
+import numpy as np
+from PIL import Image
+
+# Ön işlenmiş (pre-rendered) artırma aileleri - dosya adı öneki
+AUGMENTATION_FAMILIES = ['eminus', 'eplus', 'flipped', 'saltAndPeppered']
+
+PARAMS_NAME = 'augment.json'
+
+# Tahmin için çift bulunamayan ailelerde kullanılan varsayılanlar
+DEFAULT_FAMILY_PARAMS = {
+    'eminus': {'gain': 0.7, 'gain_std': 0.0, 'bias': 0.0},
+    'eplus': {'gain': 1.3, 'gain_std': 0.0, 'bias': 0.0},
+    'flipped': {'code': 1},
+    'saltAndPeppered': {'amount': 0.02, 'amount_std': 0.0, 'salt': 0.5}
+}
+
+# cv2.flip kodları: 1 yatay, 0 dikey, -1 her ikisi
+FLIP_CODES = [1, 0, -1]
+
+def augmentation_family(file_path):
+    """Dosya adından artırma ailesini çıkarır (örn: 'eplus_5_1_0052.png' -> 'eplus')."""
+    prefix = Path(file_path).name.split('_')[0]
+    return prefix if prefix in AUGMENTATION_FAMILIES else 'original'
+
+def base_file(file_path):
+    """Varyantın temel resminin yolunu döndürür (örn: '5/eplus_5_1_0052.png' -> '5/5_1_0052.png')."""
+    family = augmentation_family(file_path)
+    if family == 'original':
+        return file_path
+    path = Path(file_path)
+    return (path.parent / path.name[len(family) + 1:]).as_posix()
+
+def _exposure(base, variant):
+    # variant ≈ gain * base + bias doğrusal uydurması; kırpılmış pikseller hariç
+    x = base.astype(np.float32).ravel()
+    y = variant.astype(np.float32).ravel()
+    keep = (y > 0) & (y < 255)
+    if keep.sum() < 100:
+        return None
+    gain, bias = np.polyfit(x[keep], y[keep], 1)
+    return float(gain), float(bias)
+
+def _flip_code(base, variant):
+    errors = [np.abs(cv2.flip(base, code).astype(np.int16) - variant).mean() for code in FLIP_CODES]
+    return FLIP_CODES[int(np.argmin(errors))]
+
+def _salt_and_pepper(base, variant):
+    changed = (base != variant).any(axis=2)
+    salt = (variant == 255).all(axis=2) & changed
+    pepper = (variant == 0).all(axis=2) & changed
+    noisy = salt.sum() + pepper.sum()
+    return float(noisy / changed.size), float(salt.sum() / noisy) if noisy else 0.5
+
+def estimate_params(pairs, samples=32):
+    """
+    Temel resim/varyant çiftlerinden aile parametrelerini tahmin eder.
+
+    Args:
+        pairs: {aile: [(varyant yolu, temel yol), ...]}
+        samples: Aile başına incelenecek en fazla çift
+
+    Returns:
+        {aile: parametreler}
+    """
+    params = {family: dict(values) for family, values in DEFAULT_FAMILY_PARAMS.items()}
+    for family, family_pairs in pairs.items():
+        measurements = []
+        for variant_path, base_path in family_pairs[:samples]:
+            base, variant = cv2.imread(str(base_path)), cv2.imread(str(variant_path))
+            if base is None or variant is None or base.shape != variant.shape:
+                continue
+            if family in ('eminus', 'eplus'):
+                value = _exposure(base, variant)
+            elif family == 'flipped':
+                value = _flip_code(base, variant)
+            else:
+                value = _salt_and_pepper(base, variant)
+            if value is not None:
+                measurements.append(value)
+        if not measurements:
+            print(f"UYARI: '{family}' için çift bulunamadı, varsayılan parametreler kullanılıyor")
+            continue
+
+        if family in ('eminus', 'eplus'):
+            gains, biases = np.array(measurements).T
+            params[family] = {'gain': float(gains.mean()), 'gain_std': float(gains.std()),
+                              'bias': float(biases.mean())}
+        elif family == 'flipped':
+            params[family] = {'code': max(set(measurements), key=measurements.count)}
+        else:
+            amounts, salts = np.array(measurements).T
+            params[family] = {'amount': float(amounts.mean()), 'amount_std': float(amounts.std()),
+                              'salt': float(salts.mean())}
+    return params
+
+def save_params(output_dir, params):
+    with open(Path(output_dir) / PARAMS_NAME, 'w', encoding='utf-8') as f:
+        json.dump(params, f, indent=2)
+
+def load_params(data_dir):
+    """Veri klasöründeki artırma parametrelerini okur (yoksa None)."""
+    params_path = Path(data_dir) / PARAMS_NAME
+    if not params_path.exists():
+        return None
+    with open(params_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class VariantAugment:
+    """
+    Ön işlenmiş ailelerin dönüşümlerini anlık uygular, ardından asıl dönüşümleri çağırır.
+
+    Her örnek için aile, orijinal listedeki aile sıklıklarına göre seçilir;
+    böylece bir epoch'taki varyant dağılımı ön işlenmiş veri setiyle aynı kalır.
+    """
+
+    def __init__(self, params, transforms):
+        """
+        Args:
+            params: prepare_data.py --base-only ile yazılan augment.json içeriği
+            transforms: Artırmadan sonra uygulanacak dönüşüm (PIL -> tensor)
+        """
+        self.families = params['families']
+        weights = params['weights']
+        self.choices = ['original'] + [f for f in AUGMENTATION_FAMILIES if weights.get(f)]
+        probs = np.array([weights.get(f, 0.0) for f in self.choices], dtype=np.float64)
+        self.probs = probs / probs.sum()
+        self.transforms = transforms
+        self._rng = None
+        self._pid = None
+
+    @property
+    def rng(self):
+        # DataLoader worker'ları fork ile aynı durumu devralmasın diye süreç başına üretici
+        if self._pid != os.getpid():
+            self._rng = np.random.default_rng()
+            self._pid = os.getpid()
+        return self._rng
+
+    def apply(self, img, family):
+        """RGB uint8 görüntüye ailenin dönüşümünü uygular."""
+        params = self.families.get(family, {})
+        if family in ('eminus', 'eplus'):
+            gain = self.rng.normal(params['gain'], params['gain_std'])
+            # 256 girişli tablo ile tüm pikseller tek indekslemede dönüştürülür
+            lut = np.clip(np.arange(256, dtype=np.float32) * gain + params['bias'], 0, 255).astype(np.uint8)
+            return lut[img]
+        if family == 'flipped':
+            return cv2.flip(img, params['code'])
+        if family == 'saltAndPeppered':
+            amount = max(0.0, self.rng.normal(params['amount'], params['amount_std']))
+            h, w = img.shape[:2]
+            noise = self.rng.random((h, w), dtype=np.float32)
+            out = img.copy()
+            out[noise < amount * params['salt']] = 255
+            out[(noise >= amount * params['salt']) & (noise < amount)] = 0
+            return out
+        return img
+
+    def __call__(self, image):
+        family = self.choices[self.rng.choice(len(self.choices), p=self.probs)]
+        if family != 'original':
+            image = Image.fromarray(self.apply(np.asarray(image), family))
+        return self.transforms(image)
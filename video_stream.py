@@ -0,0 +1,395 @@
+"""
+Video ve kamera akışları için sabit bellekli yardımcılar.
+detect.py ve gui.py tarafından ortak kullanılır.
+"""
+
+import csv
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+import cv2
+
+def video_fps(video_path):
+    """Videonun FPS değerini döndürür (okunamazsa 0)."""
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0.0
+    cap.release()
+    return fps or 0.0
+
+def stream_video_predictions(model, video_path, conf_threshold=0.25, vid_stride=1, save=False):
+    """
+    Video karelerini tek tek modelden geçirir.
+
+    Sonuçlar liste halinde biriktirilmez; her kare işlendikten sonra
+    Results nesnesi (ve içindeki orijinal kare) serbest kalır. Bu sayede
+    bellek kullanımı video uzunluğundan bağımsızdır.
+
+    Args:
+        model: Yüklenmiş YOLO modeli
+        video_path: Video yolu
+        conf_threshold: Güven eşiği
+        vid_stride: Yalnızca her k. kareyi sınıflandır
+        save: Ultralytics'in işaretlenmiş video çıktısını kaydet
+
+    Yields:
+        (kare numarası, Results nesnesi)
+    """
+    vid_stride = max(1, vid_stride)
+    results = model(str(video_path), conf=conf_threshold, save=save,
+                    stream=True, vid_stride=vid_stride, verbose=False)
+    for i, result in enumerate(results):
+        yield i * vid_stride, result
+
+class PredictionLog:
+    """
+    Kare başına tahminleri CSV dosyasına artımlı olarak yazar.
+
+    Her satır yazıldığı anda diske aktarılır; işlem yarıda kesilse bile
+    o ana kadarki tahminler dosyada kalır.
+    """
+
+    HEADER = ['frame', 'time_sec', 'class_id', 'class_name', 'confidence', 'stage']
+
+    def __init__(self, path, fps=0.0):
+        self.path = str(path)
+        self.fps = fps
+        self.rows = 0
+        self._file = open(self.path, 'w', newline='', encoding='utf-8', buffering=1)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.HEADER)
+
+    def write(self, frame_idx, class_id, class_name, confidence, stage=None):
+        """Tek bir karenin tahminini yazar (stage: kaskad modunda karar veren aşama)."""
+        time_sec = frame_idx / self.fps if self.fps > 0 else ''
+        self._writer.writerow([
+            frame_idx,
+            f"{time_sec:.3f}" if time_sec != '' else '',
+            class_id,
+            class_name,
+            f"{confidence:.4f}",
+            stage or ''
+        ])
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def peak_rss_mb():
+    """Sürecin tepe bellek kullanımını MB cinsinden döndürür (desteklenmiyorsa None)."""
+    try:
+        import resource
+    except ImportError:
+        # Windows'ta resource modülü yok
+        return None
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class PredictionTimeline:
+    """
+    Aynı sınıfın art arda gelen karelerini tek bölüme indirger.
+
+    Kare başına satır yerine her bölüm için (başlangıç, bitiş, sınıf,
+    ortalama güven) yazılır; bölüm kapandığı anda diske aktarılır.
+    """
+
+    HEADER = ['start_frame', 'end_frame', 'start_sec', 'end_sec', 'class_id', 'class_name',
+              'mean_confidence', 'frames']
+
+    def __init__(self, path, fps=0.0):
+        self.path = str(path)
+        self.fps = fps
+        self.segments = 0
+        self._current = None
+        self._file = open(self.path, 'w', newline='', encoding='utf-8', buffering=1)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.HEADER)
+
+    def write(self, frame_idx, class_id, class_name, confidence):
+        """Karenin tahminini ekler; sınıf değiştiyse önceki bölümü yazar."""
+        current = self._current
+        if current is not None and current['class_id'] == class_id:
+            current['end'] = frame_idx
+            current['conf_sum'] += confidence
+            current['frames'] += 1
+            return
+        self._flush()
+        self._current = {'start': frame_idx, 'end': frame_idx, 'class_id': class_id,
+                         'class_name': class_name, 'conf_sum': confidence, 'frames': 1}
+
+    def _seconds(self, frame_idx):
+        return f"{frame_idx / self.fps:.3f}" if self.fps > 0 else ''
+
+    def _flush(self):
+        current = self._current
+        if current is None:
+            return
+        self._writer.writerow([
+            current['start'],
+            current['end'],
+            self._seconds(current['start']),
+            self._seconds(current['end']),
+            current['class_id'],
+            current['class_name'],
+            f"{current['conf_sum'] / current['frames']:.4f}",
+            current['frames']
+        ])
+        self.segments += 1
+        self._current = None
+
+    def close(self):
+        self._flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def annotate_frame(frame, label, color=(0, 255, 0)):
+    """Karenin sol üstüne arka planlı etiket yazar (yerinde) ve kareyi döndürür."""
+    scale = max(0.5, frame.shape[1] / 1280)
+    thickness = max(1, int(round(2 * scale)))
+    label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+    pad = int(10 * scale)
+    cv2.rectangle(frame, (0, 0), (label_size[0] + 2 * pad, label_size[1] + 2 * pad), color, -1)
+    cv2.putText(frame, label, (pad, label_size[1] + pad), cv2.FONT_HERSHEY_SIMPLEX,
+                scale, (0, 0, 0), thickness, cv2.LINE_AA)
+    return frame
+
+class AnnotatedVideoWriter:
+    """
+    İşaretlenmiş kareleri ayrı bir thread'de cv2.VideoWriter ile kodlar.
+
+    Kareler sınırlı bir kuyruktan geçer; kodlama çıkarımla örtüşür ve kuyruk
+    dolduğunda üretici bekler (bellek kuyruk boyutuyla sınırlıdır). Etiket
+    çizimi ve isteğe bağlı küçültme de yazıcı thread'inde yapılır. write()
+    ile verilen karenin sahipliği yazıcıya geçer; kare yerinde değiştirilebilir.
+    """
+
+    def __init__(self, path, fps, preview_width=None, queue_size=16, fourcc='mp4v'):
+        """
+        Args:
+            path: Çıktı video yolu
+            fps: Çıktı FPS değeri
+            preview_width: Yalnızca bu genişliğe küçültülmüş önizleme yaz (None: tam boyut)
+            queue_size: Kodlanmayı bekleyen en fazla kare sayısı
+            fourcc: Video kodek kodu
+        """
+        self.path = str(path)
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.preview_width = preview_width
+        self.fourcc = fourcc
+        self.frames = 0
+        self.encode_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.error = None
+        self._writer = None
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, frame, label=None):
+        """Kareyi kodlama kuyruğuna ekler (kuyruk doluysa bekler)."""
+        if self.error is not None:
+            raise RuntimeError(f"Video yazılamadı: {self.error}")
+        start = time.perf_counter()
+        self._queue.put((frame, label))
+        self.wait_seconds += time.perf_counter() - start
+
+    def _open(self, frame):
+        h, w = frame.shape[:2]
+        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (w, h))
+        if not writer.isOpened():
+            raise IOError(f"{self.path} açılamadı ({self.fourcc})")
+        return writer
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            frame, label = item
+            start = time.perf_counter()
+            try:
+                if self.preview_width and frame.shape[1] > self.preview_width:
+                    h, w = frame.shape[:2]
+                    # Kodekler çift boyut bekler
+                    size = (self.preview_width // 2 * 2, max(2, int(h * self.preview_width / w) // 2 * 2))
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                if label:
+                    annotate_frame(frame, label)
+                if self._writer is None:
+                    self._writer = self._open(frame)
+                self._writer.write(frame)
+            except Exception as e:
+                # Hata üreticiye bir sonraki write() çağrısında bildirilir
+                self.error = e
+                continue
+            self.frames += 1
+            self.encode_seconds += time.perf_counter() - start
+
+    def close(self):
+        """
+        Kuyruktaki kareleri kodlar ve dosyayı kapatır.
+
+        Returns:
+            Kodlama sırasında oluşan hata (başarılıysa None) - son karelerdeki
+            hatalar write() ile bildirilemeyeceği için çağıran bunu denetlemelidir
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        return self.error
+
+    def summary(self):
+        """Kodlama istatistiklerinin tek satırlık özeti."""
+        ms = self.encode_seconds * 1000 / self.frames if self.frames else 0.0
+        return (f"Video: {self.frames:,} kare kodlandı (ort. {ms:.1f} ms/kare), "
+                f"kuyruk dolu bekleme {self.wait_seconds:.2f} sn")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class LatestSlot:
+    """
+    Tek elemanlı "yalnızca en yeni" tampon.
+
+    Üretici her zaman son öğenin üzerine yazar; tüketici henüz almadığı
+    eski öğe kaybolur ve `dropped` sayacı artar. Böylece yavaş bir aşama
+    kuyruk biriktirmez, her zaman en güncel kareyle çalışır.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Öğeyi bırakır; alınmamış eski öğe düşürülür."""
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """En yeni öğeyi bekleyerek alır (zaman aşımında veya kapalıysa None)."""
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def get_nowait(self):
+        """Varsa en yeni öğeyi beklemeden alır."""
+        with self._cond:
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        """Bekleyen tüketicileri uyandırır."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        """Üretici bittiyse (close() çağrıldıysa) True."""
+        return self._closed
+
+class RateMeter:
+    """Son `window` saniyedeki olay sayısından hız (FPS) hesaplar."""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self._times = deque()
+        self._lock = threading.Lock()
+
+    def tick(self):
+        now = time.perf_counter()
+        with self._lock:
+            self._times.append(now)
+            while self._times and now - self._times[0] > self.window:
+                self._times.popleft()
+
+    def rate(self):
+        with self._lock:
+            if len(self._times) < 2:
+                return 0.0
+            span = self._times[-1] - self._times[0]
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+class ChangeGate:
+    """
+    Sahne değişmediğinde çıkarımı atlayan ucuz kare farkı kapısı.
+
+    Kare küçültülüp gri tonlamaya çevrilir ve son çıkarım yapılan kareyle
+    ortalama mutlak farkı hesaplanır. Fark eşiğin altındaysa önceki tahmin
+    yeniden kullanılır. Bir tahmin en fazla `max_reuse` kare veya
+    `refresh_sec` saniye yeniden kullanılabilir; sonra çıkarım zorlanır.
+    """
+
+    def __init__(self, threshold=6.0, max_reuse=30, refresh_sec=2.0, size=(64, 48)):
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.refresh_sec = refresh_sec
+        self.size = size
+        self.frames = 0
+        self.skipped = 0
+        self.last_score = 0.0
+        self._reference = None
+        self._age = 0
+        self._last_infer = 0.0
+
+    def should_infer(self, frame):
+        """Kare için çıkarım gerekip gerekmediğini döndürür."""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        self.frames += 1
+
+        now = time.perf_counter()
+        if self._reference is not None:
+            self.last_score = float(cv2.absdiff(small, self._reference).mean())
+            if (self.last_score < self.threshold
+                    and self._age < self.max_reuse
+                    and now - self._last_infer < self.refresh_sec):
+                self._age += 1
+                self.skipped += 1
+                return False
+
+        self._reference = small
+        self._age = 0
+        self._last_infer = now
+        return True
+
+    def reset(self):
+        """Bir sonraki karede çıkarımı zorlar."""
+        self._reference = None
+
+    @property
+    def skip_ratio(self):
+        """Çıkarımı atlanan karelerin oranı."""
+        return self.skipped / self.frames if self.frames else 0.0